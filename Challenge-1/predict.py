@@ -0,0 +1,344 @@
+# Challenge-1/predict.py
+"""
+Batched CPU inference for the denoise -> classify pipeline of
+180dc-challenge1.ipynb: one pass per image, predictions streamed to CSV.
+
+    python predict.py /kaggle/input/180-dc-ml-sig-recruitment/REC_DATASET/test/noisy
+    python predict.py test/noisy --backend onnx --save-denoised denoised_test_images
+    python predict.py test/noisy --tune          # pick the fastest batch size first
+
+- The denoiser and the classifier run as one fused model (normalization
+  included) under TorchScript, ONNX Runtime or plain eager PyTorch.
+- Images are decoded and resized by DataLoader workers, while the model
+  runs on the remaining cores with tuned intra-op threads.
+- Rows are appended to the CSV batch by batch, so memory doesn't grow with
+  the test folder. Denoised images are optionally saved from the same pass.
+- Throughput (images/sec) is reported at the end.
+"""
+
+import os
+import csv
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+from PIL import Image
+from torch.utils.data import DataLoader, Dataset
+
+IMAGE_SIZE = (128, 128)
+MEAN = [0.485, 0.456, 0.406]
+STD = [0.229, 0.224, 0.225]
+BACKENDS = ("torchscript", "onnx", "eager")
+TUNE_BATCH_SIZES = (16, 32, 64, 128, 256)
+
+
+# ----------------------------
+# Models (as defined in the notebook; the state dicts load as is)
+# ----------------------------
+
+class DoubleConv(nn.Module):
+    def __init__(self, in_ch, out_ch):
+        super().__init__()
+        self.net = nn.Sequential(
+            nn.Conv2d(in_ch, out_ch, 3, padding=1),
+            nn.ReLU(inplace=True),
+            nn.Conv2d(out_ch, out_ch, 3, padding=1),
+            nn.ReLU(inplace=True)
+        )
+
+    def forward(self, x):
+        return self.net(x)
+
+
+class Down(nn.Module):
+    def __init__(self, in_ch, out_ch):
+        super().__init__()
+        self.net = nn.Sequential(
+            nn.MaxPool2d(2),
+            DoubleConv(in_ch, out_ch)
+        )
+
+    def forward(self, x):
+        return self.net(x)
+
+
+class Up(nn.Module):
+    def __init__(self, in_ch, out_ch):
+        super().__init__()
+        self.up = nn.Upsample(scale_factor=2, mode='bilinear', align_corners=True)
+        self.conv = DoubleConv(in_ch, out_ch)
+
+    def forward(self, x1, x2):
+        x1 = self.up(x1)
+        x = torch.cat([x2, x1], dim=1)
+        return self.conv(x)
+
+
+class UNetAutoencoder(nn.Module):
+    def __init__(self, in_ch=3, out_ch=3, base=32):
+        super().__init__()
+        self.inc   = DoubleConv(in_ch, base)
+        self.down1 = Down(base, base*2)
+        self.down2 = Down(base*2, base*4)
+        self.up1   = Up(base*4 + base*2, base*2)
+        self.up2   = Up(base*2 + base, base)
+        self.outc  = nn.Conv2d(base, out_ch, 1)
+
+    def forward(self, x):
+        x1 = self.inc(x)
+        x2 = self.down1(x1)
+        x3 = self.down2(x2)
+        x  = self.up1(x3, x2)
+        x  = self.up2(x, x1)
+        return self.outc(x)
+
+
+class StrongCNN(nn.Module):
+    def __init__(self, num_classes=5, dropout=0.5):
+        def GN(c):
+            return nn.GroupNorm(num_groups=min(32, c // 2 if c >= 2 else 1), num_channels=c)
+
+        super().__init__()
+        self.features = nn.Sequential(
+            nn.Conv2d(3, 32, 3, padding=1), GN(32), nn.ReLU(), nn.MaxPool2d(2),
+            nn.Conv2d(32, 64, 3, padding=1), GN(64), nn.ReLU(),
+            nn.Conv2d(64, 64, 3, padding=1), GN(64), nn.ReLU(), nn.MaxPool2d(2),
+            nn.Conv2d(64, 128, 3, padding=1), GN(128), nn.ReLU(),
+            nn.Conv2d(128, 128, 3, padding=1), GN(128), nn.ReLU(), nn.MaxPool2d(2),
+            nn.Conv2d(128, 256, 3, padding=1), GN(256), nn.ReLU(),
+            nn.Conv2d(256, 256, 3, padding=1), GN(256), nn.ReLU(), nn.MaxPool2d(2),
+            )
+
+        self.gap = nn.AdaptiveAvgPool2d((1,1))
+        self.classifier = nn.Sequential(
+            nn.Dropout(dropout),
+            nn.Linear(256, 128), nn.ReLU(),
+            nn.Dropout(dropout),
+            nn.Linear(128, num_classes)
+        )
+
+    def forward(self, x):
+        x = self.features(x)
+        x = self.gap(x)
+        x = torch.flatten(x, 1)
+        return self.classifier(x)
+
+
+class DenoiseClassify(nn.Module):
+    """
+    uint8 NCHW images -> (denoised images as uint8 NCHW, class 0-4).
+    ToTensor + Normalize, the denormalization of the denoiser output and the
+    argmax run inside the graph, so the caller only moves uint8 arrays.
+    """
+
+    def __init__(self, denoiser: nn.Module, classifier: nn.Module):
+        super().__init__()
+        self.denoiser = denoiser
+        self.classifier = classifier
+        self.register_buffer("mean", torch.tensor(MEAN).view(1, -1, 1, 1) * 255)
+        self.register_buffer("std", torch.tensor(STD).view(1, -1, 1, 1) * 255)
+
+    def forward(self, images: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        x = (images.float() - self.mean) / self.std
+        denoised = self.denoiser(x)
+        classes = self.classifier(denoised).argmax(1)
+        pixels = (denoised * self.std + self.mean).clamp(0, 255).round().to(torch.uint8)
+        return pixels, classes
+
+
+def load_model(denoiser_path: str, classifier_path: str) -> DenoiseClassify:
+    denoiser, classifier = UNetAutoencoder(), StrongCNN()
+    denoiser.load_state_dict(torch.load(denoiser_path, map_location="cpu"))
+    classifier.load_state_dict(torch.load(classifier_path, map_location="cpu"))
+    return DenoiseClassify(denoiser, classifier).eval()
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+
+def compile_model(model: DenoiseClassify, backend: str, threads: int):
+    """A callable uint8 numpy batch -> (denoised uint8 numpy batch, classes numpy) for `backend`."""
+    example = torch.zeros((2, 3) + IMAGE_SIZE, dtype=torch.uint8)
+
+    if backend == "onnx":
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            sys.exit("⚠️ --backend onnx needs onnxruntime (pip install onnxruntime)")
+        path = os.path.join(tempfile.mkdtemp(prefix="denoise_classify_"), "model.onnx")
+        torch.onnx.export(model, example, path, input_names=["images"], output_names=["denoised", "classes"],
+                          dynamic_axes={"images": {0: "batch"}, "denoised": {0: "batch"}, "classes": {0: "batch"}},
+                          opset_version=17)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        return lambda batch: tuple(session.run(None, {"images": batch}))
+
+    if backend == "torchscript":
+        with torch.no_grad():
+            model = torch.jit.optimize_for_inference(torch.jit.trace(model, example))
+
+    def run(batch: np.ndarray):
+        with torch.inference_mode():
+            denoised, classes = model(torch.from_numpy(batch))
+        return denoised.numpy(), classes.numpy()
+    return run
+
+
+def set_threads(threads: int) -> None:
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already set once the first parallel op ran
+
+
+# ----------------------------
+# Input
+# ----------------------------
+
+class NoisyImages(Dataset):
+    """Test images in sorted order, decoded and resized to uint8 CHW in the loader workers."""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.images = sorted(os.listdir(root_dir))
+
+    def __len__(self):
+        return len(self.images)
+
+    def __getitem__(self, idx):
+        img = Image.open(os.path.join(self.root_dir, self.images[idx])).convert("RGB")
+        # Same resampling as transforms.Resize on a PIL image
+        img = img.resize(IMAGE_SIZE[::-1], Image.BILINEAR)
+        return np.asarray(img).transpose(2, 0, 1), self.images[idx]
+
+
+def collate(batch):
+    images, names = zip(*batch)
+    return np.ascontiguousarray(np.stack(images)), list(names)
+
+
+def tune_batch_size(predict, threads: int, candidates=TUNE_BATCH_SIZES, seconds: float = 2.0) -> int:
+    """Batch size with the highest images/sec on random input."""
+    best, best_rate = candidates[0], 0.0
+    for batch_size in candidates:
+        batch = np.random.randint(0, 256, (batch_size, 3) + IMAGE_SIZE, dtype=np.uint8)
+        predict(batch)  # warm-up
+        done, start = 0, time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            predict(batch)
+            done += batch_size
+        rate = done / (time.perf_counter() - start)
+        print(f"   batch {batch_size:4d}: {rate:8.1f} images/sec")
+        if rate > best_rate:
+            best, best_rate = batch_size, rate
+    print(f"🎯 Using batch size {best} ({threads} threads)")
+    return best
+
+
+# ----------------------------
+# Inference
+# ----------------------------
+
+def predict_folder(
+    test_dir: str,
+    out_file: str = "final_predictions.csv",
+    denoiser_path: str = "denoiser.pth",
+    classifier_path: str = "classifier.pth",
+    backend: str = "torchscript",
+    batch_size: Optional[int] = 64,
+    threads: Optional[int] = None,
+    decode_workers: Optional[int] = None,
+    save_denoised: Optional[str] = None,
+) -> float:
+    """Predict every image of `test_dir` into `out_file`; returns images/sec (decoding included)."""
+    cpus = os.cpu_count() or 1
+    decode_workers = max(1, cpus // 4) if decode_workers is None else decode_workers
+    threads = threads or max(1, cpus - decode_workers)
+    set_threads(threads)
+    predict = compile_model(load_model(denoiser_path, classifier_path), backend, threads)
+    if not batch_size:
+        batch_size = tune_batch_size(predict, threads)
+
+    dataset = NoisyImages(test_dir)
+    # Workers decode the next batches while the model runs on the current one
+    prefetch = {"prefetch_factor": 4} if decode_workers else {}
+    loader = DataLoader(dataset, batch_size=batch_size, shuffle=False, num_workers=decode_workers,
+                        collate_fn=collate, **prefetch)
+    if save_denoised:
+        os.makedirs(save_denoised, exist_ok=True)
+    # PNG encoding runs beside the model instead of between batches
+    saver = ThreadPoolExecutor(max_workers=2) if save_denoised else None
+    pending: List = []
+
+    print(f"🚀 {len(dataset)} images, backend={backend}, batch={batch_size}, "
+          f"threads={threads}, decode workers={decode_workers}")
+    done, compute = 0, 0.0
+    start = time.perf_counter()
+    with open(out_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Images", "Predicted_Classes"])
+        for images, names in loader:
+            t = time.perf_counter()
+            denoised, classes = predict(images)
+            compute += time.perf_counter() - t
+
+            writer.writerows(zip(names, (int(c) + 1 for c in classes)))  # classes 1-5
+            f.flush()
+            if saver:
+                pending.append(saver.submit(_save_images, denoised, names, save_denoised))
+            done += len(names)
+    if saver:
+        saver.shutdown(wait=True)
+        for future in pending:
+            future.result()  # re-raise a failed save
+    elapsed = time.perf_counter() - start
+
+    rate = done / elapsed if elapsed else 0.0
+    print(f"✅ {done} predictions written to {out_file} in {elapsed:.2f}s: "
+          f"{rate:.1f} images/sec ({done / compute if compute else 0:.1f} images/sec model only)")
+    if save_denoised:
+        print(f"🖼️ Denoised images saved to {save_denoised}")
+    return rate
+
+
+def _save_images(denoised: np.ndarray, names: List[str], output_dir: str) -> None:
+    for pixels, name in zip(denoised, names):
+        path = os.path.join(output_dir, os.path.splitext(name)[0] + ".png")
+        Image.fromarray(pixels.transpose(1, 2, 0)).save(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("test_dir", help="folder of noisy test images")
+    parser.add_argument("-o", "--out", default="final_predictions.csv")
+    parser.add_argument("--denoiser", default="denoiser.pth")
+    parser.add_argument("--classifier", default="classifier.pth")
+    parser.add_argument("--backend", choices=BACKENDS, default="torchscript")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--tune", action="store_true", help="measure batch sizes first and use the fastest")
+    parser.add_argument("--threads", type=int, help="intra-op threads (default: cores not used for decoding)")
+    parser.add_argument("--decode-workers", type=int, help="image decoding processes (default: cores / 4)")
+    parser.add_argument("--save-denoised", metavar="DIR", help="also write the denoised images as PNG")
+    args = parser.parse_args()
+
+    predict_folder(
+        args.test_dir, args.out, args.denoiser, args.classifier, args.backend,
+        batch_size=None if args.tune else args.batch_size,
+        threads=args.threads, decode_workers=args.decode_workers, save_denoised=args.save_denoised,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+# Challenge-2/simplifier.py
+"""
+Classical text simplifier: phrase and word mappings learned from
+simplification_dataset_train.csv, applied in a single pass, with a WordNet
+fallback for complex words the mappings don't cover.
+
+    python simplifier.py predict                   # test set -> simplification_predictions.csv
+    python simplifier.py evaluate --workers 4      # corpus BLEU against the test references
+    python simplifier.py bench --sentences 1000000
+
+- All mappings (top 200 phrases, top 500 words) go into one token trie. A
+  sentence is scanned once, left to right, and at every position the
+  longest matching phrase wins. Phrases and words therefore no longer
+  compete through the order they are applied in, and the cost per sentence
+  doesn't grow with the number of rules.
+- WordNet synonyms are looked up once per word of the training vocabulary
+  and stored with the lexicon (lexicon.json); words outside it are looked
+  up on first use and memoized. Without nltk/WordNet the fallback is off.
+- simplify_many() streams sentences through worker processes in chunks and
+  can write the predictions CSV as it goes; BLEU statistics are gathered
+  per chunk in parallel the same way.
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+import multiprocessing as mp
+from collections import Counter, deque
+from difflib import SequenceMatcher
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TRAIN_CSV = os.path.join(HERE, "Original_Dataset", "simplification_dataset_train.csv")
+TEST_CSV = os.path.join(HERE, "Original_Dataset", "simplification_dataset_test.csv")
+LEXICON_PATH = os.path.join(HERE, "lexicon.json")
+PREDICTIONS_CSV = os.path.join(HERE, "simplification_predictions.csv")
+
+TOP_PHRASES = 200
+TOP_WORDS = 500
+MAX_PHRASE = 6        # longest source phrase (tokens) kept as a mapping
+MIN_COMPLEX_LEN = 9   # shorter words are never sent to WordNet
+CHUNK_SIZE = 2000     # sentences per task for the worker processes
+MAX_ORDER = 4         # BLEU-4
+
+_TOKEN_RE = re.compile(r"\w+(?:[-.]\w+)*|'\w+|[^\w\s]")
+_END = ""  # trie key holding the replacement of the phrase ending at that node
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words and punctuation ("institution's," -> institution 's ,)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def read_pairs(path: str) -> List[Tuple[str, str]]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [(row["original"], row["simplified"]) for row in csv.DictReader(f)]
+
+
+# ----------------------------
+# Learning the mappings
+# ----------------------------
+
+def _top(counter: Counter, k: int) -> Dict[Tuple[str, ...], str]:
+    """The `k` most frequent sources, each with its most frequent replacement."""
+    best: Dict[Tuple[str, ...], str] = {}
+    for (source, target), _ in counter.most_common():
+        if source not in best:
+            best[source] = target
+            if len(best) >= k:
+                break
+    return best
+
+
+def learn_mappings(
+    pairs: Iterable[Tuple[str, str]],
+    top_phrases: int = TOP_PHRASES,
+    top_words: int = TOP_WORDS,
+) -> Dict[Tuple[str, ...], str]:
+    """Source token tuple -> replacement, from the spans that differ between each original and its simplification."""
+    words: Counter = Counter()
+    phrases: Counter = Counter()
+    for original, simplified in pairs:
+        a, b = tokenize(original), tokenize(simplified)
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+            if tag != "replace" or i2 - i1 > MAX_PHRASE:
+                continue
+            source = tuple(a[i1:i2])
+            (words if len(source) == 1 else phrases)[(source, " ".join(b[j1:j2]))] += 1
+    mappings = _top(words, top_words)
+    mappings.update(_top(phrases, top_phrases))
+    return mappings
+
+
+# ----------------------------
+# WordNet fallback
+# ----------------------------
+
+def _wordnet():
+    try:
+        from nltk.corpus import wordnet
+        wordnet.ensure_loaded()
+        return wordnet
+    except (ImportError, LookupError) as e:
+        print(f"⚠️ WordNet not available, synonym fallback disabled: {e}", file=sys.stderr)
+        return None
+
+
+def wordnet_synonym(word: str, wordnet=None) -> Optional[str]:
+    """Shortest single-word WordNet synonym that is shorter than `word`, or None."""
+    if wordnet is None or len(word) < MIN_COMPLEX_LEN or not word.isalpha():
+        return None
+    candidates = {
+        lemma.name().lower()
+        for synset in wordnet.synsets(word)
+        for lemma in synset.lemmas()
+        if "_" not in lemma.name()
+    }
+    candidates = [c for c in candidates if c != word and len(c) < len(word)]
+    return min(candidates, key=lambda c: (len(c), c)) if candidates else None
+
+
+def synonym_table(pairs: Sequence[Tuple[str, str]], mappings: Dict[Tuple[str, ...], str]) -> Dict[str, str]:
+    """
+    WordNet synonyms for the complex words of the training originals, looked
+    up once. Words the references keep (they occur in a simplified sentence)
+    and words the mappings already cover are left alone.
+    """
+    wordnet = _wordnet()
+    if wordnet is None:
+        return {}
+    kept = {w for _, simplified in pairs for w in tokenize(simplified)}
+    vocab = {w for original, _ in pairs for w in tokenize(original)} - kept
+    table = {}
+    for word in sorted(vocab):
+        if (word,) in mappings:
+            continue
+        synonym = wordnet_synonym(word, wordnet)
+        if synonym:
+            table[word] = synonym
+    return table
+
+
+# ----------------------------
+# Simplifier
+# ----------------------------
+
+class Simplifier:
+    """Single-pass, longest-match phrase/word substitution with a memoized synonym fallback."""
+
+    def __init__(
+        self,
+        mappings: Dict[Tuple[str, ...], str],
+        synonyms: Optional[Dict[str, str]] = None,
+        kept: Iterable[str] = (),
+        wordnet_fallback: bool = True,
+    ):
+        self.mappings = mappings
+        self.synonyms = dict(synonyms or {})
+        # Words seen in a training sentence (the table covers them); only unseen words go to WordNet
+        self.kept = frozenset(kept)
+        self.trie: Dict[str, Any] = {}
+        for source, target in mappings.items():
+            node = self.trie
+            for token in source:
+                node = node.setdefault(token, {})
+            node[_END] = target.split()
+        self.wordnet_fallback = wordnet_fallback
+        self._wordnet = None  # loaded on the first word outside the training vocabulary
+        self._memo: Dict[str, str] = {}
+
+    def __getstate__(self):
+        # Worker processes get the tables; each loads WordNet itself if it needs it
+        state = dict(self.__dict__, _wordnet=None)
+        state["_memo"] = {}
+        return state
+
+    def _lookup(self, word: str) -> str:
+        if word in self.synonyms:
+            return self.synonyms[word]
+        if not self.wordnet_fallback or word in self.kept or len(word) < MIN_COMPLEX_LEN:
+            return word
+        if self._wordnet is None:
+            self._wordnet = _wordnet()
+            if self._wordnet is None:
+                self.wordnet_fallback = False
+                return word
+        return wordnet_synonym(word, self._wordnet) or word
+
+    def simplify_tokens(self, tokens: Sequence[str]) -> List[str]:
+        out: List[str] = []
+        append, extend, trie, memo = out.append, out.extend, self.trie, self._memo
+        i, n = 0, len(tokens)
+        while i < n:
+            node, match, end = trie, None, i
+            j = i
+            # Walk the trie as far as the tokens allow, remembering the longest complete phrase
+            while j < n:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    match, end = node[_END], j
+            if match is not None:
+                extend(match)
+                i = end
+            else:
+                word = memo.get(tokens[i])
+                if word is None:
+                    word = memo[tokens[i]] = self._lookup(tokens[i])
+                append(word)
+                i += 1
+        return out
+
+    def simplify(self, sentence: str) -> str:
+        return " ".join(self.simplify_tokens(tokenize(sentence)))
+
+    # -- persistence --
+
+    @classmethod
+    def train(cls, path: str = TRAIN_CSV, top_phrases: int = TOP_PHRASES, top_words: int = TOP_WORDS) -> "Simplifier":
+        pairs = read_pairs(path)
+        mappings = learn_mappings(pairs, top_phrases, top_words)
+        kept = {w for original, simplified in pairs for w in tokenize(original) + tokenize(simplified)}
+        return cls(mappings, synonym_table(pairs, mappings), kept)
+
+    def save(self, path: str = LEXICON_PATH) -> None:
+        data = {
+            "mappings": [[" ".join(source), target] for source, target in sorted(self.mappings.items())],
+            "synonyms": self.synonyms,
+            "kept": sorted(self.kept),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+
+    @classmethod
+    def load(cls, path: str = LEXICON_PATH, wordnet_fallback: bool = True) -> "Simplifier":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        mappings = {tuple(source.split()): target for source, target in data["mappings"]}
+        return cls(mappings, data["synonyms"], data["kept"], wordnet_fallback)
+
+
+def get_simplifier(lexicon: str = LEXICON_PATH, train_csv: str = TRAIN_CSV, rebuild: bool = False) -> Simplifier:
+    """The saved lexicon, (re)learned from the training CSV if missing or older than it."""
+    if rebuild or not os.path.exists(lexicon) or os.path.getmtime(lexicon) < os.path.getmtime(train_csv):
+        simplifier = Simplifier.train(train_csv)
+        simplifier.save(lexicon)
+        print(f"📚 Learned {len(simplifier.mappings)} mappings and {len(simplifier.synonyms)} "
+              f"synonyms -> {lexicon}", file=sys.stderr)
+        return simplifier
+    return Simplifier.load(lexicon)
+
+
+# ----------------------------
+# Batch / streaming API
+# ----------------------------
+
+_WORKER: Optional[Simplifier] = None
+
+
+def _init_worker(simplifier: Simplifier) -> None:
+    global _WORKER
+    _WORKER = simplifier
+
+
+def _simplify_chunk(sentences: List[str]) -> List[str]:
+    return [_WORKER.simplify(s) for s in sentences]
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _pool(workers: int, initializer=None, initargs=()):
+    # fork shares the loaded lexicon with the workers; elsewhere it is pickled once per worker
+    method = "fork" if "fork" in mp.get_all_start_methods() else None
+    return mp.get_context(method).Pool(workers, initializer, initargs)
+
+
+def simplify_many(
+    sentences: Iterable[str],
+    simplifier: Optional[Simplifier] = None,
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+    out: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Simplify `sentences` lazily, in input order, on `workers` processes.
+    With `out`, (Original, Simplified) rows are also appended to that CSV as
+    they are produced, so arbitrarily long inputs run in bounded memory.
+    """
+    simplifier = simplifier or get_simplifier()
+    f = open(out, "w", newline="", encoding="utf-8") if out else None
+    writer = csv.writer(f) if f else None
+    if writer:
+        writer.writerow(["Original", "Simplified"])
+    try:
+        if workers <= 1:
+            for chunk in _chunks(sentences, chunk_size):
+                simplified = [simplifier.simplify(s) for s in chunk]
+                if writer:
+                    writer.writerows(zip(chunk, simplified))
+                yield from simplified
+            return
+        with _pool(workers, _init_worker, (simplifier,)) as pool:
+            # At most 2 chunks per worker in flight (Pool.imap would read the whole input ahead)
+            in_flight: Deque[Tuple[List[str], Any]] = deque()
+            for chunk in itertools.chain(_chunks(sentences, chunk_size), [None]):
+                if chunk is not None:
+                    in_flight.append((chunk, pool.apply_async(_simplify_chunk, (chunk,))))
+                while in_flight and (chunk is None or len(in_flight) >= 2 * workers):
+                    done, result = in_flight.popleft()
+                    simplified = result.get()
+                    if writer:
+                        writer.writerows(zip(done, simplified))
+                    yield from simplified
+    finally:
+        if f:
+            f.close()
+
+
+# ----------------------------
+# BLEU
+# ----------------------------
+
+def _ngrams(tokens: Sequence[str], n: int) -> Counter:
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def bleu_stats(hypothesis: Sequence[str], reference: Sequence[str]) -> List[int]:
+    """[hyp len, ref len, matches_1, total_1, ..., matches_4, total_4] for one sentence."""
+    stats = [len(hypothesis), len(reference)]
+    for n in range(1, MAX_ORDER + 1):
+        hyp, ref = _ngrams(hypothesis, n), _ngrams(reference, n)
+        stats.append(sum(min(count, ref[gram]) for gram, count in hyp.items()))
+        stats.append(max(len(hypothesis) - n + 1, 0))
+    return stats
+
+
+def bleu(stats: Sequence[int], epsilon: float = 0.0) -> float:
+    """BLEU-4 from summed stats; `epsilon` replaces zero matches (sentence-level smoothing)."""
+    hyp_len, ref_len = stats[0], stats[1]
+    log_precision = 0.0
+    for n in range(MAX_ORDER):
+        matches, total = stats[2 + 2 * n], stats[3 + 2 * n]
+        if total == 0 or (matches == 0 and not epsilon):
+            return 0.0
+        log_precision += math.log((matches or epsilon) / total) / MAX_ORDER
+    brevity = 1.0 if hyp_len > ref_len else math.exp(1 - ref_len / max(hyp_len, 1))
+    return brevity * math.exp(log_precision)
+
+
+def _bleu_chunk(pairs: List[Tuple[str, str]]) -> Tuple[List[int], float]:
+    """Summed stats and summed smoothed sentence BLEU of (original, reference) pairs."""
+    total = [0] * (2 + 2 * MAX_ORDER)
+    sentence_sum = 0.0
+    for original, reference in pairs:
+        stats = bleu_stats(_WORKER.simplify_tokens(tokenize(original)), tokenize(reference))
+        total = [a + b for a, b in zip(total, stats)]
+        sentence_sum += bleu(stats, epsilon=0.1)
+    return total, sentence_sum
+
+
+def evaluate(
+    path: str = TEST_CSV,
+    simplifier: Optional[Simplifier] = None,
+    workers: int = 1,
+    chunk_size: int = 100,
+) -> Dict[str, float]:
+    """Corpus BLEU and mean (smoothed) sentence BLEU of the simplifier against a CSV's references."""
+    simplifier = simplifier or get_simplifier()
+    pairs = read_pairs(path)
+    chunks = list(_chunks(pairs, chunk_size))
+    if workers <= 1:
+        _init_worker(simplifier)
+        results = [_bleu_chunk(chunk) for chunk in chunks]
+    else:
+        with _pool(workers, _init_worker, (simplifier,)) as pool:
+            results = pool.map(_bleu_chunk, chunks)
+    stats = [sum(column) for column in zip(*(r[0] for r in results))]
+    return {
+        "sentences": len(pairs),
+        "corpus_bleu": round(bleu(stats), 4),
+        "sentence_bleu": round(sum(r[1] for r in results) / max(len(pairs), 1), 4),
+    }
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+
+def sequential_simplify(sentence: str, mappings: Dict[Tuple[str, ...], str]) -> str:
+    """The former approach for comparison: every phrase rule, then every word rule, one after the other."""
+    text = " " + " ".join(tokenize(sentence)) + " "
+    for source, target in sorted(mappings.items(), key=lambda m: -len(m[0])):
+        text = text.replace(" " + " ".join(source) + " ", " " + target + " ")
+    return text.strip()
+
+
+def benchmark(sentences: int, workers: int, baseline_sentences: int = 10000, seed: int = 0) -> Dict[str, float]:
+    """Sentences/sec at `sentences` sentences, drawn from the train and test originals."""
+    simplifier = get_simplifier()
+    pool = [original for original, _ in read_pairs(TRAIN_CSV) + read_pairs(TEST_CSV)]
+    results: Dict[str, float] = {}
+
+    def corpus(size: int) -> Iterator[str]:
+        rng = random.Random(seed)
+        return (rng.choice(pool) for _ in range(size))
+
+    # The sequential rules are too slow for the full corpus; a sample gives the rate
+    start = time.perf_counter()
+    for sentence in corpus(baseline_sentences):
+        sequential_simplify(sentence, simplifier.mappings)
+    results["sequential_rules_per_sec"] = baseline_sentences / (time.perf_counter() - start)
+
+    for n in sorted({1, workers}):
+        start = time.perf_counter()
+        done = sum(1 for _ in simplify_many(corpus(sentences), simplifier, workers=n))
+        results[f"trie_{n}_workers_per_sec"] = done / (time.perf_counter() - start)
+    return {k: round(v, 1) for k, v in results.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("train", "predict", "evaluate", "bench"))
+    parser.add_argument("--train", default=TRAIN_CSV, help="training CSV (domain,original,simplified)")
+    parser.add_argument("--input", default=TEST_CSV, help="CSV to simplify / evaluate against")
+    parser.add_argument("-o", "--out", default=PREDICTIONS_CSV)
+    parser.add_argument("--lexicon", default=LEXICON_PATH)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sentences", type=int, default=1000000, help="bench: corpus size")
+    args = parser.parse_args()
+
+    simplifier = get_simplifier(args.lexicon, args.train, rebuild=args.command == "train")
+    if args.command == "predict":
+        originals = (original for original, _ in read_pairs(args.input))
+        done = sum(1 for _ in simplify_many(originals, simplifier, args.workers, out=args.out))
+        print(f"✅ {done} simplified sentences written to {args.out}")
+    elif args.command == "evaluate":
+        scores = evaluate(args.input, simplifier, args.workers)
+        print(f"📊 {scores['sentences']} sentences: corpus BLEU {scores['corpus_bleu']:.4f}, "
+              f"mean sentence BLEU {scores['sentence_bleu']:.4f}")
+    elif args.command == "bench":
+        for name, value in benchmark(args.sentences, args.workers).items():
+            print(f"⏱️ {name}: {value:,.1f}")
+
+
+if __name__ == "__main__":
+    main()
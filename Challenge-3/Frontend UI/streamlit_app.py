@@ -1,6 +1,7 @@
+import json
 import streamlit as st
 import requests
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 # Backend URL
 BACKEND_URL = "http://127.0.0.1:8000"
@@ -37,6 +38,19 @@ def api_post(path: str, payload: Dict[str, Any] | None = None) -> Dict[str, Any]
         st.error(f"❌ Could not reach backend: {e}")
         return {}
 
+def api_stream(path: str, payload: Dict[str, Any] | None = None) -> Iterator[Dict[str, Any]]:
+    """POST to a streaming (NDJSON) backend endpoint and yield events as they arrive."""
+    try:
+        with requests.post(f"{BACKEND_URL}{path}", json=payload or {}, stream=True, timeout=(5, 180)) as r:
+            if r.status_code != 200:
+                st.error(f"Backend error {r.status_code}: {r.text}")
+                return
+            for line in r.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
+    except requests.exceptions.RequestException as e:
+        st.error(f"❌ Could not reach backend: {e}")
+
 def label_for_case(case_obj: Any) -> str:
     """Generate short label for sidebar."""
     if isinstance(case_obj, dict):
@@ -74,10 +88,42 @@ if not st.session_state["debate_started"]:
             st.error("⚠️ No case returned from backend")
             st.stop()
 
-        debate_resp = api_post("/debate", {"case": case})
+        # Render turns live while the debate is streamed from the backend
+        st.subheader("📂 Case Details")
+        st.markdown(f"**{case.get('title', 'Untitled Case')}** "
+                    f"({case.get('year', 'N/A')}, {case.get('jurisdiction', 'Unknown')})")
+        st.write(case.get("text", ""))
+        st.subheader("🧑‍⚖️ AI Lawyer Arguments")
+        col1, col2 = st.columns(2)
+        col1.markdown("**Prosecution (RAG Lawyer)**")
+        col2.markdown("**Defense (Chaos Lawyer)**")
+        st.subheader("⚖️ Judge's Random Events")
+        slots = {"prosecution": col1, "defense": col2, "judge": st.container()}
+        placeholders: Dict[tuple, Any] = {}
+        drafts: Dict[tuple, str] = {}
+
+        def slot(role: str, rnd: int):
+            key = (role, rnd)
+            if key not in placeholders:
+                placeholders[key] = slots[role].empty()
+            return placeholders[key]
+
+        debate_resp: Dict[str, Any] = {}
+        with st.spinner("Lawyers are arguing..."):
+            for event in api_stream("/debate/stream", {"case": case}):
+                kind, role, rnd = event.get("type"), event.get("role"), event.get("round")
+                if kind == "token":
+                    drafts[(role, rnd)] = drafts.get((role, rnd), "") + event.get("text", "")
+                    slot(role, rnd).write(f"**Round {rnd}:** {drafts[(role, rnd)]}▌")
+                elif kind == "turn":
+                    slot(role, rnd).write(f"**Round {rnd}:** {event.get('argument')}")
+                elif kind == "done":
+                    debate_resp = event.get("debate", {})
+
         if debate_resp:
             st.session_state["debate"] = debate_resp
             st.session_state["debate_started"] = True
+            st.rerun()
 
 # ----------------------------
 # Active Debate View
@@ -110,7 +156,7 @@ if st.session_state["debate_started"]:
     # Judge events
     st.subheader("⚖️ Judge's Random Events")
     for ev in debate.get("judge_events", []):
-        st.write(f"**Round {ev.get('round')}:** {ev.get('event')}")
+        st.write(f"**Round {ev.get('round')}:** {ev.get('argument', ev.get('event'))}")
 
     st.divider()
 
@@ -126,13 +172,10 @@ if st.session_state["debate_started"]:
 
     if st.button("✅ Submit Verdict & Summarize"):
         debate["judge_decision"] = judge_choice
+        # The backend keeps the transcript; only the session id and verdict are sent.
         payload = {
             "session_id": debate.get("session_id"),
-            "case": case_obj,
-            "case_text": debate.get("case_text", ""),
-            "prosecution": debate.get("prosecution", []),
-            "defense": debate.get("defense", []),
-            "judge_decision": judge_choice,
+            "verdict": judge_choice,
         }
         summ = api_post("/summarize_verdict", payload)
         if summ:
@@ -1,20 +1,36 @@
 # backend/app/__init__.py
 
-# ----------------------------
-# Import wrappers from models
-# ----------------------------
-from backend.app.models import (
-    rag_lawyer_wrapper as rag_lawyer,
-    chaos_lawyer_wrapper as chaos_lawyer,
-    summarize_verdict,
-    judge,
-)
+import importlib
+from typing import Any, List
 
 # ----------------------------
-# Optional: expose generator and retrieval functions
+# Lazily exported names: the module is imported on first attribute access
+# (PEP 562), so `import backend.app.config` doesn't pull in the models,
+# the generator and the retrieval stack.
 # ----------------------------
-from backend.app.generator import generate_case
-from backend.app.retrieval import load_corpus
+_LAZY = {
+    "rag_lawyer": ("backend.app.models", "rag_lawyer_wrapper"),
+    "chaos_lawyer": ("backend.app.models", "chaos_lawyer_wrapper"),
+    "summarize_verdict": ("backend.app.models", "summarize_verdict"),
+    "judge": ("backend.app.models", "judge"),
+    "generate_case": ("backend.app.generator", "generate_case"),
+    "load_corpus": ("backend.app.retrieval", "load_corpus"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module), attr)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY))
+
 
 # ----------------------------
 # Define __all__ for clarity
@@ -0,0 +1,397 @@
+# backend/app/batch.py
+"""
+Debate many cases in one go.
+
+    POST /debate/batch {"case_ids": [1, 2, 3], "cases": [{...}]}    # streams NDJSON
+    POST /debate/batch {"job_id": "..."}                            # resume a job
+    python -m backend.app.batch cases.jsonl -o results.ndjson      # same, without the server
+    python -m backend.app.batch --resume JOB_ID -o results.ndjson
+
+Every batch is a job in a SQLite file (BATCH_DB) and each result is stored
+as soon as its debate finishes, so an interrupted batch (client gone,
+server restarted, Ctrl-C) resumes with only the cases not yet debated.
+
+Debates run concurrently on one event loop, at most BATCH_CONCURRENCY at a
+time across all batches, and their LLM calls share the "debate_batch"
+budget of the CallExecutor. Calls issued together are combined by the
+provider's micro-batcher (LLM_BATCH_SIZE / LLM_BATCH_WINDOW_MS).
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import sqlite3
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.app.config import get_settings
+from backend.app.debate import run_debate
+from backend.app.metrics import BATCH_ITEMS
+from backend.app.sampling import get_sampler
+from backend.app.sessions import connect_sqlite, get_session_store
+
+ENDPOINT = "debate_batch"
+
+
+class JobBusy(RuntimeError):
+    """The job is already being run by another request or process."""
+
+
+def parse_batch(payload: Any) -> List[Any]:
+    """
+    Items of a batch request: {"case_ids": [...], "cases": [...]} or a plain
+    list. Each item is a case object or the id of a corpus case. Raises
+    ValueError if malformed.
+    """
+    if isinstance(payload, dict):
+        items = list(payload.get("case_ids") or []) + list(payload.get("cases") or [])
+    else:
+        items = payload
+    if not isinstance(items, list) or not items:
+        raise ValueError('Expected {"case_ids": [...]}, {"cases": [...]} or a list of cases / case ids')
+    limit = get_settings().BATCH_MAX_CASES
+    if len(items) > limit:
+        raise ValueError(f"{len(items)} cases in one batch, at most {limit} allowed (BATCH_MAX_CASES)")
+    for i, item in enumerate(items):
+        if isinstance(item, dict):
+            if "id" not in item and not str(item.get("text") or item.get("title") or "").strip():
+                raise ValueError(f"Case {i} needs an id, a title or a text")
+        elif isinstance(item, bool) or not isinstance(item, (int, str)):
+            raise ValueError(f"Case {i} is neither a case object nor a case id")
+    return items
+
+
+def resolve_case(item: Any, corpus_path: Optional[str] = None) -> Dict[str, Any]:
+    """The case a batch item stands for; a bare id (or {"id": ...}) is looked up in the corpus."""
+    if isinstance(item, dict) and set(item) != {"id"}:
+        return item
+    case_id = item["id"] if isinstance(item, dict) else item
+    sampler = get_sampler(corpus_path)
+    case = sampler.case(case_id) if sampler is not None else None
+    if case is None:
+        raise LookupError(f"Unknown case id: {case_id}")
+    return case
+
+
+# ----------------------------
+# Job store
+# ----------------------------
+
+class BatchStore:
+    """
+    Batch jobs and their per-case results in a WAL-mode SQLite file, shared
+    by every worker pointing at it. A job is run by one owner at a time: the
+    owner renews its claim while it runs, the claim lapses `lease` seconds
+    after the last renewal, and only the current owner's results are stored.
+    """
+
+    def __init__(self, path: str, lease: float):
+        self.path = path
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batch_jobs ("
+            " id TEXT PRIMARY KEY, total INTEGER NOT NULL, created REAL NOT NULL, updated REAL NOT NULL,"
+            " owner TEXT, heartbeat REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batch_items ("
+            " job_id TEXT NOT NULL, idx INTEGER NOT NULL, item TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending', result TEXT, PRIMARY KEY (job_id, idx))"
+        )
+
+    def create(self, items: List[Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO batch_jobs (id, total, created, updated) VALUES (?, ?, ?, ?)",
+                    (job_id, len(items), now, now),
+                )
+                self._conn.executemany(
+                    "INSERT INTO batch_items (job_id, idx, item) VALUES (?, ?, ?)",
+                    ((job_id, i, json.dumps(item, ensure_ascii=False)) for i, item in enumerate(items)),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT total, created, updated, owner, heartbeat FROM batch_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM batch_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+        total, created, updated, owner, heartbeat = row
+        return {
+            "job_id": job_id,
+            "total": total,
+            "completed": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "pending": counts.get("pending", 0),
+            "running": owner is not None and heartbeat is not None and time.time() - heartbeat < self.lease,
+            "created": created,
+            "updated": updated,
+        }
+
+    def pending(self, job_id: str, retry_failed: bool = False) -> List[Tuple[int, Any]]:
+        statuses = "('pending', 'failed')" if retry_failed else "('pending')"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT idx, item FROM batch_items WHERE job_id = ? AND status IN {statuses} ORDER BY idx",
+                (job_id,),
+            ).fetchall()
+        return [(idx, json.loads(item)) for idx, item in rows]
+
+    def results(self, job_id: str) -> List[Dict[str, Any]]:
+        """Stored result / error events of a job, in case order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT result FROM batch_items WHERE job_id = ? AND result IS NOT NULL ORDER BY idx", (job_id,)
+            ).fetchall()
+        return [json.loads(result) for (result,) in rows]
+
+    def finish(self, job_id: str, index: int, event: Dict[str, Any], owner: str) -> bool:
+        """Store a result / error event; False if `owner` no longer holds the job."""
+        status = "done" if event["type"] == "result" else "failed"
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.execute(
+                    "UPDATE batch_jobs SET updated = ?, heartbeat = ? WHERE id = ? AND owner = ?",
+                    (now, now, job_id, owner),
+                )
+                if cur.rowcount == 1:
+                    self._conn.execute(
+                        "UPDATE batch_items SET status = ?, result = ? WHERE job_id = ? AND idx = ?",
+                        (status, json.dumps(event, ensure_ascii=False), job_id, index),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cur.rowcount == 1
+
+    def claim(self, job_id: str, owner: str) -> bool:
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE batch_jobs SET owner = ?, heartbeat = ? WHERE id = ?"
+                " AND (owner IS NULL OR owner = ? OR heartbeat < ?)",
+                (owner, now, job_id, owner, now - self.lease),
+            )
+        return cur.rowcount == 1
+
+    def renew(self, job_id: str, owner: str) -> bool:
+        """Extend `owner`'s claim; False if the job was taken over."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE batch_jobs SET heartbeat = ? WHERE id = ? AND owner = ?", (time.time(), job_id, owner)
+            )
+        return cur.rowcount == 1
+
+    def release(self, job_id: str, owner: str) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("UPDATE batch_jobs SET owner = NULL WHERE id = ? AND owner = ?", (job_id, owner))
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not release batch job {job_id}: {e}")
+
+
+@lru_cache
+def get_batch_store() -> BatchStore:
+    settings = get_settings()
+    return BatchStore(settings.BATCH_DB, lease=settings.DEBATE_TIMEOUT + 60)
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+
+# Debates in flight per event loop, shared by all batches on it
+_DEBATE_SLOTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _debate_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slots = _DEBATE_SLOTS.get(loop)
+    if slots is None:
+        slots = _DEBATE_SLOTS[loop] = asyncio.Semaphore(get_settings().BATCH_CONCURRENCY)
+    return slots
+
+
+async def _debate_item(job_id: str, index: int, item: Any, corpus_path: Optional[str]) -> Dict[str, Any]:
+    base = {"job_id": job_id, "index": index}
+    try:
+        case = await asyncio.to_thread(resolve_case, item, corpus_path)
+        async with _debate_slots():
+            debate = {"session_id": str(uuid.uuid4()), **await run_debate(case, endpoint=ENDPOINT)}
+        await asyncio.to_thread(get_session_store().put, debate["session_id"], debate)
+        return {"type": "result", **base, "case_id": case.get("id"), "debate": debate}
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        return {"type": "error", **base, "item": item, "error": str(e) or type(e).__name__}
+
+
+async def run_batch(
+    job_id: str,
+    store: Optional[BatchStore] = None,
+    replay: bool = False,
+    retry_failed: bool = False,
+    corpus_path: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the cases of a job that have no result yet, yielding events as
+    debates finish (in completion order):
+
+      {"type": "job",    "job_id": ..., "total": n, "completed": k, ...}
+      {"type": "result", "job_id": ..., "index": i, "case_id": ..., "debate": {...}}
+      {"type": "error",  "job_id": ..., "index": i, "item": ..., "error": "..."}
+      {"type": "done",   "job_id": ..., "total": n, "completed": k, "failed": f, "elapsed": s}
+
+    With `replay`, stored results are sent after the "job" event. Raises
+    KeyError for an unknown job and JobBusy if someone else is running it,
+    both before the first event. Stopping iteration cancels the debates in
+    flight; their cases stay pending for the next run.
+    """
+    store = store or get_batch_store()
+    start = time.perf_counter()
+    job = await asyncio.to_thread(store.job, job_id)
+    if job is None:
+        raise KeyError(job_id)
+    owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+    if not await asyncio.to_thread(store.claim, job_id, owner):
+        raise JobBusy(f"Batch job {job_id} is already running")
+
+    async def heartbeat() -> None:
+        # Debates may wait for a slot behind other batches for longer than the lease.
+        while True:
+            await asyncio.sleep(store.lease / 3)
+            try:
+                if not await asyncio.to_thread(store.renew, job_id, owner):
+                    print(f"⚠️ Batch job {job_id} was taken over")
+                    return
+            except Exception as e:
+                print(f"⚠️ Could not renew batch job {job_id}: {e}")
+
+    tasks: List["asyncio.Task[None]"] = [asyncio.create_task(heartbeat())]
+    try:
+        yield {"type": "job", **job}
+        if replay:
+            for event in await asyncio.to_thread(store.results, job_id):
+                yield event
+
+        items = await asyncio.to_thread(store.pending, job_id, retry_failed)
+        todo = iter(items)
+        finished: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+        async def worker() -> None:
+            for index, item in todo:  # shared iterator: each case is taken by one worker
+                event = await _debate_item(job_id, index, item, corpus_path)
+                try:
+                    if not await asyncio.to_thread(store.finish, job_id, index, event, owner):
+                        print(f"⚠️ Batch job {job_id} was taken over; result {index} not stored")
+                except Exception as e:
+                    print(f"⚠️ Could not store batch result {job_id}/{index}: {e}")
+                BATCH_ITEMS.inc(outcome="ok" if event["type"] == "result" else "error")
+                await finished.put(event)
+
+        tasks += [asyncio.create_task(worker()) for _ in range(min(get_settings().BATCH_CONCURRENCY, len(items)))]
+        for _ in range(len(items)):
+            yield await finished.get()
+
+        job = await asyncio.to_thread(store.job, job_id)
+        yield {"type": "done", **job, "elapsed": round(time.perf_counter() - start, 2)}
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.to_thread(store.release, job_id, owner)
+
+
+# ----------------------------
+# Command line
+# ----------------------------
+
+def read_items(paths: List[str]) -> List[Any]:
+    """Batch items from JSONL files: one case object or case id per line."""
+    items: List[Any] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for i, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    items.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    print(f"⚠️ Skipping invalid JSON at {path}:{i}: {e}", file=sys.stderr)
+    return items
+
+
+async def _run_cli(job_id: str, out: Any, replay: bool, retry_failed: bool, corpus_path: Optional[str]) -> None:
+    async for event in run_batch(job_id, replay=replay, retry_failed=retry_failed, corpus_path=corpus_path):
+        out.write(json.dumps(event, ensure_ascii=False) + "\n")
+        out.flush()
+        if event["type"] in ("result", "error"):
+            status = "✅" if event["type"] == "result" else f"⚠️ {event['error']}"
+            print(f"{status} case {event['index']}", file=sys.stderr)
+        elif event["type"] == "done":
+            print(f"🏁 {event['completed']}/{event['total']} debated, {event['failed']} failed "
+                  f"in {event['elapsed']}s", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="JSONL files with one case object or case id per line")
+    parser.add_argument("--ids", help="comma-separated corpus case ids")
+    parser.add_argument("--resume", metavar="JOB_ID", help="continue an earlier job instead of starting one")
+    parser.add_argument("--replay", action="store_true", help="with --resume, also write the stored results")
+    parser.add_argument("--retry-failed", action="store_true", help="with --resume, debate failed cases again")
+    parser.add_argument("--corpus", default=get_settings().CORPUS_PATH)
+    parser.add_argument("-o", "--out", help="NDJSON output (appended to; default stdout)")
+    args = parser.parse_args()
+
+    if args.resume:
+        job_id = args.resume
+    else:
+        items = read_items(args.files) + [i.strip() for i in (args.ids or "").split(",") if i.strip()]
+        try:
+            items = parse_batch(items)
+        except ValueError as e:
+            sys.exit(f"⚠️ {e}")
+        job_id = get_batch_store().create(items)
+        print(f"📋 Batch job {job_id} with {len(items)} cases", file=sys.stderr)
+
+    out = open(args.out, "a", encoding="utf-8") if args.out else sys.stdout
+    try:
+        asyncio.run(_run_cli(job_id, out, args.replay, args.retry_failed, args.corpus))
+    except KeyError:
+        sys.exit(f"⚠️ Unknown batch job: {job_id}")
+    except JobBusy as e:
+        sys.exit(f"⚠️ {e}")
+    except KeyboardInterrupt:
+        sys.exit(f"⏸️ Interrupted; continue with --resume {job_id}")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
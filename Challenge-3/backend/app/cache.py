@@ -0,0 +1,277 @@
+# backend/app/cache.py
+
+import json
+import time
+import asyncio
+import random
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from backend.app.config import get_settings
+from backend.app.metrics import annotate
+from backend.app.sessions import connect_sqlite
+
+# ----------------------------
+# Determinism policies
+# ----------------------------
+#
+#   "deterministic"  cache only when TEMPERATURE == 0; one response per key
+#   "variants"       keep up to CACHE_VARIANTS responses per key; misses until
+#                    the key has that many, then serve one of them at random
+#   "off"            never cache
+
+POLICIES = ("deterministic", "variants", "off")
+
+
+def cache_key(role: str, *parts: Any, provider: str = "", model: str = "") -> str:
+    """Content address for an LLM call: sha256 over provider, model, role and prompt parts."""
+    payload = json.dumps([provider, model, role, parts], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier response cache: an in-memory LRU in front of an optional
+    SQLite table. Disk hits are promoted into memory. Async callers use
+    aget/aput, which answer from memory inline and only take the SQLite
+    tier to a thread.
+    """
+
+    def __init__(
+        self,
+        policy: str = "variants",
+        variants: int = 3,
+        temperature: float = 0.0,
+        max_items: int = 10_000,
+        disk_path: Optional[str] = None,
+        max_disk_items: int = 1_000_000,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown cache policy {policy!r}, expected one of {POLICIES}")
+        self.policy = policy
+        self.variants = 1 if policy == "deterministic" else max(1, variants)
+        self.temperature = temperature
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items
+        self._memory: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.disk_hits = 0
+
+        self._conn = None
+        if disk_path:
+            self._conn = connect_sqlite(disk_path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT NOT NULL, variant INTEGER NOT NULL, value TEXT NOT NULL, created REAL NOT NULL,"
+                " PRIMARY KEY (key, variant))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+
+    @property
+    def enabled(self) -> bool:
+        if self.policy == "off":
+            return False
+        if self.policy == "deterministic":
+            return self.temperature == 0
+        return True
+
+    # ----------------------------
+    # Tiers
+    # ----------------------------
+
+    def _load(self, key: str) -> List[str]:
+        values = self._memory.get(key)
+        if values is not None:
+            self._memory.move_to_end(key)
+            return values
+        if self._conn is None:
+            return []
+        rows = self._conn.execute(
+            "SELECT value FROM responses WHERE key = ? ORDER BY variant", (key,)
+        ).fetchall()
+        values = [row[0] for row in rows]
+        if values:
+            self.disk_hits += 1
+            self._remember(key, values)
+        return values
+
+    def _remember(self, key: str, values: List[str]) -> None:
+        self._memory[key] = values
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _pick(self, values: List[str], role: str) -> Optional[str]:
+        if len(values) >= self.variants:
+            self.hits[role] += 1
+            return random.choice(values)
+        self.misses[role] += 1
+        return None
+
+    def get(self, key: str, role: str = "") -> Optional[str]:
+        """Cached response for `key`, or None if the policy wants a fresh call."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._pick(self._load(key), role)
+
+    async def aget(self, key: str, role: str = "") -> Optional[str]:
+        """get() for the event loop: memory hits inline, disk lookups in a thread."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._conn is None or key in self._memory:
+                return self._pick(self._load(key), role)
+        return await asyncio.to_thread(self.get, key, role)
+
+    def put(self, key: str, value: str) -> None:
+        if not self.enabled or not isinstance(value, str):
+            return
+        with self._lock:
+            values = list(self._load(key))
+            if len(values) >= self.variants or value in values:
+                return
+            values.append(value)
+            self._remember(key, values)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, variant, value, created) VALUES (?, ?, ?, ?)",
+                    (key, len(values) - 1, value, time.time()),
+                )
+                self._puts += 1
+                if self._puts % 1000 == 0:
+                    self._trim_disk()
+
+    async def aput(self, key: str, value: str) -> None:
+        """put() for the event loop; the disk write runs in a thread."""
+        if self._conn is not None:
+            await asyncio.to_thread(self.put, key, value)
+        else:
+            self.put(key, value)
+
+    def _trim_disk(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        excess = count - self.max_disk_items
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE rowid IN (SELECT rowid FROM responses ORDER BY created LIMIT ?)",
+                (excess,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "policy": self.policy,
+            "enabled": self.enabled,
+            "variants": self.variants,
+            "memory_items": len(self._memory),
+            "hits": hits,
+            "misses": misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "by_role": {
+                role: {"hits": self.hits[role], "misses": self.misses[role]}
+                for role in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+
+_CACHE: Optional[ResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache; built under a lock since the first calls arrive concurrently from worker threads."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                settings = get_settings()
+                _CACHE = ResponseCache(
+                    policy=settings.CACHE_POLICY,
+                    variants=settings.CACHE_VARIANTS,
+                    temperature=settings.TEMPERATURE,
+                    max_items=settings.CACHE_MAX_ITEMS,
+                    disk_path=settings.CACHE_DB or None,
+                )
+    return _CACHE
+
+
+def _tee(chunks: Iterator[str], on_complete: Callable[[str], None]) -> Iterator[str]:
+    """Pass a token stream through, storing the full text once it completes."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    on_complete("".join(parts))
+
+
+async def _atee(chunks: AsyncIterator[str], on_complete: Callable[[str], Awaitable[None]]) -> AsyncIterator[str]:
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    await on_complete("".join(parts))
+
+
+def _key_for(role: str, args: tuple, kwargs: dict) -> str:
+    settings = get_settings()
+    provider = "mock" if settings.USE_MOCK else settings.PROVIDER
+    return cache_key(role, args, kwargs, provider=provider, model=settings.MODEL)
+
+
+def cached(role: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator for LLM role functions (sync or async): the key covers the
+    provider, model, role and every argument, so the same case/round/context
+    hits the cache. Sync and async functions for the same role share entries.
+    """
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                cache = get_response_cache()
+                if not cache.enabled:
+                    return await fn(*args, **kwargs)
+                key = _key_for(role, args, kwargs)
+                hit = await cache.aget(key, role)
+                annotate(cache="miss" if hit is None else "hit")
+                if hit is not None:
+                    return hit
+                result = await fn(*args, **kwargs)
+                if isinstance(result, AsyncIterator):
+                    return _atee(result, lambda text: cache.aput(key, text))
+                await cache.aput(key, result)
+                return result
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache = get_response_cache()
+            if not cache.enabled:
+                return fn(*args, **kwargs)
+            key = _key_for(role, args, kwargs)
+            hit = cache.get(key, role)
+            annotate(cache="miss" if hit is None else "hit")
+            if hit is not None:
+                return hit
+            result = fn(*args, **kwargs)
+            if isinstance(result, Iterator):
+                return _tee(result, lambda text: cache.put(key, text))
+            cache.put(key, result)
+            return result
+        return wrapper
+    return decorator
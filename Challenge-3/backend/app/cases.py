@@ -0,0 +1,315 @@
+# backend/app/cases.py
+
+import json
+import copy
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+# ----------------------------
+# Columnar layout
+# ----------------------------
+#
+#   ids            int64 per case
+#   years          int32 per case
+#   jurisdictions  int32 per case, code into `strings`
+#   tag_offsets    int64 [count + 1]; case i owns tag_codes[tag_offsets[i]:tag_offsets[i + 1]]
+#   tag_codes      int32, codes into `strings`
+#   text_offsets   int64 [2 * count + 1]; title i is arena[2i:2i + 1], text i is arena[2i + 1:2i + 2]
+#   arena          UTF-8 bytes of every title and text, back to back
+#   present        uint8 bitmask per case of which FIELDS it has
+#
+# Jurisdictions and tags are interned once in `strings`. Values that don't
+# fit their column (a year of "N/A", a non-integer id) and any other keys are
+# kept per case as JSON in `extra`. A million cases is a handful of numpy
+# buffers instead of millions of dicts, lists and strings, so forked workers
+# don't copy the corpus page by page as refcounts change.
+
+FIELDS = ("id", "title", "year", "jurisdiction", "tags", "text")
+_BIT = {name: 1 << i for i, name in enumerate(FIELDS)}
+
+_INT32 = (-2 ** 31, 2 ** 31 - 1)
+_INT64 = (-2 ** 63, 2 ** 63 - 1)
+# Cases buffered per column append while building
+_CHUNK = 65536
+
+
+def _is_int(value: Any, bounds: tuple) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and bounds[0] <= value <= bounds[1]
+
+
+class _Buffer:
+    """Append-only numpy buffer with spare capacity. Rows below `size` never change."""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype: Any, data: Optional[np.ndarray] = None):
+        self.data = data if data is not None else np.empty(0, dtype=dtype)
+        self.size = len(self.data)
+
+    def append(self, values: Any) -> None:
+        values = np.asarray(values, dtype=self.data.dtype)
+        end = self.size + len(values)
+        if end > len(self.data):
+            # Readers holding the old array still see every row they can index.
+            grown = np.empty(max(end, 2 * len(self.data), 1024), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+    def copy(self, size: int) -> "_Buffer":
+        return _Buffer(self.data.dtype, self.data[:size].copy())
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.data.itemsize
+
+
+class Case(Mapping):
+    """
+    Immutable, dict-compatible view of one case in a CaseTable: `case["title"]`,
+    `case.get("tags")`, `dict(case)` and `{**case}` all work, and so do the
+    attributes `case.id`, `case.title`, ... Nothing is stored per case
+    besides the table reference and the row; values are decoded on access.
+    Use to_dict() for a plain (mutable) copy.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "CaseTable", row: int):
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_row", row)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Case is immutable")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table._value(self._row, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table._keys(self._row))
+
+    def __len__(self) -> int:
+        return len(self._table._keys(self._row))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: self._table._value(self._row, key) for key in self._table._keys(self._row)}
+
+    def __repr__(self) -> str:
+        return f"Case({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Pickle the values, not the whole table
+        return (Case.from_dict, (self.to_dict(),))
+
+    @staticmethod
+    def from_dict(case: Dict[str, Any]) -> "Case":
+        return CaseTable([case])[0]
+
+    @property
+    def id(self) -> Any:
+        return self.get("id")
+
+    @property
+    def title(self) -> Optional[str]:
+        return self.get("title")
+
+    @property
+    def text(self) -> Optional[str]:
+        return self.get("text")
+
+    @property
+    def year(self) -> Any:
+        return self.get("year")
+
+    @property
+    def jurisdiction(self) -> Optional[str]:
+        return self.get("jurisdiction")
+
+    @property
+    def tags(self) -> List[str]:
+        return self.get("tags") or []
+
+
+class CaseTable(Sequence):
+    """
+    Columnar, append-only store of cases (see the layout above); indexing
+    returns Case views.
+
+    A table is never changed once built: extend() returns a successor that
+    appends to the same buffers, and every table only reads its own first
+    `count` rows, so holders of an older table keep a consistent corpus.
+    Extending a table that already has a successor copies its buffers first.
+    """
+
+    def __init__(self, cases: Iterable[Dict[str, Any]] = ()):
+        self.count = 0
+        self._ids = _Buffer(np.int64)
+        self._years = _Buffer(np.int32)
+        self._jurisdictions = _Buffer(np.int32)
+        self._present = _Buffer(np.uint8)
+        self._tag_offsets = _Buffer(np.int64, np.zeros(1, dtype=np.int64))
+        self._tag_codes = _Buffer(np.int32)
+        self._text_offsets = _Buffer(np.int64, np.zeros(1, dtype=np.int64))
+        self._arena = bytearray()
+        self._strings: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._extra: Dict[int, bytes] = {}
+        self._lock = threading.Lock()  # shared by a table and its successors
+        self._add(cases)
+
+    def extend(self, cases: Iterable[Dict[str, Any]]) -> "CaseTable":
+        new = copy.copy(self)
+        with self._lock:
+            if self._ids.size != self.count:
+                new._fork()
+            new._add(cases)
+        return new
+
+    def _fork(self) -> None:
+        """Private copies of the buffers, cut at this table's count."""
+        n = self.count
+        self._ids, self._years = self._ids.copy(n), self._years.copy(n)
+        self._jurisdictions, self._present = self._jurisdictions.copy(n), self._present.copy(n)
+        n_tags = int(self._tag_offsets.data[n])
+        self._tag_offsets, self._tag_codes = self._tag_offsets.copy(n + 1), self._tag_codes.copy(n_tags)
+        self._arena = bytearray(self._arena[:int(self._text_offsets.data[2 * n])])
+        self._text_offsets = self._text_offsets.copy(2 * n + 1)
+        self._strings, self._codes = list(self._strings), dict(self._codes)
+        self._extra = {row: value for row, value in self._extra.items() if row < n}
+        self._lock = threading.Lock()
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+
+    def _code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._strings)
+            self._strings.append(name)  # the dict key and the list share one string object
+        return code
+
+    def _add(self, cases: Iterable[Dict[str, Any]]) -> None:
+        chunk: List[Dict[str, Any]] = []
+        for case in cases:
+            chunk.append(case)
+            if len(chunk) == _CHUNK:
+                self._add_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._add_chunk(chunk)
+
+    def _add_chunk(self, cases: List[Dict[str, Any]]) -> None:
+        n = len(cases)
+        ids = np.zeros(n, dtype=np.int64)
+        years = np.full(n, -1, dtype=np.int32)
+        jurisdictions = np.full(n, -1, dtype=np.int32)
+        present = np.zeros(n, dtype=np.uint8)
+        tag_counts = np.zeros(n, dtype=np.int64)
+        tag_codes: List[int] = []
+        text_lengths = np.zeros(2 * n, dtype=np.int64)
+        arena = bytearray()
+
+        for i, case in enumerate(cases):
+            bits = 0
+            title = text = b""
+            extra: Dict[str, Any] = {}
+            for key, value in case.items():
+                if key == "id" and _is_int(value, _INT64):
+                    ids[i] = value
+                elif key == "year" and _is_int(value, _INT32):
+                    years[i] = value
+                elif key == "jurisdiction" and isinstance(value, str):
+                    jurisdictions[i] = self._code(value)
+                elif key == "tags" and isinstance(value, list) and all(isinstance(t, str) for t in value):
+                    tag_codes.extend(self._code(t) for t in value)
+                    tag_counts[i] = len(value)
+                elif key == "title" and isinstance(value, str):
+                    title = value.encode("utf-8")
+                elif key == "text" and isinstance(value, str):
+                    text = value.encode("utf-8")
+                else:
+                    extra[key] = value
+                    continue
+                bits |= _BIT[key]
+            # Title then text, whatever the key order was
+            text_lengths[2 * i], text_lengths[2 * i + 1] = len(title), len(text)
+            arena += title
+            arena += text
+            present[i] = bits
+            if extra:
+                self._extra[self.count + i] = json.dumps(extra, ensure_ascii=False).encode("utf-8")
+
+        self._ids.append(ids)
+        self._years.append(years)
+        self._jurisdictions.append(jurisdictions)
+        self._present.append(present)
+        self._tag_codes.append(np.asarray(tag_codes, dtype=np.int32))
+        self._tag_offsets.append(self._tag_offsets.data[self._tag_offsets.size - 1] + np.cumsum(tag_counts))
+        self._arena += arena
+        self._text_offsets.append(self._text_offsets.data[self._text_offsets.size - 1] + np.cumsum(text_lengths))
+        self.count += n
+
+    # ----------------------------
+    # Read
+    # ----------------------------
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Case, List[Case]]:
+        if isinstance(i, slice):
+            return [Case(self, row) for row in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return Case(self, i)
+
+    def __iter__(self) -> Iterator[Case]:
+        for row in range(self.count):
+            yield Case(self, row)
+
+    def _extra_fields(self, row: int) -> Dict[str, Any]:
+        encoded = self._extra.get(row)
+        return json.loads(encoded) if encoded is not None else {}
+
+    def _keys(self, row: int) -> List[str]:
+        bits = int(self._present.data[row])
+        keys = [name for name in FIELDS if bits & _BIT[name]]
+        if row in self._extra:
+            keys += self._extra_fields(row)
+        return keys
+
+    def _value(self, row: int, key: str) -> Any:
+        bit = _BIT.get(key)
+        if bit is None or not int(self._present.data[row]) & bit:
+            extra = self._extra_fields(row)
+            if key in extra:
+                return extra[key]
+            raise KeyError(key)
+        if key == "id":
+            return int(self._ids.data[row])
+        if key == "year":
+            return int(self._years.data[row])
+        if key == "jurisdiction":
+            return self._strings[self._jurisdictions.data[row]]
+        if key == "tags":
+            offsets = self._tag_offsets.data
+            return [self._strings[c] for c in self._tag_codes.data[offsets[row]:offsets[row + 1]].tolist()]
+        slot = 2 * row + (key == "text")
+        offsets = self._text_offsets.data
+        return self._arena[offsets[slot]:offsets[slot + 1]].decode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns, the string table and the extras."""
+        columns = (self._ids, self._years, self._jurisdictions, self._present,
+                   self._tag_offsets, self._tag_codes, self._text_offsets)
+        return (sum(c.nbytes for c in columns) + len(self._arena)
+                + sum(len(s.encode("utf-8")) for s in self._strings)
+                + sum(len(v) for v in self._extra.values()))
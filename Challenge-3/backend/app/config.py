@@ -10,8 +10,80 @@ load_dotenv(dotenv_path=DOTENV_PATH)
 class Settings:
     PROVIDER: str = os.getenv("LLM_PROVIDER", "llama2")
     MODEL: str = os.getenv("LLM_MODEL", "llama2:7b")
-    USE_MOCK: bool = os.getenv("USE_MOCK", "false").lower() == "true"
+    # Mock templates stay the default so the app runs without an LLM server.
+    USE_MOCK: bool = os.getenv("USE_MOCK", "true").lower() == "true"
+    # Simulated latency of mock calls in seconds (base +/- uniform jitter), for load tests
+    MOCK_DELAY: float = float(os.getenv("MOCK_DELAY", "0"))
+    MOCK_JITTER: float = float(os.getenv("MOCK_JITTER", "0"))
     TIMEOUT: int = int(os.getenv("LLM_TIMEOUT", "180"))
+    DEBATE_TIMEOUT: int = int(os.getenv("DEBATE_TIMEOUT", "300"))
+    LLM_WORKERS: int = int(os.getenv("LLM_WORKERS", "8"))
+    MAX_QUEUE_DEPTH: int = int(os.getenv("MAX_QUEUE_DEPTH", "64"))
+    # Per-endpoint concurrent LLM calls; endpoints not listed get LLM_MAX_CONCURRENCY
+    CALL_BUDGETS: str = os.getenv("CALL_BUDGETS", "debate=16,debate_stream=16,debate_batch=16,debate_job=16,summarize=4")
+    TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+    BASE_URL: str = os.getenv("LLM_BASE_URL", "http://localhost:11434")
+    API_KEY: str = os.getenv("LLM_API_KEY", "")
+    MAX_TOKENS: int = int(os.getenv("LLM_MAX_TOKENS", "256"))
+    # Estimated prompt tokens per call: case text, facts and earlier rounds are cut to fit (0 = no limit)
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "1024"))
+    # Each earlier turn is carried into later prompts as its first sentence, clipped to this many tokens
+    SUMMARY_TOKENS_PER_TURN: int = int(os.getenv("SUMMARY_TOKENS_PER_TURN", "40"))
+    MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    BATCH_SIZE: int = int(os.getenv("LLM_BATCH_SIZE", "8"))
+    BATCH_WINDOW_MS: float = float(os.getenv("LLM_BATCH_WINDOW_MS", "10"))
+    # Stream lawyer tokens to /debate/stream clients. Streamed calls skip the micro-batcher, so
+    # only /debate/stream debates stream; /debate, batches and jobs send plain (batched) calls.
+    STREAM: bool = os.getenv("LLM_STREAM", "true").lower() == "true"
+    CACHE_POLICY: str = os.getenv("CACHE_POLICY", "variants")
+    CACHE_VARIANTS: int = int(os.getenv("CACHE_VARIANTS", "3"))
+    CACHE_MAX_ITEMS: int = int(os.getenv("CACHE_MAX_ITEMS", "10000"))
+    CACHE_DB: str = os.getenv("CACHE_DB", "data/llm_cache.db")
+    SESSION_BACKEND: str = os.getenv("SESSION_BACKEND", "sqlite")
+    SESSION_DB: str = os.getenv("SESSION_DB", "data/sessions.db")
+    SESSION_TTL: int = int(os.getenv("SESSION_TTL", str(7 * 24 * 3600)))
+    SESSION_MAX_ITEMS: int = int(os.getenv("SESSION_MAX_ITEMS", "10000"))
+    SESSION_MAX_BYTES: int = int(os.getenv("SESSION_MAX_BYTES", str(256 * 1024 * 1024)))
+    # Batch debates (POST /debate/batch): job store, debates run at once per batch, cases per job
+    BATCH_DB: str = os.getenv("BATCH_DB", "data/batches.db")
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "8"))
+    BATCH_MAX_CASES: int = int(os.getenv("BATCH_MAX_CASES", "10000"))
+    # Background debates (POST /debate?background=true, GET /jobs/{id})
+    JOBS_DB: str = os.getenv("JOBS_DB", "data/jobs.db")
+    # Default for /debate when the request doesn't pass ?background=
+    DEBATE_BACKGROUND: bool = os.getenv("DEBATE_BACKGROUND", "false").lower() == "true"
+    # Job workers run inside each API process (0 = only `python -m backend.app.jobs` workers)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "1"))
+    # Idle workers poll every JOB_POLL_INTERVAL, backing off to JOB_POLL_MAX_INTERVAL while the queue stays empty
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "0.2"))
+    JOB_POLL_MAX_INTERVAL: float = float(os.getenv("JOB_POLL_MAX_INTERVAL", "5.0"))
+    JOB_MAX_QUEUED: int = int(os.getenv("JOB_MAX_QUEUED", "1000"))
+    JOB_TTL: int = int(os.getenv("JOB_TTL", str(24 * 3600)))
+    # Build the corpus snapshot, fact index and sampler in the background at startup (/readyz)
+    # instead of on the first request that needs them
+    PREWARM: bool = os.getenv("PREWARM", "true").lower() == "true"
+    CORPUS_PATH: str = os.getenv("CORPUS_PATH", "Metadata/cases.jsonl")
+    # Poll the corpus file for appended cases every N seconds (0 = off)
+    CORPUS_WATCH_INTERVAL: float = float(os.getenv("CORPUS_WATCH_INTERVAL", "0"))
+    # Appended cases kept in memory before the snapshot/fact index files are rewritten
+    INGEST_COMPACT_AT: int = int(os.getenv("INGEST_COMPACT_AT", "5000"))
+    # Near-duplicate cases: Jaccard similarity of their 3-word shingles at or above this
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+    # Ingested duplicates (same id or near-duplicate text): skip, reject (409) or allow
+    INGEST_DUPLICATES: str = os.getenv("INGEST_DUPLICATES", "skip")
+    # Weighted /generate_case draws: cases debated in the last N seconds get this weight (others 1)
+    SAMPLE_RECENT_SECONDS: float = float(os.getenv("SAMPLE_RECENT_SECONDS", "3600"))
+    SAMPLE_RECENT_WEIGHT: float = float(os.getenv("SAMPLE_RECENT_WEIGHT", "0.1"))
+    # Users whose draw history is kept for no-repeat sampling (least recently seen dropped first)
+    SAMPLE_MAX_USERS: int = int(os.getenv("SAMPLE_MAX_USERS", "10000"))
+    # Attach a per-request span tree ("trace") to debate objects
+    DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
+    FACTS_PATH: str = os.getenv("FACTS_PATH", "Metadata/facts.snapshot")
+    FACTS_PER_ROUND: int = int(os.getenv("FACTS_PER_ROUND", "3"))
+    # Related corpus cases (hybrid CorpusIndex search) added to the prosecution's context (0 = off)
+    PRECEDENTS_PER_DEBATE: int = int(os.getenv("PRECEDENTS_PER_DEBATE", "2"))
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,275 @@
+# backend/app/context.py
+"""
+Prompt context for the LLM roles, kept within PROMPT_TOKEN_BUDGET tokens
+per call.
+
+    prosecution   case text + retrieved facts + rolling summary of earlier rounds
+    defense       case text + the prosecution argument it rebuts
+    summary       case text + every argument of both sides
+
+Each part has a share of the budget; what a part doesn't use goes to the
+others, the case text last. Facts are deduplicated against each other and
+against the case text that is actually sent. Earlier rounds are carried
+as a RollingSummary (one clipped line per turn, oldest dropped first)
+instead of the raw transcript.
+
+Token counts are estimates: words split into pieces of up to 6 characters
+plus punctuation, close to what BPE tokenizers produce for English text.
+Tokenizations are cached, so the case text every call of a debate starts
+with is tokenized once.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from backend.app import prompts
+from backend.app.config import get_settings
+from backend.app.metrics import PROMPT_TOKENS, PROMPT_TOKENS_TRIMMED
+
+_PIECE_RE = re.compile(r"\w{1,6}|[^\w\s]")
+_WORD_RE = re.compile(r"\w+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+ELLIPSIS = "…"
+# Consecutive words a fact must share with the case text to count as already stated
+SHINGLE = 8
+# Budget shares; unused tokens of one part go to the next
+CONTEXT_SHARE = 0.35
+HISTORY_SHARE = 0.25
+CASE_SHARE = 0.4  # summary only: the rest is split between the arguments
+MIN_TURN_TOKENS = 12
+
+
+# ----------------------------
+# Token estimates
+# ----------------------------
+
+@lru_cache(maxsize=4096)
+def token_ends(text: str) -> Tuple[int, ...]:
+    """End offset of every token in `text`."""
+    return tuple(m.end() for m in _PIECE_RE.finditer(text))
+
+
+def count_tokens(text: str) -> int:
+    return len(token_ends(text)) if text else 0
+
+
+def truncate(text: str, max_tokens: int) -> str:
+    """The first `max_tokens` tokens of `text` (the ellipsis included)."""
+    ends = token_ends(text) if text else ()
+    if len(ends) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+    return text[:ends[max_tokens - 2]].rstrip() + " " + ELLIPSIS
+
+
+def truncate_left(text: str, max_tokens: int) -> str:
+    """The last `max_tokens` tokens of `text` (the ellipsis included)."""
+    ends = token_ends(text) if text else ()
+    if len(ends) <= max_tokens:
+        return text
+    if max_tokens <= 1:
+        return ""
+    return ELLIPSIS + " " + text[ends[len(ends) - max_tokens]:].lstrip()
+
+
+@lru_cache(maxsize=None)
+def overhead(role: str) -> int:
+    """Tokens of the role's prompt template itself, with every optional section present."""
+    # (prompt with one-token placeholders, number of placeholders)
+    templates = {
+        "prosecution": lambda: (prompts.prosecution_prompt("", 0, "x", "x"), 2),
+        "defense": lambda: (prompts.defense_prompt("", 0, "x"), 1),
+        "judge": lambda: (prompts.judge_event_prompt("", 0), 0),
+        "summary": lambda: (prompts.summary_prompt("", [], [], "Prosecution"), 0),
+    }
+    prompt, placeholders = templates[role]()
+    return count_tokens(prompt) - placeholders
+
+
+# ----------------------------
+# Fact deduplication
+# ----------------------------
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+@lru_cache(maxsize=256)
+def _shingles(text: str) -> frozenset:
+    words = _words(text)
+    return frozenset(tuple(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1))
+
+
+def split_facts(context: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(context) if s.strip()]
+
+
+def dedupe_facts(facts: Sequence[str], seen_text: str = "") -> List[str]:
+    """
+    `facts` in order without repeats: a fact is dropped if it equals or is
+    contained in an earlier one, or if `seen_text` already states it (it
+    shares SHINGLE consecutive words with it, or all of it if shorter).
+    """
+    seen = " " + " ".join(_words(seen_text)) + " "
+    seen_shingles = _shingles(seen_text)
+    kept: List[Tuple[str, str]] = []
+    for fact in facts:
+        words = _words(fact)
+        norm = " " + " ".join(words) + " "
+        if not words or norm in seen:
+            continue
+        if any(tuple(words[i:i + SHINGLE]) in seen_shingles for i in range(len(words) - SHINGLE + 1)):
+            continue
+        if any(norm in other for _, other in kept):
+            continue
+        # A longer fact replaces the shorter ones it contains
+        kept = [(f, other) for f, other in kept if other not in norm]
+        kept.append((fact, norm))
+    return [fact for fact, _ in kept]
+
+
+def _fit_facts(facts: Sequence[str], max_tokens: int) -> str:
+    """Whole facts in rank order, skipping those that no longer fit."""
+    picked: List[str] = []
+    used = 0
+    for fact in facts:
+        n = count_tokens(fact)
+        if used + n > max_tokens:
+            continue
+        picked.append(fact)
+        used += n
+    return " ".join(picked)
+
+
+# ----------------------------
+# Rolling summary of earlier rounds
+# ----------------------------
+
+class RollingSummary:
+    """
+    Transcript of a debate so far, one line per turn clipped to its first
+    sentence and SUMMARY_TOKENS_PER_TURN tokens. Each turn is compressed
+    once when it is added; build_context() keeps the most recent lines
+    that fit the history budget.
+    """
+
+    def __init__(self, tokens_per_turn: Optional[int] = None):
+        self.tokens_per_turn = tokens_per_turn or get_settings().SUMMARY_TOKENS_PER_TURN
+        self.lines: List[str] = []
+
+    def add(self, role: str, round_num: int, argument: str) -> None:
+        first = split_facts(argument)[:1]
+        self.lines.append(f"R{round_num + 1} {role}: {truncate(first[0] if first else '', self.tokens_per_turn)}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+
+# ----------------------------
+# Builders
+# ----------------------------
+
+class PromptContext(NamedTuple):
+    case_text: str
+    context: str
+    history: str
+    tokens: int
+
+
+def _record(role: str, tokens: int, original: int) -> None:
+    PROMPT_TOKENS.observe(tokens, role=role)
+    if original > tokens:
+        PROMPT_TOKENS_TRIMMED.inc(original - tokens, role=role)
+
+
+def _budget(role: str) -> int:
+    budget = get_settings().PROMPT_TOKEN_BUDGET
+    return budget - overhead(role) if budget > 0 else 1 << 30
+
+
+def build_context(role: str, case_text: str, context: str = "", history: str = "") -> PromptContext:
+    """
+    Fit the case text, the role's context and the summary of earlier rounds
+    into the role's budget. For the prosecution `context` holds retrieved
+    facts, which are deduplicated; other roles' context is clipped as is.
+    """
+    case_text, context, history = case_text or "", context or "", history or ""
+    budget = _budget(role)
+    n_case, n_context, n_history = count_tokens(case_text), count_tokens(context), count_tokens(history)
+    original = overhead(role) + n_case + n_context + n_history
+
+    # Case first, leaving room for up to their shares of context and history
+    history_share = min(n_history, int(budget * HISTORY_SHARE))
+    case_text = truncate(case_text, max(budget - min(n_context, int(budget * CONTEXT_SHARE)) - history_share, 0))
+    left = budget - count_tokens(case_text)
+
+    if role == "prosecution":
+        context = _fit_facts(dedupe_facts(split_facts(context), case_text), max(left - history_share, 0))
+    else:
+        context = truncate(context, max(left - history_share, 0))
+    # The most recent rounds get whatever is left
+    history = truncate_left(history, max(left - count_tokens(context), 0))
+
+    tokens = overhead(role) + count_tokens(case_text) + count_tokens(context) + count_tokens(history)
+    _record(role, tokens, original)
+    return PromptContext(case_text, context, history, tokens)
+
+
+def build_summary_context(
+    case_text: str,
+    pros: Sequence[str],
+    cons: Sequence[str],
+) -> Tuple[str, List[str], List[str]]:
+    """
+    Fit the case text and both sides' arguments into the summary budget.
+    Every argument gets an equal share (at least MIN_TURN_TOKENS); if even
+    that doesn't fit, the oldest rounds shrink to an ellipsis so the last
+    rounds survive. Turn counts are kept, so hundreds of rounds can still
+    exceed the budget by their ellipses.
+    """
+    case_text = case_text or ""
+    budget = _budget("summary")
+    turns = list(pros) + list(cons)
+    original = overhead("summary") + count_tokens(case_text) + sum(count_tokens(t) for t in turns)
+
+    # Turns are joined with a one-token separator
+    n_args = sum(count_tokens(t) + 1 for t in turns)
+    case_text = truncate(case_text, max(budget - min(n_args, int(budget * (1 - CASE_SHARE))), 0))
+    left = budget - count_tokens(case_text)
+
+    def fit(arguments: Sequence[str], keep_from: int, share: int) -> List[str]:
+        return [truncate(a, share) if i >= keep_from else ELLIPSIS for i, a in enumerate(arguments)]
+
+    rounds = max(len(pros), len(cons))
+    share = left // max(len(turns), 1) - 1
+    keep_from = 0
+    if n_args <= left:
+        share = max((count_tokens(t) for t in turns), default=0)
+    elif share < MIN_TURN_TOKENS:
+        # Whole rounds (one argument per side) at MIN_TURN_TOKENS each, newest first;
+        # a dropped turn still costs its ellipsis and separator
+        kept_rounds = max((left - 2 * len(turns)) // (2 * (MIN_TURN_TOKENS - 1)), 0)
+        keep_from = max(rounds - kept_rounds, 0)
+        share = MIN_TURN_TOKENS
+    pros_out, cons_out = fit(pros, keep_from, share), fit(cons, keep_from, share)
+
+    tokens = (overhead("summary") + count_tokens(case_text)
+              + sum(count_tokens(t) + 1 for t in pros_out + cons_out))
+    _record("summary", tokens, original)
+    return case_text, pros_out, cons_out
+
+
+def budget_case_text(role: str, case: Union[Dict[str, Any], str]) -> str:
+    """Text of a case (dict or string) alone within the role's budget (judge events)."""
+    return build_context(role, prompts.case_text_of(case)).case_text
+
+
+def cache_stats() -> Dict[str, int]:
+    info = token_ends.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
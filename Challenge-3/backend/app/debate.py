@@ -0,0 +1,190 @@
+# backend/app/debate.py
+
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from backend.app.config import get_settings
+from backend.app.context import RollingSummary
+from backend.app.executor import TokenCallback, get_executor
+from backend.app.fact_index import get_fact_index
+from backend.app.metrics import DEBATE_SECONDS, span, trace
+from backend.app.models import rag_lawyer_async, chaos_lawyer_async, judge_event_async, token_stream
+from backend.app.retrieval import find_precedents
+
+ROUNDS = 3
+
+settings = get_settings()
+
+
+# ----------------------------
+# Debate engine
+# ----------------------------
+
+async def stream_debate(
+    case: Dict[str, Any],
+    rounds: int = ROUNDS,
+    timeout: Optional[float] = None,
+    endpoint: str = "debate",
+    tokens: bool = False,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a full debate with independent calls dispatched concurrently,
+    yielding events as soon as they are produced:
+
+      {"type": "start", "case": ..., "rounds": n}
+      {"type": "token", "role": ..., "round": n, "text": ...}   (`tokens`, LLM_STREAM and a streaming backend)
+      {"type": "turn",  "role": "prosecution" | "defense" | "judge", "round": n, "argument": ...}
+      {"type": "done",  "debate": {...}}
+
+    Dependencies per round N:
+      - judge event N:  none (all rounds start immediately)
+      - prosecution N:  defense N-1 (its facts are retrieved for the case
+                        plus that rebuttal, so it answers the defense)
+      - defense N:      prosecution N (it rebuts that argument)
+
+    Before each prosecution turn the fact index is searched once for the
+    top FACTS_PER_ROUND facts not used in earlier rounds; they are passed
+    as the lawyer's context and returned on the turn as "facts", together
+    with a rolling summary of the earlier rounds (backend.app.context). The
+    PRECEDENTS_PER_DEBATE closest other cases of the corpus (CorpusIndex) are
+    looked up once per debate, added to every prosecution context and
+    returned on the debate as "precedents". One
+    deadline (DEBATE_TIMEOUT) bounds the whole debate; calls still pending
+    when it expires resolve to their fallbacks. Calls go through the shared
+    CallExecutor under `endpoint`'s concurrency budget. If the consumer stops
+    iterating (e.g. the HTTP client disconnects) every pending call is
+    cancelled.
+
+    With DEBUG on, the debate object also carries "trace": a span tree of
+    every call, split into time spent queueing for a slot and in the call.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + (timeout if timeout is not None else settings.DEBATE_TIMEOUT)
+    executor = get_executor()
+    case_text = case.get("text", str(case))
+    events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    def token_sink(role: str, round_num: int) -> TokenCallback:
+        def on_token(text: str) -> None:
+            event = {"type": "token", "role": role, "round": round_num + 1, "text": text}
+            loop.call_soon_threadsafe(events.put_nowait, event)
+        return on_token
+
+    history = RollingSummary()
+
+    def emit_turn(role: str, round_num: int, turn: Dict[str, Any]) -> Dict[str, Any]:
+        turn = {"round": round_num + 1, **turn}
+        if role != "judge" and not turn.get("fallback"):
+            history.add(role, round_num, turn["argument"])
+        print(f"✅ {role.capitalize()} round {round_num+1}: {turn['argument'][:80]}")
+        events.put_nowait({"type": "turn", "role": role, **turn})
+        return turn
+
+    used_facts: Set[str] = set()
+
+    async def retrieve_facts(round_num: int, rebuttal: str) -> List[str]:
+        with span("retrieval", round=str(round_num + 1)):
+            try:
+                index = await asyncio.to_thread(get_fact_index)
+                if index is None:
+                    return []
+                query = f"{case_text} {rebuttal}".strip()
+                facts = await asyncio.to_thread(index.top_facts, case, query, settings.FACTS_PER_ROUND, set(used_facts))
+            except Exception as e:
+                print(f"⚠️ Fact retrieval failed: {e}")
+                return []
+        used_facts.update(facts)
+        return facts
+
+    async def retrieve_precedents() -> List[str]:
+        with span("precedents"):
+            try:
+                return await asyncio.to_thread(find_precedents, case, settings.PRECEDENTS_PER_DEBATE)
+            except Exception as e:
+                print(f"⚠️ Precedent retrieval failed: {e}")
+                return []
+
+    async def prosecution(round_num: int, prev_defense: Optional["asyncio.Task[Dict[str, Any]]"]) -> Dict[str, Any]:
+        rebuttal = (await prev_defense)["argument"] if prev_defense is not None else ""
+        facts = await retrieve_facts(round_num, rebuttal)
+        precedents = await precedents_task
+        # Round 1 has no history; leaving the argument out keeps its cache key as before
+        args = (case_text, round_num, " ".join(facts + precedents)) + ((history.text(),) if history else ())
+        turn = await executor.run(rag_lawyer_async, *args,
+                                  endpoint=endpoint, fallback="Prosecution argument unavailable",
+                                  role="prosecution", round_num=round_num, deadline=deadline,
+                                  on_token=token_sink("prosecution", round_num))
+        return emit_turn("prosecution", round_num, {**turn, "facts": facts})
+
+    async def defense(round_num: int, pros_task: "asyncio.Task[Dict[str, Any]]") -> Dict[str, Any]:
+        pros = await pros_task
+        turn = await executor.run(chaos_lawyer_async, case_text, round_num, pros["argument"],
+                                  endpoint=endpoint, fallback="Defense argument unavailable",
+                                  role="defense", round_num=round_num, deadline=deadline,
+                                  on_token=token_sink("defense", round_num))
+        return emit_turn("defense", round_num, turn)
+
+    async def judge(round_num: int) -> Dict[str, Any]:
+        event = await executor.run(judge_event_async, case, round_num,
+                                   endpoint=endpoint, fallback="Judge event unavailable",
+                                   role="judge", round_num=round_num, deadline=deadline)
+        return emit_turn("judge", round_num, event)
+
+    # Tasks inherit the trace root (and token streaming) from the context they are created in.
+    with trace("debate", enabled=settings.DEBUG, endpoint=endpoint, rounds=rounds) as root, token_stream(tokens):
+        judge_tasks = [asyncio.create_task(judge(r)) for r in range(rounds)]
+        precedents_task = asyncio.create_task(retrieve_precedents())
+        pros_tasks: List["asyncio.Task[Dict[str, Any]]"] = []
+        defense_tasks: List["asyncio.Task[Dict[str, Any]]"] = []
+        for r in range(rounds):
+            pros_tasks.append(asyncio.create_task(prosecution(r, defense_tasks[-1] if defense_tasks else None)))
+            defense_tasks.append(asyncio.create_task(defense(r, pros_tasks[r])))
+    all_tasks = judge_tasks + pros_tasks + defense_tasks + [precedents_task]
+
+    try:
+        yield {"type": "start", "case": case, "rounds": rounds}
+        pending = set(all_tasks)
+        while pending:
+            getter = asyncio.create_task(events.get())
+            done, _ = await asyncio.wait(pending | {getter}, return_when=asyncio.FIRST_COMPLETED)
+            pending -= done
+            if getter in done:
+                yield getter.result()
+            else:
+                getter.cancel()
+        while not events.empty():
+            yield events.get_nowait()
+
+        elapsed = loop.time() - started
+        DEBATE_SECONDS.observe(elapsed, endpoint=endpoint)
+        debate = {
+            "case": case,
+            "case_text": case_text,
+            "prosecution": [t.result() for t in pros_tasks],
+            "defense": [t.result() for t in defense_tasks],
+            "judge_events": [t.result() for t in judge_tasks],
+            "precedents": precedents_task.result(),
+            "elapsed": round(elapsed, 2),
+        }
+        if root is not None:
+            root.end = time.perf_counter()
+            debate["trace"] = root.to_dict()
+        yield {"type": "done", "debate": debate}
+    finally:
+        for task in all_tasks:
+            task.cancel()
+
+
+async def run_debate(
+    case: Dict[str, Any],
+    rounds: int = ROUNDS,
+    timeout: Optional[float] = None,
+    endpoint: str = "debate",
+) -> Dict[str, Any]:
+    """Run a debate to completion and return the assembled debate object."""
+    async for event in stream_debate(case, rounds=rounds, timeout=timeout, endpoint=endpoint):
+        if event["type"] == "done":
+            return event["debate"]
+    raise RuntimeError("debate stream ended without a result")
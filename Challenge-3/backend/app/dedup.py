@@ -0,0 +1,415 @@
+# backend/app/dedup.py
+"""
+Near-duplicate detection for the case corpus (MinHash + LSH).
+
+Each case's title and text are cut into 3-word shingles and summarized by
+a 100-value MinHash signature; equal signature values estimate the
+Jaccard similarity of the shingle sets. The signature is split into 20
+bands of 5 values, and cases sharing any band are candidates (a pair at
+similarity 0.7 is found with probability ~97.5%, at 0.5 ~47%). Per band
+only a sorted array of 32-bit band keys is kept (with the rows they
+belong to), so a lookup is 20 binary searches, and candidates are
+verified with the exact Jaccard similarity of their shingles.
+
+    python -m backend.app.dedup                      # duplicate clusters in CORPUS_PATH
+    python -m backend.app.dedup --threshold 0.9 --json -o clusters.jsonl
+
+The index is built with the corpus at startup and kept in sync with
+ingested cases. POST /cases and the ingest CLI check new cases against it
+(and against each other); INGEST_DUPLICATES decides whether duplicates are
+skipped, rejected or appended anyway.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app.config import get_settings
+from backend.app.metrics import CORPUS_LOAD_SECONDS
+from backend.app.snapshot import CorpusView, get_snapshot
+
+SHINGLE = 3
+NUM_PERM = 100
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+# Cases hashed per vectorized batch while building
+_CHUNK = 1024
+
+_RNG = np.random.default_rng(0x5EED)
+# Multiply-shift hash family: h_i(x) = (a_i * x + b_i) mod 2^64, top 32 bits
+_A = _RNG.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _RNG.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _RNG.integers(1, 2 ** 63, ROWS, dtype=np.uint64) | np.uint64(1)
+_SHINGLE_MIX = np.uint64(0x100000001B3)
+_SHIFT = np.uint64(32)
+
+_WORD_RE = re.compile(r"\w+")
+_WORD_HASHES: Dict[str, int] = {}
+_MAX_WORDS = 1_000_000
+
+
+class DuplicateCases(ValueError):
+    """Incoming cases duplicate cases already in the corpus (INGEST_DUPLICATES=reject)."""
+
+    def __init__(self, duplicates: List[Dict[str, Any]]):
+        super().__init__(f"{len(duplicates)} case(s) duplicate existing cases")
+        self.duplicates = duplicates
+
+
+# ----------------------------
+# Shingles and signatures
+# ----------------------------
+
+def case_text(case: Dict[str, Any]) -> str:
+    return f"{case.get('title') or ''} {case.get('text') or ''}"
+
+
+def _hash_words(words: List[str]) -> np.ndarray:
+    hashes = list(map(_WORD_HASHES.get, words))
+    if None in hashes:
+        if len(_WORD_HASHES) >= _MAX_WORDS:
+            _WORD_HASHES.clear()
+        for i, h in enumerate(hashes):
+            if h is None:
+                word = words[i]
+                h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+                hashes[i] = _WORD_HASHES[word] = h
+    return np.array(hashes, dtype=np.uint64)
+
+
+def _rolling(hashes: np.ndarray, k: int) -> np.ndarray:
+    """Hash of every run of k consecutive word hashes (wraps mod 2^64)."""
+    n = len(hashes) - k + 1
+    acc = hashes[:n].copy()
+    for j in range(1, k):
+        acc = acc * _SHINGLE_MIX + hashes[j:j + n]
+    return acc
+
+
+def _shingle_hashes(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Shingle hashes of several texts back to back, and how many belong to
+    each text. A text shorter than SHINGLE words is one shingle (all of it).
+    """
+    word_lists = [_WORD_RE.findall(text.lower()) for text in texts]
+    lengths = np.fromiter(map(len, word_lists), dtype=np.int64, count=len(word_lists))
+    flat = _hash_words([w for words in word_lists for w in words])
+    ends = np.cumsum(lengths)
+
+    windows = _rolling(flat, SHINGLE) if len(flat) >= SHINGLE else np.zeros(0, dtype=np.uint64)
+    owner = np.repeat(np.arange(len(texts)), lengths)[:len(windows)]
+    valid = np.arange(len(windows)) + SHINGLE <= ends[owner]  # windows that don't cross into the next text
+    windows, counts = windows[valid], np.bincount(owner[valid], minlength=len(texts))
+
+    short = np.flatnonzero(counts == 0)
+    if len(short):
+        starts = ends - lengths
+        values = [_rolling(flat[starts[t]:ends[t]], lengths[t])[0] if lengths[t] else np.uint64(0) for t in short]
+        windows = np.insert(windows, np.cumsum(counts)[short], np.array(values, dtype=np.uint64))
+        counts[short] = 1
+    return windows, counts
+
+
+def shingles(text: str) -> np.ndarray:
+    """Sorted unique 64-bit shingle hashes of `text`."""
+    return np.unique(_shingle_hashes([text])[0])
+
+
+def signatures(texts: List[str]) -> np.ndarray:
+    """MinHash signatures, one row of NUM_PERM uint32 values per text."""
+    flat, counts = _shingle_hashes(texts)
+    hashed = ((_A[:, None] * flat[None, :] + _B[:, None]) >> _SHIFT).astype(np.uint32)
+    starts = np.cumsum(counts) - counts
+    return np.minimum.reduceat(hashed, starts, axis=1).T
+
+
+def band_keys(sigs: np.ndarray) -> np.ndarray:
+    """One uint32 key per band: (cases, BANDS)."""
+    bands = sigs.reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    return ((bands * _BAND_MIX).sum(axis=2, dtype=np.uint64) >> _SHIFT).astype(np.uint32)
+
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    inter = len(np.intersect1d(a, b, assume_unique=True))
+    return inter / (len(a) + len(b) - inter)
+
+
+# ----------------------------
+# Index
+# ----------------------------
+
+class DuplicateIndex:
+    """
+    LSH index over a corpus view. Per band, `keys[band]` is sorted and
+    `rows[band]` holds the case row of each key; integer case ids are kept
+    sorted next to their rows for the id check. sync() catches up with
+    cases appended to the corpus, rebuilding if it was rewritten.
+    """
+
+    def __init__(self, view: CorpusView, threshold: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else get_settings().DEDUP_THRESHOLD
+        self._lock = threading.Lock()
+        self._build(view)
+
+    def _hash_cases(self, cases: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, List[Any]]:
+        keys: List[np.ndarray] = []
+        ids: List[Any] = []
+        chunk: List[str] = []
+        for case in cases:
+            ids.append(case.get("id"))
+            chunk.append(case_text(case))
+            if len(chunk) == _CHUNK:
+                keys.append(band_keys(signatures(chunk)))
+                chunk = []
+        if chunk:
+            keys.append(band_keys(signatures(chunk)))
+        return (np.concatenate(keys) if keys else np.zeros((0, BANDS), dtype=np.uint32)), ids
+
+    @staticmethod
+    def _int_ids(ids: List[Any], start: int) -> Tuple[np.ndarray, np.ndarray]:
+        pairs = [(i, start + row) for row, i in enumerate(ids)
+                 if isinstance(i, int) and not isinstance(i, bool) and -2 ** 63 <= i < 2 ** 63]
+        values = np.array([p[0] for p in pairs], dtype=np.int64)
+        rows = np.array([p[1] for p in pairs], dtype=np.int64)
+        order = np.argsort(values, kind="stable")
+        return values[order], rows[order]
+
+    def _build(self, view: CorpusView) -> None:
+        start = time.perf_counter()
+        keys, ids = self._hash_cases(view)
+        order = np.argsort(keys, axis=0, kind="stable").T  # (BANDS, n)
+        self.keys = np.take_along_axis(keys.T, order, axis=1)
+        self.rows = order.astype(np.int32)
+        self.ids, self.id_rows = self._int_ids(ids, 0)
+        self.view = view
+        self.count = len(view)
+        CORPUS_LOAD_SECONDS.set(time.perf_counter() - start, stage="dedup_index")
+
+    def sync(self, view: CorpusView) -> None:
+        """Catch up with `view`: index appended cases, or rebuild if the corpus was rewritten."""
+        with self._lock:
+            if view.header["sha256"] == self.view.header["sha256"]:
+                return
+            start = view.checkpoints.get(self.view.header["sha256"])
+            if start is None or start != self.count:
+                self._build(view)
+                return
+            keys, ids = self._hash_cases(view[i] for i in range(start, len(view)))
+            new_rows = np.arange(start, len(view), dtype=np.int32)
+            merged_keys, merged_rows = [], []
+            for band in range(BANDS):
+                order = np.argsort(keys[:, band], kind="stable")
+                pos = np.searchsorted(self.keys[band], keys[order, band], side="right")
+                merged_keys.append(np.insert(self.keys[band], pos, keys[order, band]))
+                merged_rows.append(np.insert(self.rows[band], pos, new_rows[order]))
+            self.keys, self.rows = np.stack(merged_keys), np.stack(merged_rows)
+            values, rows = self._int_ids(ids, start)
+            pos = np.searchsorted(self.ids, values, side="right")
+            self.ids, self.id_rows = np.insert(self.ids, pos, values), np.insert(self.id_rows, pos, rows)
+            self.view = view
+            self.count = len(view)
+
+    # ----------------------------
+    # Lookups
+    # ----------------------------
+
+    def _candidates(self, keys: np.ndarray) -> np.ndarray:
+        """Rows sharing at least one band key with `keys` (BANDS,)."""
+        found = []
+        for band in range(BANDS):
+            lo = np.searchsorted(self.keys[band], keys[band], side="left")
+            hi = np.searchsorted(self.keys[band], keys[band], side="right")
+            if hi > lo:
+                found.append(self.rows[band, lo:hi])
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int32)
+
+    def row_of_id(self, case_id: Any) -> Optional[int]:
+        if not isinstance(case_id, int) or isinstance(case_id, bool):
+            return None
+        pos = int(np.searchsorted(self.ids, case_id))
+        if pos < len(self.ids) and self.ids[pos] == case_id:
+            return int(self.id_rows[pos])
+        return None
+
+    def _best(self, shingle_set: np.ndarray, rows: np.ndarray, view: CorpusView) -> Optional[Tuple[int, float]]:
+        best = None
+        for row in rows.tolist():
+            similarity = jaccard(shingle_set, shingles(case_text(view[row])))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (row, similarity)
+        return best
+
+    def check(self, cases: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        For each case, the case it duplicates or None: an existing case with
+        the same integer id, else the most similar existing case or earlier
+        case of `cases` with Jaccard similarity >= threshold.
+        {"duplicate_of": id or batch index, "in": "corpus" | "batch", "reason": "id" | "text", "similarity": ...}
+        """
+        texts = [case_text(case) for case in cases]
+        sets = [shingles(text) for text in texts]
+        keys = band_keys(signatures(texts)) if cases else np.zeros((0, BANDS), dtype=np.uint32)
+        with self._lock:
+            view = self.view
+            results: List[Optional[Dict[str, Any]]] = []
+            for i, case in enumerate(cases):
+                row = self.row_of_id(case.get("id"))
+                if row is not None:
+                    results.append({"duplicate_of": case.get("id"), "in": "corpus", "reason": "id", "similarity": None})
+                    continue
+                best = self._best(sets[i], self._candidates(keys[i]), view)
+                if best is not None:
+                    results.append({"duplicate_of": view[best[0]].get("id"), "in": "corpus", "reason": "text",
+                                    "similarity": round(best[1], 3)})
+                    continue
+                # Earlier cases of this batch that weren't duplicates themselves
+                match = None
+                for j in range(i):
+                    if results[j] is None and (keys[j] == keys[i]).any():
+                        similarity = jaccard(sets[i], sets[j])
+                        if similarity >= self.threshold and (match is None or similarity > match[1]):
+                            match = (j, similarity)
+                results.append(None if match is None else {
+                    "duplicate_of": match[0], "in": "batch", "reason": "text", "similarity": round(match[1], 3),
+                })
+            return results
+
+    def clusters(self, min_size: int = 2) -> List[Dict[str, Any]]:
+        """
+        Groups of near-duplicate cases, largest first. Cases sharing a band
+        bucket are linked if their similarity reaches the threshold
+        (compared with the bucket's first case), and links are merged.
+        """
+        with self._lock:
+            view, keys, rows = self.view, self.keys, self.rows
+        parent = list(range(len(view)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        cache: Dict[int, np.ndarray] = {}
+
+        def shingles_of(row: int) -> np.ndarray:
+            if row not in cache:
+                cache[row] = shingles(case_text(view[row]))
+            return cache[row]
+
+        similarities: Dict[Tuple[int, int], float] = {}
+        for band in range(BANDS):
+            boundaries = np.flatnonzero(np.diff(keys[band])) + 1
+            for group in np.split(rows[band], boundaries):
+                if len(group) < 2:
+                    continue
+                head = int(group[0])
+                for row in group[1:].tolist():
+                    if find(row) == find(head):
+                        continue
+                    similarity = jaccard(shingles_of(head), shingles_of(row))
+                    if similarity >= self.threshold:
+                        parent[find(row)] = find(head)
+                        similarities[(min(head, row), max(head, row))] = similarity
+
+        members: Dict[int, List[int]] = {}
+        lowest: Dict[int, float] = {}
+        for (a, b), similarity in similarities.items():
+            root = find(a)
+            members.setdefault(root, []).extend((a, b))
+            lowest[root] = min(lowest.get(root, 1.0), similarity)
+        out = []
+        for root, group in members.items():
+            group = sorted(set(group))
+            if len(group) < min_size:
+                continue
+            out.append({
+                "size": len(group),
+                "ids": [view[r].get("id") for r in group],
+                "titles": [view[r].get("title") for r in group[:5]],
+                "min_similarity": round(lowest[root], 3),
+            })
+        return sorted(out, key=lambda c: (-c["size"], str(c["ids"][0])))
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.rows.nbytes + self.ids.nbytes + self.id_rows.nbytes
+
+
+# ----------------------------
+# Process-wide index
+# ----------------------------
+
+_INDEXES: Dict[str, DuplicateIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_dedup_index(corpus_path: Optional[str] = None, build: bool = True) -> Optional[DuplicateIndex]:
+    """
+    Duplicate index for the current view of a corpus (CORPUS_PATH by
+    default), built on first use and kept in sync with ingested cases.
+    With build=False an existing index is synced but none is created.
+    """
+    corpus_path = os.path.abspath(corpus_path or get_settings().CORPUS_PATH)
+    if not build and corpus_path not in _INDEXES:
+        return None
+    view = get_snapshot(corpus_path)
+    if view is None:
+        return None
+    with _INDEX_LOCK:
+        index = _INDEXES.get(corpus_path)
+        if index is None:
+            if not build:
+                return None
+            index = _INDEXES[corpus_path] = DuplicateIndex(view)
+    index.sync(view)
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=get_settings().CORPUS_PATH)
+    parser.add_argument("--threshold", type=float, default=get_settings().DEDUP_THRESHOLD,
+                        help="minimum Jaccard similarity of the 3-word shingles")
+    parser.add_argument("--min-size", type=int, default=2, help="smallest cluster to report")
+    parser.add_argument("--limit", type=int, default=20, help="clusters to print (all with --json)")
+    parser.add_argument("--json", action="store_true", help="one JSON cluster per line")
+    parser.add_argument("-o", "--out", help="write the clusters as JSON lines to this file")
+    args = parser.parse_args()
+
+    view = get_snapshot(args.corpus, verbose=True)
+    if view is None:
+        sys.exit(f"⚠️ Corpus not found: {args.corpus}")
+    start = time.perf_counter()
+    index = DuplicateIndex(view, threshold=args.threshold)
+    built = time.perf_counter() - start
+    found = index.clusters(min_size=args.min_size)
+    elapsed = time.perf_counter() - start
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for cluster in found:
+                f.write(json.dumps(cluster, ensure_ascii=False) + "\n")
+    if args.json:
+        for cluster in found:
+            print(json.dumps(cluster, ensure_ascii=False))
+        return
+    duplicates = sum(c["size"] - 1 for c in found)
+    print(f"🔁 {len(found)} duplicate clusters, {duplicates} redundant cases out of {len(view)} "
+          f"(index {built:.2f}s, {index.nbytes / 1e6:.1f} MB; total {elapsed:.2f}s)")
+    for cluster in found[:args.limit]:
+        title = cluster["titles"][0] or "Untitled"
+        print(f"  {cluster['size']:>4} × {title[:60]!r}  ids {cluster['ids'][:8]}"
+              f"{' …' if cluster['size'] > 8 else ''}  (similarity ≥ {cluster['min_similarity']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+# backend/app/executor.py
+
+import time
+import asyncio
+import inspect
+import threading
+import weakref
+import contextvars
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from backend.app.config import get_settings
+from backend.app.metrics import LLM_CALL_SECONDS, LLM_FALLBACKS, QUEUE_WAIT_SECONDS, span
+
+TokenCallback = Callable[[str], None]
+
+
+class Overloaded(Exception):
+    """Raised when an endpoint's call queue is full and new work must be shed."""
+
+    def __init__(self, endpoint: str, waiting: int):
+        super().__init__(f"Endpoint {endpoint!r} is overloaded ({waiting} calls waiting)")
+        self.endpoint = endpoint
+        self.waiting = waiting
+
+
+def fallback_result(text: str, reason: str, error: Optional[BaseException] = None) -> Dict[str, Any]:
+    """
+    The single shape every failed call resolves to, whatever went wrong:
+    {"argument": text, "fallback": True, "reason": "timeout" | "error" | "shed" | "deadline"}
+    plus "error" with the exception message for reason == "error".
+    """
+    result: Dict[str, Any] = {"argument": text, "fallback": True, "reason": reason}
+    if error is not None:
+        result["error"] = str(error) or type(error).__name__
+    return result
+
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse "debate=16,summarize=4" into {"debate": 16, "summarize": 4}."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        budgets[name.strip()] = int(value)
+    return budgets
+
+
+# ----------------------------
+# Invocation helpers
+# ----------------------------
+
+def _invoke(fn: Callable[..., Any], args: tuple, on_token: Optional[TokenCallback]) -> Any:
+    """Run a blocking call on a worker thread, draining a token stream if one comes back."""
+    result = fn(*args)
+    if isinstance(result, Iterator):
+        parts = []
+        for chunk in result:
+            parts.append(chunk)
+            if on_token is not None:
+                on_token(chunk)
+        return "".join(parts).strip()
+    return result
+
+
+async def _ainvoke(fn: Callable[..., Any], args: tuple, on_token: Optional[TokenCallback]) -> Any:
+    result = await fn(*args)
+    if isinstance(result, AsyncIterator):
+        parts = []
+        async for chunk in result:
+            parts.append(chunk)
+            if on_token is not None:
+                on_token(chunk)
+        return "".join(parts).strip()
+    return result
+
+
+# ----------------------------
+# Executor
+# ----------------------------
+
+class _LoopState:
+    """Per-event-loop budgets (asyncio primitives can't be shared across loops)."""
+
+    def __init__(self, budgets: Dict[str, int], default_budget: int):
+        self.budgets = budgets
+        self.default_budget = default_budget
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        if endpoint not in self.semaphores:
+            self.semaphores[endpoint] = asyncio.Semaphore(self.budgets.get(endpoint, self.default_budget))
+        return self.semaphores[endpoint]
+
+
+class CallExecutor:
+    """
+    Runs LLM calls with:
+      - real cancellation: coroutine calls run as tasks, so a timeout cancels
+        the in-flight HTTP request; blocking calls that have not started yet
+        are dropped from the thread pool queue;
+      - per-endpoint concurrency budgets: a blocking call keeps its slot until
+        its thread actually finishes, so abandoned calls can't silently pile up
+        behind the budget;
+      - admission control: once `max_queue` calls of an endpoint are waiting
+        for a slot, new calls are shed immediately instead of queueing;
+      - one fallback shape for timeouts, errors and shed calls.
+    """
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: int = 8,
+        max_queue: int = 64,
+        thread_workers: int = 8,
+    ):
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.max_queue = max_queue
+        self.threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="llm")
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.waiting: Dict[str, int] = defaultdict(int)
+        self.active: Dict[str, int] = defaultdict(int)
+        self.outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(self.budgets, self.default_budget)
+        return state
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        with self._lock:
+            self.outcomes[endpoint][outcome] += 1
+
+    def queue_depth(self, endpoint: Optional[str] = None) -> int:
+        if endpoint is not None:
+            return self.waiting[endpoint]
+        return sum(self.waiting.values())
+
+    def admit(self, endpoint: str) -> None:
+        """Request-level admission check; raises Overloaded when the endpoint's queue is full."""
+        waiting = self.waiting[endpoint]
+        if waiting >= self.max_queue:
+            self._count(endpoint, "rejected")
+            raise Overloaded(endpoint, waiting)
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        endpoint: str = "default",
+        fallback: str = "Response unavailable",
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        on_token: Optional[TokenCallback] = None,
+        role: str = "llm",
+        round_num: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run `fn(*args)` within `timeout` seconds (default LLM_TIMEOUT) and
+        before the loop-time `deadline`, if given. Always returns a dict with
+        an "argument" key; see fallback_result() for the failure shape.
+        `role` and `round_num` only label the call's metrics and trace span.
+        """
+        round_label = "" if round_num is None else str(round_num + 1)
+        start = time.perf_counter()
+        with span(role, endpoint=endpoint, round=round_label) as call_span:
+            result = await self._run(fn, args, endpoint, fallback, timeout, deadline, on_token)
+            if call_span is not None and result.get("fallback"):
+                call_span.attrs["fallback"] = result["reason"]
+        LLM_CALL_SECONDS.observe(time.perf_counter() - start, role=role, round=round_label, endpoint=endpoint)
+        if result.get("fallback"):
+            LLM_FALLBACKS.inc(role=role, reason=result["reason"])
+        return result
+
+    async def _run(
+        self,
+        fn: Callable[..., Any],
+        args: tuple,
+        endpoint: str,
+        fallback: str,
+        timeout: Optional[float],
+        deadline: Optional[float],
+        on_token: Optional[TokenCallback],
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        limit = timeout if timeout is not None else get_settings().TIMEOUT
+        if deadline is not None:
+            limit = min(limit, deadline - loop.time())
+        if limit <= 0:
+            self._count(endpoint, "deadline")
+            return fallback_result(fallback, "deadline")
+        expires = loop.time() + limit
+
+        if self.waiting[endpoint] >= self.max_queue:
+            self._count(endpoint, "shed")
+            return fallback_result(fallback, "shed")
+
+        semaphore = self._state().semaphore(endpoint)
+        self.waiting[endpoint] += 1
+        queued = time.perf_counter()
+        try:
+            with span("queue"):
+                await asyncio.wait_for(semaphore.acquire(), limit)
+        except asyncio.TimeoutError:
+            self._count(endpoint, "timeout")
+            return fallback_result(fallback, "timeout")
+        finally:
+            self.waiting[endpoint] -= 1
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, endpoint=endpoint)
+
+        self.active[endpoint] += 1
+        is_async = inspect.iscoroutinefunction(fn)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.active[endpoint] -= 1
+                semaphore.release()
+
+        try:
+            remaining = expires - loop.time()
+            with span("call"):
+                if is_async:
+                    result = await asyncio.wait_for(_ainvoke(fn, args, on_token), remaining)
+                else:
+                    # Run in a copy of this context so spans opened inside fn land in the trace.
+                    context = contextvars.copy_context()
+                    future: Future = self.threads.submit(context.run, _invoke, fn, args, on_token)
+                    # Hold the slot until the thread is really done, not just until we stop waiting.
+                    future.add_done_callback(lambda _: _call_soon(loop, release))
+                    result = await asyncio.wait_for(asyncio.wrap_future(future), remaining)
+        except asyncio.TimeoutError:
+            self._count(endpoint, "timeout")
+            return fallback_result(fallback, "timeout")
+        except Exception as e:
+            self._count(endpoint, "error")
+            return fallback_result(fallback, "error", e)
+        finally:
+            if is_async:
+                release()
+
+        self._count(endpoint, "ok")
+        if isinstance(result, dict):
+            return result
+        return {"argument": str(result)}
+
+    def stats(self) -> Dict[str, Any]:
+        endpoints = set(self.budgets) | set(self.waiting) | set(self.active) | set(self.outcomes)
+        return {
+            "max_queue": self.max_queue,
+            "endpoints": {
+                name: {
+                    "budget": self.budgets.get(name, self.default_budget),
+                    "active": self.active[name],
+                    "waiting": self.waiting[name],
+                    **dict(self.outcomes[name]),
+                }
+                for name in sorted(endpoints)
+            },
+        }
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable[[], None]) -> None:
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:  # loop already closed
+        pass
+
+
+_EXECUTOR: Optional[CallExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> CallExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        with _EXECUTOR_LOCK:
+            if _EXECUTOR is None:
+                settings = get_settings()
+                _EXECUTOR = CallExecutor(
+                    budgets=parse_budgets(settings.CALL_BUDGETS),
+                    default_budget=settings.MAX_CONCURRENCY,
+                    max_queue=settings.MAX_QUEUE_DEPTH,
+                    thread_workers=settings.LLM_WORKERS,
+                )
+    return _EXECUTOR
@@ -0,0 +1,289 @@
+# backend/app/fact_index.py
+
+import os
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.app.config import get_settings
+from backend.app.generate_facts import (
+    FACTS_VERSION, FactStore, encode_record, expand_case_to_facts, generate_facts, load_facts,
+)
+from backend.app.retrieval import get_encoder
+from backend.app.snapshot import CorpusView, get_snapshot, write_snapshot
+
+# ----------------------------
+# On-disk layout (next to the facts snapshot)
+# ----------------------------
+#
+#   <facts>.emb.npy    float16 [n_facts, dim], L2-normalised, rows grouped by case
+#   <facts>.keys.npz   offsets [n_cases + 1] (case i owns rows offsets[i]:offsets[i + 1]),
+#                      sorted case id keys + their record index, and the build metadata
+#
+# Case ids are keyed by their JSON encoding (id_key), so the integer 1 and the
+# string "1" stay different cases.
+#
+# Embeddings are memory-mapped, so a lookup only touches one case's rows.
+# Cases ingested while running are held in memory (FactIndex.added) until
+# INGEST_COMPACT_AT of them accumulate, then appended to both files.
+
+
+def id_key(case_id: Any) -> str:
+    return json.dumps(case_id, sort_keys=True, ensure_ascii=False)
+
+
+def _build_meta(store: FactStore, encoder: Any) -> Dict[str, Any]:
+    return {
+        "encoder": getattr(encoder, "name", type(encoder).__name__),
+        "id_keys": "json",
+        "sha256": store.header.get("sha256"),
+        "version": store.header.get("version"),
+        "per_case": store.header.get("per_case"),
+        "count": len(store),
+        # the exact facts file: it is rewritten whenever facts are regenerated
+        "facts_mtime_ns": os.stat(store.path).st_mtime_ns,
+    }
+
+
+class FactIndex:
+    """
+    Per-case fact embeddings, computed once at build time. A lookup is a
+    single small matrix-vector product over the facts of one case.
+
+    Instances are immutable: extend() returns a new index that shares the
+    on-disk part, so a debate holding an index keeps a consistent view.
+    `corpus_sha` is the sha256 of the corpus version the index covers.
+    """
+
+    def __init__(self, store: FactStore, embeddings: np.ndarray, offsets: np.ndarray,
+                 ids: np.ndarray, rows: np.ndarray, encoder: Any, corpus_sha: Optional[str] = None,
+                 added: Optional[Dict[str, Tuple[List[str], np.ndarray]]] = None):
+        self.store = store
+        self.embeddings = embeddings
+        self.offsets = offsets
+        self.ids = ids
+        self.rows = rows
+        self.encoder = encoder
+        self.corpus_sha = corpus_sha or store.header.get("sha256")
+        self.added = added or {}
+
+    # ----------------------------
+    # Build / load
+    # ----------------------------
+
+    @staticmethod
+    def paths(facts_path: str) -> Dict[str, str]:
+        return {"embeddings": facts_path + ".emb.npy", "keys": facts_path + ".keys.npz"}
+
+    @classmethod
+    def build(cls, store: FactStore, encoder: Any, batch_cases: int = 2048, verbose: bool = False) -> "FactIndex":
+        """Encode every fact in `store` and persist the index next to it."""
+        counts = np.empty(len(store), dtype=np.int64)
+        case_ids = []
+        for i in range(len(store)):
+            record = store[i]
+            counts[i] = len(record["facts"])
+            case_ids.append(id_key(record["id"]))
+
+        def fill(embeddings: np.ndarray, offsets: np.ndarray) -> None:
+            for start in range(0, len(store), batch_cases):
+                stop = min(start + batch_cases, len(store))
+                texts = [fact for i in range(start, stop) for fact in store.facts(i)]
+                if texts:
+                    embeddings[offsets[start]:offsets[stop]] = encoder.encode(texts)
+
+        index = cls._save(store, encoder, counts, case_ids, fill)
+        if verbose:
+            print(f"✅ Embedded {int(index.offsets[-1])} facts for {len(store)} cases")
+        return index
+
+    @classmethod
+    def _save(cls, store: FactStore, encoder: Any, counts: np.ndarray, case_ids: List[str],
+              fill: Callable[[np.ndarray, np.ndarray], None]) -> "FactIndex":
+        """Write the index files for `store`, with `fill(embeddings, offsets)` writing the rows."""
+        paths = cls.paths(store.path)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        dim = encoder.encode(["probe"]).shape[1]
+        tmp_emb = paths["embeddings"] + f".{os.getpid()}.tmp.npy"
+        embeddings = np.lib.format.open_memmap(tmp_emb, mode="w+", dtype=np.float16, shape=(int(offsets[-1]), dim))
+        fill(embeddings, offsets)
+        embeddings.flush()
+        del embeddings
+
+        ids = np.array(case_ids, dtype=str)
+        order = np.argsort(ids, kind="stable")
+        meta = json.dumps(_build_meta(store, encoder))
+        tmp_keys = paths["keys"] + f".{os.getpid()}.tmp.npz"
+        np.savez(tmp_keys, offsets=offsets, ids=ids[order], rows=order, meta=np.array(meta))
+        os.replace(tmp_emb, paths["embeddings"])
+        os.replace(tmp_keys, paths["keys"])
+        return cls.load(store, encoder)
+
+    @classmethod
+    def load(cls, store: FactStore, encoder: Any) -> "FactIndex":
+        paths = cls.paths(store.path)
+        with np.load(paths["keys"]) as keys:
+            if json.loads(str(keys["meta"])) != _build_meta(store, encoder):
+                raise ValueError("fact index was built from other facts or another encoder")
+            offsets, ids, rows = keys["offsets"], keys["ids"], keys["rows"]
+        embeddings = np.load(paths["embeddings"], mmap_mode="r")
+        return cls(store, embeddings, offsets, ids, rows, encoder)
+
+    # ----------------------------
+    # Incremental updates
+    # ----------------------------
+
+    def extend(self, cases: List[Dict[str, Any]], corpus_sha: str) -> "FactIndex":
+        """A new index that also covers `cases` (appended to the corpus, now at `corpus_sha`)."""
+        per_case = self.store.header.get("per_case", 10)
+        added = dict(self.added)
+        cases = [case for case in cases if "id" in case]  # id-less cases are expanded per lookup anyway
+        facts = [expand_case_to_facts(case, 0, per_case=per_case) for case in cases]
+        texts = [fact for case_facts in facts for fact in case_facts]
+        vecs = self.encoder.encode(texts) if texts else np.empty((0, self.embeddings.shape[1]), dtype=np.float32)
+        row = 0
+        for case, case_facts in zip(cases, facts):
+            added[id_key(case["id"])] = (case_facts, vecs[row:row + len(case_facts)].astype(np.float16))
+            row += len(case_facts)
+        return FactIndex(self.store, self.embeddings, self.offsets, self.ids, self.rows,
+                         self.encoder, corpus_sha, added)
+
+    def compact(self, view: CorpusView) -> "FactIndex":
+        """
+        Append the in-memory cases to the facts snapshot and its index files.
+        Stored records and embedding rows are copied as they are; nothing is
+        re-expanded or re-encoded.
+        """
+        store = self.store
+        added = list(self.added.items())
+        header = {k: v for k, v in store.header.items() if k != "count"}
+        header.update(sha256=view.header["sha256"], size=view.header["size"], mtime_ns=view.header["mtime_ns"])
+        records = [store.raw(i) for i in range(len(store))]
+        records += [encode_record({"id": json.loads(key), "facts": facts}) for key, (facts, _) in added]
+        write_snapshot(records, store.path, header)
+
+        counts = np.concatenate([np.diff(self.offsets), [len(facts) for _, (facts, _) in added]]).astype(np.int64)
+        stored_ids = np.empty_like(self.ids)
+        stored_ids[self.rows] = self.ids
+        case_ids = stored_ids.tolist() + [key for key, _ in added]
+
+        def fill(embeddings: np.ndarray, offsets: np.ndarray) -> None:
+            base = int(self.offsets[-1])
+            embeddings[:base] = self.embeddings
+            for j, (_, (_, vecs)) in enumerate(added):
+                row = len(store) + j
+                embeddings[offsets[row]:offsets[row + 1]] = vecs
+
+        return FactIndex._save(load_facts(store.path), self.encoder, counts, case_ids, fill)
+
+    # ----------------------------
+    # Query
+    # ----------------------------
+
+    def case_row(self, case_id: Any) -> Optional[int]:
+        key = id_key(case_id)
+        pos = int(np.searchsorted(self.ids, key))
+        if pos < len(self.ids) and self.ids[pos] == key:
+            return int(self.rows[pos])
+        return None
+
+    def top_facts(self, case: Dict[str, Any], query: str, k: int = 3,
+                  exclude: Iterable[str] = ()) -> List[str]:
+        """
+        The `k` facts of `case` closest to `query`, skipping `exclude` (facts
+        already used in earlier rounds). Cases that aren't in the index (e.g.
+        typed in by the user) have their facts expanded and encoded on the fly.
+        """
+        row = self.case_row(case["id"]) if "id" in case else None
+        if row is not None:
+            facts = self.store.facts(row)
+            vecs = np.asarray(self.embeddings[self.offsets[row]:self.offsets[row + 1]], dtype=np.float32)
+        elif "id" in case and id_key(case["id"]) in self.added:
+            facts, vecs = self.added[id_key(case["id"])]
+            vecs = vecs.astype(np.float32)
+        else:
+            facts = expand_case_to_facts(case, 0)
+            vecs = self.encoder.encode(facts)
+        return rank_facts(facts, vecs, self.encoder.encode([query])[0], k, set(exclude))
+
+
+def rank_facts(facts: List[str], vecs: np.ndarray, qvec: np.ndarray, k: int, exclude: Set[str]) -> List[str]:
+    if not facts or k <= 0:
+        return []
+    order = np.argsort(-(vecs @ qvec), kind="stable")
+    picked = []
+    for i in order.tolist():
+        if facts[i] not in exclude and facts[i] not in picked:
+            picked.append(facts[i])
+            if len(picked) == k:
+                break
+    return picked
+
+
+# ----------------------------
+# Process-wide index
+# ----------------------------
+
+_FACT_INDEXES: Dict[str, FactIndex] = {}
+_FACT_INDEX_LOCK = threading.Lock()
+
+
+def get_fact_index(corpus_path: Optional[str] = None, facts_path: Optional[str] = None,
+                   verbose: bool = False) -> Optional[FactIndex]:
+    """
+    Fact index for the current view of a corpus. Cases appended since the
+    index was built are expanded and embedded incrementally; any other
+    corpus change regenerates the facts snapshot and its embeddings.
+    Returns None if there is no corpus.
+    """
+    settings = get_settings()
+    corpus_path = os.path.abspath(corpus_path or settings.CORPUS_PATH)
+    facts_path = os.path.abspath(facts_path or settings.FACTS_PATH)
+    view = get_snapshot(corpus_path)
+    if view is None:
+        return None
+    with _FACT_INDEX_LOCK:
+        index = _FACT_INDEXES.get(facts_path)
+        if index is not None and index.corpus_sha == view.header["sha256"]:
+            return index
+
+        encoder = index.encoder if index is not None else get_encoder()
+        if index is None:
+            index = _open_fact_index(corpus_path, facts_path, view, encoder, verbose)
+        start = view.checkpoints.get(index.corpus_sha)
+        if start is None:
+            index = _rebuild_fact_index(corpus_path, facts_path, view, encoder, verbose)
+            start = view.checkpoints.get(index.corpus_sha)
+        if start is not None and start < len(view):
+            index = index.extend([view[i] for i in range(start, len(view))], view.header["sha256"])
+            if len(index.added) >= settings.INGEST_COMPACT_AT:
+                index = index.compact(view)
+        _FACT_INDEXES[facts_path] = index
+        return index
+
+
+def _open_fact_index(corpus_path: str, facts_path: str, view: CorpusView, encoder: Any,
+                     verbose: bool = False) -> FactIndex:
+    """Load the stored index if it covers this corpus or an earlier version of it."""
+    try:
+        store = load_facts(facts_path)
+    except (OSError, ValueError, KeyError):
+        return _rebuild_fact_index(corpus_path, facts_path, view, encoder, verbose)
+    if store.header.get("version") != FACTS_VERSION or store.header.get("sha256") not in view.checkpoints:
+        store.close()
+        return _rebuild_fact_index(corpus_path, facts_path, view, encoder, verbose)
+    try:
+        return FactIndex.load(store, encoder)
+    except (OSError, KeyError, ValueError):
+        return FactIndex.build(store, encoder, verbose=verbose)
+
+
+def _rebuild_fact_index(corpus_path: str, facts_path: str, view: CorpusView, encoder: Any,
+                        verbose: bool = False) -> FactIndex:
+    # Only the bytes `view` covers, so the facts match it exactly.
+    generate_facts(corpus_path, facts_path, limit=view.header["size"])
+    return FactIndex.build(load_facts(facts_path), encoder, verbose=verbose)
@@ -1,8 +1,39 @@
-import json
+"""
+Expand every case in the corpus into short factual statements for the lawyers.
+
+    python -m backend.app.generate_facts --workers 4
+    python -m backend.app.generate_facts --output Metadata/facts.jsonl
+
+Cases are streamed from the JSONL corpus in chunks, expanded across a
+process pool (in input order) and written straight to the output, so memory
+stays flat however large the corpus is. The output format follows the
+extension:
+
+  *.snapshot (default)  indexed binary store, one record per case, opened
+                        lazily with load_facts() (mmap, O(1) access)
+  *.jsonl               one {"id", "facts"} record per line
+  *.py                  the legacy DEFAULT_FACTS = [...] module
+"""
+
 import os
+import json
+import hashlib
+import argparse
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.app.retrieval import cases_from_json
+from backend.app.snapshot import CorpusSnapshot, write_snapshot
 
 INPUT_FILE = "Metadata/cases.jsonl"
-OUTPUT_FILE = "backend/app/facts.py"
+OUTPUT_FILE = "Metadata/facts.snapshot"
+# Bump when expand_case_to_facts changes, so stored facts get regenerated
+FACTS_VERSION = 2
+
+Chunk = List[Tuple[int, str]]
+
 
 def expand_case_to_facts(case: dict, idx: int, per_case: int = 10) -> list:
     facts = []
@@ -18,33 +49,220 @@ def expand_case_to_facts(case: dict, idx: int, per_case: int = 10) -> list:
 
     words = text.split()
     for i in range(1, per_case - 4):  # already added 4
-        snippet = " ".join(words[i*10:(i+1)*10]) or f"Detail {i} not specified."
-        facts.append(f"In {title}, evidence showed that {snippet.strip()}.")
+        snippet = " ".join(words[i*10:(i+1)*10]).strip().rstrip(".")
+        if not snippet:
+            break  # short case text: no filler facts, they would only dilute retrieval
+        facts.append(f"In {title}, evidence showed that {snippet}.")
 
     return facts
 
 
-def generate_facts(input_file: str, output_file: str, per_case: int = 10):
-    all_facts = []
-    with open(input_file, "r", encoding="utf-8") as f:
-        for idx, line in enumerate(f, start=1):
-            try:
-                case = json.loads(line)
-                facts = expand_case_to_facts(case, idx, per_case=per_case)
-                all_facts.extend(facts)
-            except json.JSONDecodeError:
-                print(f"⚠️ Skipping invalid JSON line {idx}")
+# ----------------------------
+# Streaming pipeline
+# ----------------------------
+
+def iter_case_lines(input_file: str, limit: Optional[int] = None,
+                    read: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (line number, raw line) for every non-blank line of a JSONL corpus,
+    reading at most `limit` bytes. If given, `read` tracks the bytes read:
+    their count in read["size"] and their sha256 in read["digest"].
+    """
+    remaining = limit
+    with open(input_file, "rb") as f:
+        for idx, raw in enumerate(f, start=1):
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                raw = raw[:remaining]
+                remaining -= len(raw)
+            if read is not None:
+                read["size"] += len(raw)
+                read["digest"].update(raw)
+            line = raw.decode("utf-8")
+            if line.strip():
+                yield idx, line
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+ChunkResult = Tuple[List[bytes], int, List[int]]
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def expand_chunk(chunk: Chunk, per_case: int = 10) -> ChunkResult:
+    """
+    Parse, expand and encode one chunk of lines in a worker. Returns
+    (encoded {"id", "facts"} records, fact count, line numbers of invalid JSON).
+    Lines are split into cases exactly as the corpus snapshot does, so
+    record i belongs to snapshot row i.
+    """
+    records, n_facts, skipped = [], 0, []
+    for idx, line in chunk:
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            skipped.append(idx)
+            continue
+        for case in cases_from_json(obj, idx):
+            if not isinstance(case, dict):
+                case = {"text": str(case)}
+            facts = expand_case_to_facts(case, idx, per_case=per_case)
+            n_facts += len(facts)
+            records.append(encode_record({"id": case.get("id", idx), "facts": facts}))
+    return records, n_facts, skipped
+
+
+def iter_fact_records(
+    input_file: str,
+    per_case: int = 10,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    totals: Optional[Dict[str, int]] = None,
+    limit: Optional[int] = None,
+    read: Optional[Dict[str, Any]] = None,
+) -> Iterator[bytes]:
+    """
+    Stream encoded {"id", "facts"} records in corpus order, counting cases
+    and facts into `totals`. With workers > 1 chunks are expanded in a
+    process pool, with at most 2 x workers chunks in flight so a slow
+    writer can't make the queue (and memory) grow. `limit` and `read`
+    are passed to iter_case_lines.
+    """
+    chunks = chunked(iter_case_lines(input_file, limit, read), chunk_size)
+    workers = workers or 1
+    totals = totals if totals is not None else {}
 
-    with open(output_file, "w", encoding="utf-8") as out:
+    def emit(result: ChunkResult) -> List[bytes]:
+        records, n_facts, skipped = result
+        for idx in skipped:
+            print(f"⚠️ Skipping invalid JSON line {idx}")
+        totals["cases"] = totals.get("cases", 0) + len(records)
+        totals["facts"] = totals.get("facts", 0) + n_facts
+        return records
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from emit(expand_chunk(chunk, per_case))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: "deque[Future]" = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(expand_chunk, chunk, per_case))
+            if len(pending) >= 2 * workers:
+                yield from emit(pending.popleft().result())
+        while pending:
+            yield from emit(pending.popleft().result())
+
+
+def _write_jsonl(records: Iterable[bytes], output_file: str) -> None:
+    tmp = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as out:
+        for record in records:
+            out.write(record + b"\n")
+    os.replace(tmp, output_file)
+
+
+def _write_python(records: Iterable[bytes], output_file: str) -> None:
+    tmp = f"{output_file}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as out:
         out.write("# Auto-generated facts file\n")
         out.write("DEFAULT_FACTS = [\n")
-        for fact in all_facts:
-            out.write(f'    "{fact}",\n')
+        for record in records:
+            for fact in json.loads(record)["facts"]:
+                # json.dumps escapes quotes, backslashes and newlines into a valid Python literal
+                out.write(f"    {json.dumps(fact)},\n")
         out.write("]\n")
+    os.replace(tmp, output_file)
+
+
+def generate_facts(
+    input_file: str,
+    output_file: str,
+    per_case: int = 10,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Expand `input_file` into facts at `output_file` (format by extension).
+    With `limit`, only that many leading bytes of the corpus are read (e.g.
+    the part a CorpusView covers). Returns the fact count.
+    """
+    totals = {"cases": 0, "facts": 0}
+    read: Dict[str, Any] = {"size": 0, "digest": hashlib.sha256()}
+    records = iter_fact_records(input_file, per_case, workers, chunk_size, totals, limit, read)
+
+    if output_file.endswith(".py"):
+        _write_python(records, output_file)
+    elif output_file.endswith(".jsonl"):
+        _write_jsonl(records, output_file)
+    else:
+        st = os.stat(input_file)
+        header = {
+            "kind": "facts",
+            "version": FACTS_VERSION,
+            "per_case": per_case,
+            "source": os.path.abspath(input_file),
+            "mtime_ns": st.st_mtime_ns,
+        }
+        # size and sha256 cover exactly the bytes the records were expanded from
+        write_snapshot(records, output_file, header,
+                       extra=lambda: {"size": read["size"], "sha256": read["digest"].hexdigest()})
+
+    print(f"✅ Generated {totals['facts']} facts for {totals['cases']} cases into {output_file}")
+    return totals["facts"]
+
+
+# ----------------------------
+# Lazy loading
+# ----------------------------
+
+class FactStore(CorpusSnapshot):
+    """
+    mmap-ed facts snapshot: nothing is decoded until a case is accessed.
+    store[i] is the i-th {"id", "facts"} record in corpus order, and
+    is_stale(corpus) tells whether the corpus changed since generation.
+    """
+
+    def is_stale(self, source: str) -> bool:
+        return self.header.get("version") != FACTS_VERSION or super().is_stale(source)
+
+    def facts(self, i: int) -> List[str]:
+        return self[i]["facts"]
+
+    def iter_facts(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield from self.facts(i)
+
+
+def load_facts(path: str = OUTPUT_FILE) -> FactStore:
+    return FactStore(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--per-case", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes expanding facts")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="cases per work unit")
+    args = parser.parse_args()
 
-    print(f"✅ Generated {len(all_facts)} facts into {output_file}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    generate_facts(args.input, args.output, per_case=args.per_case, workers=args.workers, chunk_size=args.chunk_size)
 
 
 if __name__ == "__main__":
-    os.makedirs("backend/app", exist_ok=True)
-    generate_facts(INPUT_FILE, OUTPUT_FILE, per_case=10)
+    main()
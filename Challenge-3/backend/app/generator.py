@@ -2,14 +2,29 @@
 
 import random
 import logging
-from typing import Dict, Any, List
-from backend.app.retrieval import load_corpus
+from typing import Dict, Any, Optional
+from backend.app.config import get_settings
+from backend.app.sampling import NoMatchingCase, get_sampler
+from backend.app.snapshot import get_snapshot
 
 logger = logging.getLogger(__name__)
 
-def generate_case(corpus_path: str = "Metadata/cases.jsonl", verbose: bool = True) -> Dict[str, Any]:
+def generate_case(
+    corpus_path: Optional[str] = None,
+    verbose: bool = True,
+    filters: Optional[Dict[str, Any]] = None,
+    user: Optional[str] = None,
+    weighted: bool = False,
+) -> Dict[str, Any]:
     """
-    Generate a random legal case from the loaded corpus.
+    Generate a random legal case from the corpus (CORPUS_PATH by default).
+    The snapshot is compiled once and mmap-ed, so a draw is O(1) and only
+    the chosen record is parsed. Ingested cases are included as soon as
+    they are added.
+
+    `filters` (jurisdiction, tags, year_from, year_to), `weighted` (favour
+    cases not debated recently) and `user` (no repeats for that user) go
+    through the CaseSampler. Raises NoMatchingCase if nothing matches.
     
     Returns a dictionary with at least:
       - id
@@ -20,8 +35,8 @@ def generate_case(corpus_path: str = "Metadata/cases.jsonl", verbose: bool = Tru
       - tags
     """
     try:
-        docs: List[Dict[str, Any]] = load_corpus(corpus_path, verbose=verbose)
-        if not docs:
+        snapshot = get_snapshot(corpus_path or get_settings().CORPUS_PATH, verbose=verbose)
+        if snapshot is None or not len(snapshot):
             logger.warning("⚠️ Corpus is empty, returning placeholder case.")
             return {
                 "id": 0,
@@ -31,19 +46,29 @@ def generate_case(corpus_path: str = "Metadata/cases.jsonl", verbose: bool = Tru
                 "tags": ["empty"],
                 "text": "⚠️ No cases available in the corpus."
             }
-        case = random.choice(docs)
-        # Ensure required keys exist
-        case.setdefault("id", 0)
-        case.setdefault("title", "Untitled Case")
-        case.setdefault("text", "No description available.")
-        case.setdefault("year", "N/A")
-        case.setdefault("jurisdiction", "Unknown")
-        case.setdefault("tags", [])
+        # Unset filters ({"jurisdiction": None, "tags": [], ...}) keep the O(1) snapshot draw
+        filters = {k: v for k, v in (filters or {}).items() if v not in (None, "", [])} or None
+        if filters or user is not None or weighted:
+            case = get_sampler(corpus_path).sample(filters, user=user, weighted=weighted)
+        else:
+            case = snapshot.sample(random)
+        # Ensure required keys exist, on a copy: the drawn case may be shared
+        case = {
+            "id": 0,
+            "title": "Untitled Case",
+            "text": "No description available.",
+            "year": "N/A",
+            "jurisdiction": "Unknown",
+            "tags": [],
+            **case,
+        }
 
         if verbose:
             logger.info(f"🎲 Selected case: {case.get('title')}")
         return case
 
+    except NoMatchingCase:
+        raise
     except Exception as e:
         logger.error(f"⚠️ Error generating case: {e}")
         return {
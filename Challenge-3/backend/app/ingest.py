@@ -0,0 +1,202 @@
+# backend/app/ingest.py
+"""
+Add cases to the corpus while the service is running.
+
+    POST /cases                                        # through the API
+    python -m backend.app.ingest new_cases.jsonl       # append from the command line; a
+                                                       # server with CORPUS_WATCH_INTERVAL > 0
+                                                       # picks the cases up
+
+Nothing is rebuilt: the corpus snapshot, the fact index and any search
+index built for the corpus only process the new cases, and readers switch
+to the new view atomically (see snapshot.CorpusView), so requests already
+in flight keep the cases they started with.
+
+Cases that repeat an existing id or nearly repeat an existing case's text
+(see dedup.py) are skipped, rejected or appended per INGEST_DUPLICATES.
+Lines appended to the file by other writers are taken as they are.
+"""
+
+import sys
+import time
+import argparse
+import threading
+from typing import Any, Dict, List, Optional
+
+from backend.app.config import get_settings
+from backend.app.dedup import DuplicateCases, get_dedup_index
+from backend.app.fact_index import get_fact_index
+from backend.app.metrics import CORPUS_DUPLICATES, CORPUS_INGESTED
+from backend.app.retrieval import iter_corpus, refresh_corpus_indexes
+from backend.app.sampling import get_sampler
+from backend.app.snapshot import append_cases, current_view, get_snapshot
+
+DUPLICATE_POLICIES = ("skip", "reject", "allow")
+
+# Checking for duplicates and appending happen as one step per process
+_INGEST_LOCK = threading.Lock()
+
+
+def validate_cases(payload: Any) -> List[Dict[str, Any]]:
+    """Cases from a case object, a list of them or {"cases": [...]}; raises ValueError if malformed."""
+    cases = payload.get("cases", payload) if isinstance(payload, dict) else payload
+    if isinstance(cases, dict):
+        cases = [cases]
+    if not isinstance(cases, list) or not cases:
+        raise ValueError('Expected a case object, a list of cases or {"cases": [...]}')
+    for i, case in enumerate(cases):
+        if not isinstance(case, dict):
+            raise ValueError(f"Case {i} is not an object")
+        if not str(case.get("text") or case.get("title") or "").strip():
+            raise ValueError(f"Case {i} needs a title or a text")
+    return cases
+
+
+def refresh_indexes(corpus_path: Optional[str] = None, facts_path: Optional[str] = None) -> None:
+    """Catch the fact index, the case sampler and any search index already built up with the corpus."""
+    corpus_path = corpus_path or get_settings().CORPUS_PATH
+    try:
+        get_fact_index(corpus_path, facts_path)
+    except Exception as e:
+        print(f"⚠️ Could not update fact index: {e}")
+    refresh_corpus_indexes(corpus_path)
+    get_sampler(corpus_path, build=False)
+    get_dedup_index(corpus_path, build=False)
+
+
+def find_duplicates(cases: List[Dict[str, Any]], corpus_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Cases of `cases` that duplicate the corpus or an earlier case of the batch, with what they match."""
+    index = get_dedup_index(corpus_path)
+    if index is None:
+        return []
+    return [{"index": i, **match} for i, match in enumerate(index.check(cases)) if match is not None]
+
+
+def ingest_cases(
+    cases: List[Dict[str, Any]],
+    corpus_path: Optional[str] = None,
+    facts_path: Optional[str] = None,
+    source: str = "api",
+    update_indexes: bool = True,
+    duplicates: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Append `cases` to the corpus and update the indexes. Cases without an
+    integer id are numbered after the largest one. Duplicates are handled
+    per `duplicates` (default INGEST_DUPLICATES): "skip" leaves them out,
+    "reject" raises DuplicateCases, "allow" appends them. Returns the
+    assigned ids, the duplicates found and the new corpus size.
+    """
+    corpus_path = corpus_path or get_settings().CORPUS_PATH
+    policy = duplicates or get_settings().INGEST_DUPLICATES
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy {policy!r}, expected one of {DUPLICATE_POLICIES}")
+    start = time.perf_counter()
+    with _INGEST_LOCK:
+        found = find_duplicates(cases, corpus_path) if policy != "allow" else []
+        if found and policy == "reject":
+            raise DuplicateCases(found)
+        skipped = {d["index"] for d in found}
+        cases = [case for i, case in enumerate(cases) if i not in skipped]
+        if cases:
+            view, stored = append_cases(corpus_path, cases)
+        else:
+            view, stored = get_snapshot(corpus_path), []
+    CORPUS_INGESTED.inc(len(stored), source=source)
+    if found:
+        CORPUS_DUPLICATES.inc(len(found), source=source)
+    if update_indexes and stored:
+        refresh_indexes(corpus_path, facts_path)
+    elapsed = time.perf_counter() - start
+    skipped_note = f", skipped {len(found)} duplicates" if found else ""
+    print(f"📥 Ingested {len(stored)} cases in {elapsed:.3f}s{skipped_note} ({len(view) if view else 0} in corpus)")
+    return {
+        "added": len(stored),
+        "ids": [case.get("id") for case in stored],
+        "duplicates": found,
+        "count": len(view) if view else 0,
+        "elapsed": round(elapsed, 3),
+    }
+
+
+# ----------------------------
+# File-watch mode
+# ----------------------------
+
+class CorpusWatcher(threading.Thread):
+    """
+    Polls the corpus file and applies lines appended by other writers
+    (the ingest CLI, `cat new.jsonl >> cases.jsonl`, ...). Lines still being
+    written are left for the next poll; a rewritten file is recompiled.
+    """
+
+    def __init__(self, corpus_path: Optional[str] = None, facts_path: Optional[str] = None,
+                 interval: Optional[float] = None):
+        super().__init__(name="corpus-watcher", daemon=True)
+        settings = get_settings()
+        self.corpus_path = corpus_path or settings.CORPUS_PATH
+        self.facts_path = facts_path
+        self.interval = interval if interval is not None else settings.CORPUS_WATCH_INTERVAL
+        self._stopped = threading.Event()
+
+    def poll(self) -> int:
+        """Apply changes made by other writers; returns the number of cases picked up."""
+        before = current_view(self.corpus_path)
+        view = get_snapshot(self.corpus_path)
+        if view is None or view is before:
+            return 0
+        start = view.checkpoints.get(before.header["sha256"]) if before is not None else None
+        added = len(view) - start if start is not None else len(view)
+        CORPUS_INGESTED.inc(added, source="watch")
+        refresh_indexes(self.corpus_path, self.facts_path)
+        print(f"📥 Picked up {added} cases from {self.corpus_path} ({len(view)} in corpus)")
+        return added
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"⚠️ Corpus watch failed: {e}")
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+def start_watcher(corpus_path: Optional[str] = None, interval: Optional[float] = None) -> Optional[CorpusWatcher]:
+    """Start watching the corpus if CORPUS_WATCH_INTERVAL (or `interval`) is positive."""
+    interval = interval if interval is not None else get_settings().CORPUS_WATCH_INTERVAL
+    if interval <= 0:
+        return None
+    watcher = CorpusWatcher(corpus_path, interval=interval)
+    watcher.start()
+    print(f"👀 Watching {watcher.corpus_path} for new cases every {interval}s")
+    return watcher
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="JSONL files of cases to append")
+    parser.add_argument("--corpus", default=get_settings().CORPUS_PATH)
+    parser.add_argument("--update-indexes", action="store_true",
+                        help="also update the fact index here instead of leaving it to the server")
+    parser.add_argument("--duplicates", choices=DUPLICATE_POLICIES, default=get_settings().INGEST_DUPLICATES,
+                        help="what to do with cases that duplicate the corpus (default INGEST_DUPLICATES)")
+    args = parser.parse_args()
+
+    cases = [case for path in args.files for case in iter_corpus(path, verbose=True)]
+    try:
+        cases = validate_cases(cases)
+    except ValueError as e:
+        sys.exit(f"⚠️ {e}")
+    try:
+        result = ingest_cases(cases, args.corpus, source="cli", update_indexes=args.update_indexes,
+                              duplicates=args.duplicates)
+    except DuplicateCases as e:
+        sys.exit(f"⚠️ {e}: {e.duplicates[:10]}")
+    for d in result["duplicates"][:10]:
+        print(f"🔁 Case {d['index']} duplicates {d['in']} case {d['duplicate_of']} ({d['reason']})")
+
+
+if __name__ == "__main__":
+    main()
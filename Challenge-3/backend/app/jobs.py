@@ -0,0 +1,329 @@
+# backend/app/jobs.py
+"""
+Background debates: the request only queues the debate, and a fixed pool
+of workers runs it, so open HTTP requests no longer grow with LLM latency.
+
+    POST /debate?background=true        # 202 {"job_id": ..., "status": "queued"}
+    GET  /jobs/{job_id}                 # status, progress and, once done, the debate
+    GET  /jobs/{job_id}/events          # progress as NDJSON (or ?format=sse), until the job ends
+    python -m backend.app.jobs --workers 8      # workers in their own process
+
+Jobs live in a SQLite file (JOBS_DB) shared by the API and any worker
+process. With JOB_WORKERS > 0 each API process also runs that many
+workers itself; set it to 0 to leave the jobs to separate worker processes.
+A job whose worker stops heartbeating for DEBATE_TIMEOUT + 60s is picked
+up again (at most MAX_ATTEMPTS times).
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.app.config import get_settings
+from backend.app.debate import stream_debate
+from backend.app.metrics import JOBS_FINISHED
+from backend.app.sessions import connect_sqlite, get_session_store
+
+ENDPOINT = "debate_job"
+MAX_ATTEMPTS = 3
+FINAL_STATES = ("done", "failed")
+
+
+class QueueFull(Exception):
+    """JOB_MAX_QUEUED jobs are already waiting."""
+
+
+# ----------------------------
+# Queue
+# ----------------------------
+
+class JobQueue:
+    """
+    Jobs and their progress events in a WAL-mode SQLite file. Workers claim
+    the oldest queued job atomically; only the claiming worker can record
+    its progress and result. Finished jobs are dropped after `ttl` seconds.
+    """
+
+    def __init__(self, path: str, lease: float, ttl: float, max_queued: int):
+        self.path = path
+        self.lease = lease
+        self.ttl = ttl
+        self.max_queued = max_queued
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, payload TEXT NOT NULL, status TEXT NOT NULL,"
+            " created REAL NOT NULL, started REAL, finished REAL, owner TEXT, heartbeat REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " job_id TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, PRIMARY KEY (job_id, seq))"
+        )
+
+    def _transaction(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn()
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """Queue a job; raises QueueFull if `max_queued` jobs are waiting."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        def insert() -> None:
+            queued = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+            if queued >= self.max_queued:
+                raise QueueFull(f"{queued} jobs already queued")
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('done', 'failed') AND finished < ?", (now - self.ttl,))]
+            self._conn.executemany("DELETE FROM job_events WHERE job_id = ?", [(j,) for j in expired])
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(j,) for j in expired])
+            self._conn.execute(
+                "INSERT INTO jobs (id, payload, status, created) VALUES (?, ?, 'queued', ?)",
+                (job_id, json.dumps(payload, ensure_ascii=False), now),
+            )
+
+        self._transaction(insert)
+        return job_id
+
+    def claim(self, owner: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Take the oldest queued job (or one whose worker went silent): (job_id, payload) or None."""
+        now = time.time()
+        # Idle polls only read, so they don't take the write lock from submit/add_event.
+        with self._lock:
+            claimable = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?) LIMIT 1",
+                (now - self.lease,),
+            ).fetchone()
+        if claimable is None:
+            return None
+
+        def take() -> Optional[Tuple[str, Dict[str, Any]]]:
+            while True:
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM jobs WHERE status = 'queued'"
+                    " OR (status = 'running' AND heartbeat < ?) ORDER BY created LIMIT 1",
+                    (now - self.lease,),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, payload, attempts = row
+                if attempts >= MAX_ATTEMPTS:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'failed', finished = ?, owner = NULL, error = ? WHERE id = ?",
+                        (now, f"gave up after {attempts} attempts", job_id),
+                    )
+                    continue
+                # A retried job starts over, so its progress does too.
+                self._conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', owner = ?, heartbeat = ?, started = ?,"
+                    " attempts = attempts + 1 WHERE id = ?",
+                    (owner, now, now, job_id),
+                )
+                return job_id, json.loads(payload)
+
+        return self._transaction(take)
+
+    def add_event(self, job_id: str, owner: str, event: Dict[str, Any]) -> None:
+        """Record a progress event; also the owner's heartbeat."""
+        def append() -> None:
+            cur = self._conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND owner = ?", (time.time(), job_id, owner))
+            if cur.rowcount:
+                self._conn.execute(
+                    "INSERT INTO job_events (job_id, seq, event) VALUES"
+                    " (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?), ?)",
+                    (job_id, job_id, json.dumps(event, ensure_ascii=False)),
+                )
+
+        self._transaction(append)
+
+    def _end(self, job_id: str, owner: str, status: str, result: Optional[Dict[str, Any]] = None,
+             error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, owner = NULL, result = ?, error = ?"
+                " WHERE id = ? AND owner = ?",
+                (status, time.time(), json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, job_id, owner),
+            )
+
+    def finish(self, job_id: str, owner: str, result: Dict[str, Any]) -> None:
+        self._end(job_id, owner, "done", result=result)
+
+    def fail(self, job_id: str, owner: str, error: str) -> None:
+        self._end(job_id, owner, "failed", error=error)
+
+    def requeue(self, job_id: str, owner: str) -> None:
+        """Give a job back (e.g. on shutdown) without counting the attempt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', owner = NULL, attempts = MAX(attempts - 1, 0)"
+                " WHERE id = ? AND owner = ?",
+                (job_id, owner),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, created, started, finished, attempts, result, error,"
+                " (SELECT COUNT(*) FROM job_events WHERE job_id = jobs.id) FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, created, started, finished, attempts, result, error, events = row
+        job: Dict[str, Any] = {
+            "job_id": job_id,
+            "status": status,
+            "created": created,
+            "started": started,
+            "finished": finished,
+            "attempts": attempts,
+            "events": events,
+        }
+        if result is not None:
+            job["debate"] = json.loads(result)
+        if error is not None:
+            job["error"] = error
+        return job
+
+    def events(self, job_id: str, after: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, event FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)
+            ).fetchall()
+        return [(seq, json.loads(event)) for seq, event in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    settings = get_settings()
+    return JobQueue(settings.JOBS_DB, lease=settings.DEBATE_TIMEOUT + 60,
+                    ttl=settings.JOB_TTL, max_queued=settings.JOB_MAX_QUEUED)
+
+
+# ----------------------------
+# Workers
+# ----------------------------
+
+class JobWorker:
+    """
+    `concurrency` coroutines on one event loop, each claiming and running
+    one debate at a time. Idle workers poll the queue every
+    JOB_POLL_INTERVAL seconds, doubling the wait up to JOB_POLL_MAX_INTERVAL
+    while it stays empty; wake() skips the wait after a local submit.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None, concurrency: Optional[int] = None,
+                 poll_interval: Optional[float] = None, max_poll_interval: Optional[float] = None):
+        settings = get_settings()
+        self.queue = queue or get_job_queue()
+        self.concurrency = concurrency if concurrency is not None else settings.JOB_WORKERS
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOB_POLL_INTERVAL
+        self.max_poll_interval = max(self.poll_interval, max_poll_interval if max_poll_interval is not None
+                                     else settings.JOB_POLL_MAX_INTERVAL)
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    def start(self) -> None:
+        """Start the workers on the running event loop."""
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        print(f"👷 {self.concurrency} debate job workers started")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run(self) -> None:
+        """Run the workers until cancelled."""
+        self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    def wake(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _work(self) -> None:
+        delay = self.poll_interval
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, self.owner)
+            except Exception as e:
+                print(f"⚠️ Could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), delay)
+                    delay = self.poll_interval
+                except asyncio.TimeoutError:
+                    delay = min(delay * 2, self.max_poll_interval)
+                continue
+            delay = self.poll_interval
+            await self._run(*job)
+
+    async def _run(self, job_id: str, payload: Dict[str, Any]) -> None:
+        case = payload.get("case") or {}
+        try:
+            async for event in stream_debate(case, endpoint=ENDPOINT):
+                if event["type"] == "turn":
+                    await asyncio.to_thread(self.queue.add_event, job_id, self.owner, event)
+                elif event["type"] == "done":
+                    debate = {"session_id": str(uuid.uuid4()), **event["debate"]}
+                    await asyncio.to_thread(get_session_store().put, debate["session_id"], debate)
+                    await asyncio.to_thread(self.queue.finish, job_id, self.owner, debate)
+                    JOBS_FINISHED.inc(outcome="done")
+                    print(f"🏁 Job {job_id} finished in {debate['elapsed']}s. Session ID:", debate["session_id"])
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.queue.requeue, job_id, self.owner)
+            raise
+        except Exception as e:
+            print(f"⚠️ Job {job_id} failed: {e}")
+            JOBS_FINISHED.inc(outcome="failed")
+            await asyncio.to_thread(self.queue.fail, job_id, self.owner, str(e) or type(e).__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=max(get_settings().JOB_WORKERS, 1),
+                        help="debates run at once by this process")
+    args = parser.parse_args()
+
+    worker = JobWorker(concurrency=args.workers)
+    print(f"👷 Serving debate jobs from {worker.queue.path}")
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        print("👋 Worker stopped; its running jobs were requeued")
+
+
+if __name__ == "__main__":
+    main()
@@ -39,20 +39,29 @@ def rag_lawyer(case_text: str, round_num: int, context: str = "") -> str:
     ctx = f" Context: {context}" if context else ""
     return (base.format(case_text=case_text) + ctx).strip()
 
-def chaos_lawyer(case_text: str, round_num: int) -> str:
+def chaos_lawyer(case_text: str, round_num: int, context: str = "") -> str:
     """
     Defense lawyer: unpredictable, creative, sometimes absurd but persuasive.
+    `context` is the prosecution argument of the same round, if available.
     """
-    return random.choice(DEFENSE_TEMPLATES).format(case_text=case_text).strip()
+    base = random.choice(DEFENSE_TEMPLATES).format(case_text=case_text)
+    rebuttal = "Contrary to the prosecution's claims, " if context else ""
+    return (rebuttal + base).strip()
+
+def judge_event(case: Any, round_num: int) -> str:
+    """
+    Judge introduces a random courtroom twist or procedural event for a round.
+    Independent of the lawyers' arguments, so it can run alongside them.
+    """
+    event = random.choice(JUDGE_EVENTS)
+    return f"Round {round_num + 1}: {event}"
 
 def judge(case: str, pros: List[Dict[str, str]], cons: List[Dict[str, str]]) -> str:
     """
     Judge introduces a random courtroom twist or procedural event.
     Chooses an event and slightly personalizes it based on the current round.
     """
-    event = random.choice(JUDGE_EVENTS)
-    round_num = len(pros)
-    return f"Round {round_num}: {event}"
+    return judge_event(case, len(pros) - 1)
 
 def summarize_verdict(case: Dict[str, Any], pros: List[Dict[str, str]], cons: List[Dict[str, str]], verdict: str) -> str:
     """
@@ -1,124 +1,332 @@
-import uuid
 import os
 import time
-from fastapi import FastAPI, Body
-from typing import Dict, Any, List
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+import uuid
+import json
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Body, Query, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import Dict, Any, AsyncIterator, List, Optional
 
-from backend.app.models import rag_lawyer, chaos_lawyer, judge
+from backend.app.config import get_settings
 from backend.app.generator import generate_case
-from backend.app.retrieval import load_corpus
-from backend.app.llm import summarize_verdict_llm,judge_random_event
-
-app = FastAPI(title="⚖️ AI Legal Debate API")
+from backend.app.dedup import DuplicateCases
+from backend.app.ingest import ingest_cases, start_watcher, validate_cases
+from backend.app.batch import JobBusy, get_batch_store, parse_batch, run_batch
+from backend.app.jobs import FINAL_STATES, JobWorker, QueueFull, get_job_queue
+from backend.app.sampling import NoMatchingCase, get_sampler
+from backend.app.startup import READINESS, start_prewarm
+from backend.app.debate import run_debate, stream_debate
+from backend.app.models import summarize_verdict_async
+from backend.app.sessions import get_session_store
+from backend.app.cache import get_response_cache
+from backend.app.context import cache_stats as token_cache_stats
+from backend.app.executor import Overloaded, get_executor
+from backend.app.metrics import REGISTRY, HTTP_SECONDS
 
-DEBATE_SESSIONS: Dict[str, Any] = {}
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Indexes warm up in the background so /healthz answers right away; /readyz waits for them.
+    start_prewarm()
+    # Pick up cases appended to the corpus file by other processes (CORPUS_WATCH_INTERVAL > 0).
+    watcher = start_watcher()
+    # Job workers run on the server's event loop, next to the request handlers.
+    if JOB_WORKER is not None:
+        JOB_WORKER.start()
+    yield
+    if JOB_WORKER is not None:
+        await JOB_WORKER.stop()
+    if watcher is not None:
+        watcher.stop()
 
-executor = ThreadPoolExecutor(max_workers=5)
+app = FastAPI(title="⚖️ AI Legal Debate API", lifespan=lifespan)
 
-LLM_TIMEOUT = int(os.getenv("LLM_TIMEOUT", "120"))
+SESSIONS = get_session_store()
+EXECUTOR = get_executor()
+JOBS = get_job_queue()
+JOB_WORKER = JobWorker() if get_settings().JOB_WORKERS > 0 else None
 
-def call_with_timeout(fn, fallback: Any, timeout: int = LLM_TIMEOUT) -> Any:
-    start = time.time()
-    future = executor.submit(fn)
+def admit(endpoint: str) -> None:
+    """Shed the request with 503 if this endpoint already has a full LLM call queue."""
     try:
-        result = future.result(timeout=timeout)
-        elapsed = round(time.time() - start, 2)
-        print(f"⏱️ LLM call finished in {elapsed}s")
-        return result
-    except FuturesTimeout:
-        return fallback if isinstance(fallback, dict) else {"argument": fallback}
-    except Exception as e:
-        return {"argument": f"{fallback} (⚠️ error: {e})"}
-
-try:
-    DOCS: List[Dict[str, Any]] = load_corpus("Metadata/cases.jsonl")
-    print(f"✅ Loaded {len(DOCS)} cases into memory.")
-except Exception as e:
-    print(f"⚠️ Could not load corpus: {e}")
-    DOCS = []
+        EXECUTOR.admit(endpoint)
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+def mark_debated(case: Dict[str, Any]) -> None:
+    """
+    Make weighted /generate_case draws avoid this case for a while. May
+    refresh the corpus snapshot and sampler, so call it off the event loop.
+    """
+    sampler = get_sampler(build=False)
+    if sampler is not None:
+        sampler.mark_debated(case.get("id"))
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not raw path, so session ids don't explode cardinality.
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    HTTP_SECONDS.observe(time.perf_counter() - start, method=request.method, path=path, status=response.status_code)
+    return response
+
+# Scrape-time views of state owned by other components
+REGISTRY.gauge("executor_queue_depth", "LLM calls waiting for an endpoint budget slot", ["endpoint"],
+               fn=lambda: dict(EXECUTOR.waiting))
+REGISTRY.gauge("executor_active_calls", "LLM calls currently holding a budget slot", ["endpoint"],
+               fn=lambda: dict(EXECUTOR.active))
+REGISTRY.counter("executor_calls_total", "LLM calls by endpoint and outcome", ["endpoint", "outcome"],
+                 fn=lambda: {(e, o): n for e, counts in list(EXECUTOR.outcomes.items()) for o, n in list(counts.items())})
+REGISTRY.gauge("session_store_sessions", "Sessions currently stored", fn=lambda: len(SESSIONS))
+REGISTRY.gauge("session_store_bytes", "Approximate size of stored sessions", fn=lambda: SESSIONS.size_bytes())
+REGISTRY.gauge("debate_jobs", "Background debate jobs by status", ["status"], fn=lambda: JOBS.counts())
+REGISTRY.counter("llm_cache_hits_total", "Response cache hits", fn=lambda: get_response_cache().stats()["hits"])
+REGISTRY.counter("llm_cache_misses_total", "Response cache misses", fn=lambda: get_response_cache().stats()["misses"])
+REGISTRY.counter("prompt_token_cache_hits_total", "Prompt texts whose tokenization was reused",
+                 fn=lambda: token_cache_stats()["hits"])
+REGISTRY.counter("prompt_token_cache_misses_total", "Prompt texts tokenized",
+                 fn=lambda: token_cache_stats()["misses"])
+REGISTRY.gauge("startup_seconds", "Time spent warming up each component", ["component"],
+               fn=lambda: dict(READINESS.seconds))
+REGISTRY.gauge("ready", "1 once startup warm-up has finished", fn=lambda: int(READINESS.ready))
 
 @app.get("/")
 def root() -> Dict[str, str]:
     return {"message": "✅ Legal Debate API is running"}
 
+@app.get("/healthz")
+def healthz() -> Dict[str, Any]:
+    """Liveness: the process is up and serving, whether or not warm-up has finished."""
+    return {"status": "ok", "pid": os.getpid()}
+
+@app.get("/readyz")
+def readyz() -> JSONResponse:
+    """Readiness: 503 until the corpus and the indexes built on it are warmed up."""
+    status = {**READINESS.status(), "pid": os.getpid()}
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 @app.post("/generate_case")
-def get_case() -> Dict[str, Any]:
-    case = generate_case()
+def get_case(
+    jurisdiction: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None, description="Repeat or comma-separate; all must match"),
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    weighted: bool = Query(False, description="Favour cases not debated recently"),
+    user: Optional[str] = Query(None, description="Don't repeat a case for this user until all matches were drawn"),
+) -> Dict[str, Any]:
+    filters = {
+        "jurisdiction": jurisdiction,
+        "tags": [t.strip() for tag in tags or [] for t in tag.split(",") if t.strip()],
+        "year_from": year_from,
+        "year_to": year_to,
+    }
+    try:
+        case = generate_case(filters=filters, user=user, weighted=weighted)
+    except NoMatchingCase as e:
+        raise HTTPException(status_code=404, detail=str(e))
     title = case.get("title") or case.get("text", "Unknown Case")
     print(f"🎲 Generated case: {title}")
     return {"case": case}
 
+@app.post("/cases")
+def add_cases(
+    payload: Any = Body(...),
+    duplicates: Optional[str] = Query(None, pattern="^(skip|reject|allow)$",
+                                      description="Duplicate handling (default INGEST_DUPLICATES)"),
+) -> Dict[str, Any]:
+    """
+    Append cases to the corpus: a case object, a list of them or
+    {"cases": [...]}. They can be drawn by /generate_case and have facts
+    for debates as soon as this returns; no restart or rebuild needed.
+    Cases repeating an existing id or text are listed under "duplicates"
+    and skipped, or the request fails with 409 (duplicates=reject).
+    """
+    try:
+        cases = validate_cases(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return ingest_cases(cases, duplicates=duplicates)
+    except DuplicateCases as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "duplicates": e.duplicates})
+
 @app.post("/debate")
-def debate(payload: Dict[str, Any] = Body(...)) -> Dict[str, Any]:
+async def debate(
+    payload: Dict[str, Any] = Body(...),
+    background: Optional[bool] = Query(None, description="Queue the debate and return a job id (default DEBATE_BACKGROUND)"),
+) -> Dict[str, Any]:
     inbound = payload.get("case", payload)
     case_dict = inbound if isinstance(inbound, dict) else {"text": str(inbound)}
-    case_text = case_dict.get("text", str(case_dict))
-
-    print("🚀 Debate started for case:", case_text)
-
-    prosecution_turns, defense_turns, judge_events = [], [], []
-
-    for round_num in range(3):
-        print(f"⚖️ Starting round {round_num+1}...")
-        
-        pros_arg = call_with_timeout(
-            lambda: rag_lawyer(case_dict, round_num),
-            fallback={"argument": "Prosecution argument unavailable"}
-        )
-        pros_text = pros_arg.get("argument", str(pros_arg))
-        print(f"✅ Prosecution round {round_num+1}: {pros_text[:80]}")
-        prosecution_turns.append(pros_arg)
-
-        cons_arg = call_with_timeout(
-            lambda: chaos_lawyer(case_dict, round_num),
-            fallback={"argument": "Defense argument unavailable"}
-        )
-        cons_text = cons_arg.get("argument", str(cons_arg))
-        print(f"✅ Defense round {round_num+1}: {cons_text[:80]}")
-        defense_turns.append(cons_arg)
-
-        event = call_with_timeout(
-            lambda: judge_random_event(case_dict, round_num),
-            fallback="Judge event unavailable"
-        )
-
-        print(f"✅ Judge round {round_num+1}: {str(event)[:80]}")
-
-        judge_events.append({
-            "round": round_num + 1,
-            "argument": event.get("argument", "No event returned") if isinstance(event, dict) else str(event)
-        })
-
-
-    debate_obj = {
-        "session_id": str(uuid.uuid4()),
-        "case": case_dict,
-        "case_text": case_text,
-        "prosecution": prosecution_turns,
-        "defense": defense_turns,
-        "judge_events": judge_events,
-    }
 
-    DEBATE_SESSIONS[debate_obj["session_id"]] = debate_obj
-    print("🏁 Debate finished successfully. Session ID:", debate_obj["session_id"])
+    if background if background is not None else get_settings().DEBATE_BACKGROUND:
+        try:
+            job_id = await asyncio.to_thread(JOBS.submit, {"case": case_dict})
+        except QueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+        if JOB_WORKER is not None:
+            JOB_WORKER.wake()
+        await asyncio.to_thread(mark_debated, case_dict)
+        print("📋 Debate queued as job", job_id)
+        return JSONResponse(status_code=202, headers={"Location": f"/jobs/{job_id}"},
+                            content={"job_id": job_id, "status": "queued"})
+
+    admit("debate")
+    print("🚀 Debate started for case:", case_dict.get("text", str(case_dict)))
+    await asyncio.to_thread(mark_debated, case_dict)
+
+    debate_obj = {"session_id": str(uuid.uuid4()), **await run_debate(case_dict, endpoint="debate")}
+
+    await asyncio.to_thread(SESSIONS.put, debate_obj["session_id"], debate_obj)
+    print(f"🏁 Debate finished in {debate_obj['elapsed']}s. Session ID:", debate_obj["session_id"])
     return debate_obj
 
-@app.post("/summarize_verdict")
-def summarize_verdict(payload: dict = Body(...)) -> str:
-    case = payload.get("case", {})
-    pros = payload.get("pros", [])
-    defs = payload.get("defs", [])
-    verdict = payload.get("verdict", "Prosecution")
+@app.post("/debate/stream")
+async def debate_stream(
+    payload: Dict[str, Any] = Body(...),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+) -> StreamingResponse:
+    """
+    Same debate as /debate, but each turn is sent as soon as it is produced
+    (NDJSON lines by default, or Server-Sent Events with ?format=sse).
+    The final "done" event carries the full debate object and session id.
+    """
+    inbound = payload.get("case", payload)
+    case_dict = inbound if isinstance(inbound, dict) else {"text": str(inbound)}
+    session_id = str(uuid.uuid4())
+    admit("debate_stream")
+    await asyncio.to_thread(mark_debated, case_dict)
 
-    case_title = case.get("title", "Untitled Case")
-    case_text = case.get("text", "")
+    async def events() -> AsyncIterator[str]:
+        print("🚀 Streaming debate started for case:", case_dict.get("text", str(case_dict)))
+        async for event in stream_debate(case_dict, endpoint="debate_stream", tokens=True):
+            if event["type"] == "done":
+                event["debate"] = {"session_id": session_id, **event["debate"]}
+                await asyncio.to_thread(SESSIONS.put, session_id, event["debate"])
+                print(f"🏁 Streaming debate finished in {event['debate']['elapsed']}s. Session ID:", session_id)
+            line = json.dumps(event)
+            yield f"data: {line}\n\n" if format == "sse" else line + "\n"
 
-    pros_args = [p.get("argument", "") for p in pros if isinstance(p, dict)]
-    defs_args = [d.get("argument", "") for d in defs if isinstance(d, dict)]
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
 
-    summary = (
-        f"In the case of **{case_title}**, the court examined the matter of {case_text}. "
+@app.post("/debate/batch")
+async def debate_batch(
+    payload: Any = Body(...),
+    replay: bool = Query(False, description="When resuming, send the results stored so far first"),
+    retry_failed: bool = Query(False, description="When resuming, debate failed cases again"),
+) -> StreamingResponse:
+    """
+    Debate many cases: {"case_ids": [...], "cases": [...]} (or a plain list)
+    starts a job, {"job_id": ...} resumes one. Results are streamed as NDJSON
+    as debates finish and stored per case, so a batch cut short resumes
+    where it stopped. The job id is in the first line and the X-Job-Id header.
+    """
+    store = get_batch_store()
+    job_id = payload.get("job_id") if isinstance(payload, dict) else None
+    if job_id is None:
+        try:
+            items = parse_batch(payload)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        admit("debate_batch")
+        job_id = await asyncio.to_thread(store.create, items)
+    else:
+        admit("debate_batch")
+
+    events = run_batch(str(job_id), store, replay=replay, retry_failed=retry_failed)
+    try:
+        first = await events.__anext__()
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown batch job: {job_id}")
+    except JobBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    print(f"📋 Batch job {job_id}: {first['pending']} of {first['total']} cases to debate")
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            yield json.dumps(first) + "\n"
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Job-Id": str(job_id)})
+
+@app.get("/debate/batch/{job_id}")
+def get_batch(job_id: str, results: bool = Query(False, description="Include the stored results")) -> Dict[str, Any]:
+    store = get_batch_store()
+    job = store.job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown batch job: {job_id}")
+    if results:
+        job["results"] = store.results(job_id)
+    return job
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict[str, Any]:
+    """Status of a background debate; "debate" (with its session id) once it is done."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(
+    job_id: str,
+    after: int = Query(0, description="Only events after this seq (resume a subscription)"),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+) -> StreamingResponse:
+    """
+    Follow a background debate: each turn as it is stored ({"seq": n,
+    "type": "turn", ...}), then {"type": "done" | "failed", "job": {...}}.
+    Works whichever process runs the job; events are polled from the queue.
+    """
+    if await asyncio.to_thread(JOBS.get, job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+
+    async def events() -> AsyncIterator[str]:
+        seq = after
+        while True:
+            job = await asyncio.to_thread(JOBS.get, job_id)
+            for seq, event in await asyncio.to_thread(JOBS.events, job_id, seq):
+                line = json.dumps({"seq": seq, **event})
+                yield f"id: {seq}\ndata: {line}\n\n" if format == "sse" else line + "\n"
+            if job is None or job["status"] in FINAL_STATES:
+                line = json.dumps({"type": job["status"] if job else "failed", "job": job})
+                yield f"data: {line}\n\n" if format == "sse" else line + "\n"
+                return
+            await asyncio.sleep(get_settings().JOB_POLL_INTERVAL)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@app.get("/session/{session_id}")
+def get_session(session_id: str) -> Dict[str, Any]:
+    session = SESSIONS.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    return session
+
+@app.get("/executor/stats")
+def executor_stats() -> Dict[str, Any]:
+    return EXECUTOR.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of latency histograms, counters and gauges."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+def cache_stats() -> Dict[str, Any]:
+    return get_response_cache().stats()
+
+def template_summary(case: Dict[str, Any], pros_args: List[str], defs_args: List[str], verdict: str) -> str:
+    """Canned summary, used when the summary call fails or times out."""
+    return (
+        f"In the case of **{case.get('title', 'Untitled Case')}**, the court examined the matter of {case.get('text', '')}. "
         f"The Prosecution argued forcefully, citing points such as {', '.join(pros_args[:2]) or 'general legal principles'}. "
         f"In contrast, the Defense countered with arguments including {', '.join(defs_args[:2]) or 'unconventional claims'}. "
         f"After weighing both sides, the Judge concluded that the {verdict} presented stronger reasoning and "
@@ -126,5 +334,43 @@ def summarize_verdict(payload: dict = Body(...)) -> str:
         f"This ultimately led to a verdict in favor of the **{verdict}**."
     )
 
-    return summary
+@app.post("/summarize_verdict")
+async def summarize_verdict(payload: dict = Body(...)) -> Dict[str, Any]:
+    """
+    Summarize a debate. Pass `session_id` (+ `verdict`) to summarize a stored
+    debate; the transcript fields (`case`, `pros`, `defs`) are only needed
+    for debates that have no session. The summary call goes through the
+    executor's "summarize" budget with case and turns cut to the token
+    budget (backend.app.context); on failure the canned summary is returned.
+    """
+    session_id = payload.get("session_id")
+    session = await asyncio.to_thread(SESSIONS.get, session_id) if session_id else None
+    if session_id and session is None and "case" not in payload:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session: {session_id}")
+    session = session or {}
+
+    case = session.get("case") or payload.get("case", {})
+    pros = session.get("prosecution") or payload.get("pros", [])
+    defs = session.get("defense") or payload.get("defs", [])
+    verdict = payload.get("verdict") or payload.get("judge_decision") or "Prosecution"
+
+    # Only the arguments reach the prompt, so only they make up the summary cache key
+    # (not latency, facts or other per-run turn fields).
+    pros = [{"argument": p.get("argument", "")} for p in pros if isinstance(p, dict)]
+    defs = [{"argument": d.get("argument", "")} for d in defs if isinstance(d, dict)]
+
+    admit("summarize")
+    result = await EXECUTOR.run(
+        summarize_verdict_async, case, pros, defs, verdict,
+        endpoint="summarize", role="summary",
+        fallback=template_summary(case, [p.get("argument", "") for p in pros],
+                                  [d.get("argument", "") for d in defs], verdict),
+    )
+    summary = result["argument"]
 
+    if session:
+        await asyncio.to_thread(SESSIONS.update, session_id, judge_decision=verdict, summary=summary)
+    response = {"session_id": session_id, "summary": summary}
+    if result.get("fallback"):
+        response.update(fallback=True, reason=result["reason"])
+    return response
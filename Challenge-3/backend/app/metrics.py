@@ -0,0 +1,288 @@
+# backend/app/metrics.py
+
+import math
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ----------------------------
+# Prometheus-style metrics (text exposition format 0.0.4)
+# ----------------------------
+
+LabelValues = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def _lines(self, items: Sequence[Tuple[LabelValues, float]]) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, k)} {_format_value(v)}" for k, v in items]
+
+    def _collect(self, fn: Optional[Callable[[], Any]], values: Dict[LabelValues, float]) -> List[Tuple[LabelValues, float]]:
+        """Current samples: read from `fn` at scrape time if given, else the stored values."""
+        if fn is None:
+            with self._lock:
+                return sorted(values.items())
+        try:
+            current = fn()
+        except Exception:
+            return []
+        # fn returns a number, or {label value(s): number} for labelled metrics
+        if isinstance(current, dict):
+            return sorted(((k if isinstance(k, tuple) else (k,)), v) for k, v in current.items())
+        return [((), current)]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonic counter, incremented directly or read from `fn` at scrape time."""
+
+    kind = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        fn: Optional[Callable[[], Any]] = None,
+    ):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self.fn = fn
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return self._lines(self._collect(self.fn, self._values))
+
+
+class Gauge(Counter):
+    """Gauge, set directly or read from `fn` at scrape time."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts..., sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.setdefault(key, [0.0] * (len(self.buckets) + 1))
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = (), fn: Optional[Callable[[], Any]] = None) -> Counter:
+        return self.register(Counter(name, help, labels, fn))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), fn: Optional[Callable[[], Any]] = None) -> Gauge:
+        return self.register(Gauge(name, help, labels, fn))  # type: ignore[return-value]
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+# ----------------------------
+# Debate pipeline metrics
+# ----------------------------
+
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_duration_seconds", "Wall time of one LLM call, including queueing", ["role", "round", "endpoint"])
+LLM_FALLBACKS = REGISTRY.counter(
+    "llm_call_fallbacks_total", "LLM calls that resolved to a fallback", ["role", "reason"])
+DEBATE_SECONDS = REGISTRY.histogram(
+    "debate_duration_seconds", "Wall time of a full debate", ["endpoint"])
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "executor_queue_wait_seconds", "Time an LLM call waited for its endpoint budget", ["endpoint"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 30))
+HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency (until response headers for streams)",
+    ["method", "path", "status"])
+CORPUS_LOAD_SECONDS = REGISTRY.gauge(
+    "corpus_load_seconds", "Time spent compiling/opening the corpus snapshot or building an index", ["stage"])
+CORPUS_CASES = REGISTRY.gauge("corpus_cases", "Cases in the loaded corpus snapshot")
+CORPUS_INGESTED = REGISTRY.counter(
+    "corpus_ingested_cases_total", "Cases added to the corpus while running", ["source"])
+CORPUS_DUPLICATES = REGISTRY.counter(
+    "corpus_duplicate_cases_total", "Ingested cases found to duplicate the corpus or their batch", ["source"])
+BATCH_ITEMS = REGISTRY.counter(
+    "debate_batch_items_total", "Cases debated in batch jobs, by outcome", ["outcome"])
+JOBS_FINISHED = REGISTRY.counter(
+    "debate_jobs_finished_total", "Background debate jobs run by this process, by outcome", ["outcome"])
+PROMPT_TOKENS = REGISTRY.histogram(
+    "llm_prompt_tokens", "Estimated prompt tokens per LLM call after budgeting", ["role"],
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192))
+PROMPT_TOKENS_TRIMMED = REGISTRY.counter(
+    "llm_prompt_tokens_trimmed_total", "Prompt tokens removed by the budget and fact deduplication", ["role"])
+
+
+# ----------------------------
+# Tracing
+# ----------------------------
+
+class Span:
+    __slots__ = ("name", "attrs", "start", "end", "children")
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        origin = self.start if origin is None else origin
+        end = self.end if self.end is not None else time.perf_counter()
+        out: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round((end - self.start) * 1000, 2),
+        }
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.children:
+            out["children"] = [c.to_dict(origin) for c in sorted(self.children, key=lambda c: c.start)]
+        return out
+
+
+_CURRENT_SPAN: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """
+    Child span of the current one. A no-op unless a trace() is active, so it
+    is cheap to leave in hot paths. asyncio tasks inherit the span that was
+    current when they were created.
+    """
+    parent = _CURRENT_SPAN.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _CURRENT_SPAN.set(child)
+    try:
+        yield child
+    finally:
+        child.end = time.perf_counter()
+        _CURRENT_SPAN.reset(token)
+
+
+def annotate(**attrs: Any) -> None:
+    """Add attributes to the current span, if tracing is on."""
+    current = _CURRENT_SPAN.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+@contextmanager
+def trace(name: str, enabled: bool = True, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Root span for one request; yields None (and records nothing) when disabled."""
+    if not enabled:
+        yield None
+        return
+    root = Span(name, attrs)
+    token = _CURRENT_SPAN.set(root)
+    try:
+        yield root
+    finally:
+        root.end = time.perf_counter()
+        try:
+            _CURRENT_SPAN.reset(token)
+        except ValueError:  # exited from another context, e.g. a closed async generator
+            pass
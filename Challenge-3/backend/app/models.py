@@ -1,34 +1,130 @@
 # backend/app/models.py
 
-from typing import List, Dict, Any, Union
+import time
+import random
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator, List, Dict, Any, Tuple, Union
+from backend.app import prompts
+from backend.app.cache import cached
+from backend.app.config import get_settings
+from backend.app.context import budget_case_text, build_context, build_summary_context
+from backend.app.providers import get_provider
 from backend.app.llm import (
     rag_lawyer,
     chaos_lawyer,
     summarize_verdict as summarize_verdict_llm,  # alias to keep old name
     judge as judge_random_event,
+    judge_event as judge_event_llm,
 )
 
 
+# -------------------------------------------------------------------
+# Provider dispatch
+# With USE_MOCK the template functions in backend.app.llm answer directly;
+# otherwise the prompt goes to the provider selected by LLM_PROVIDER.
+# -------------------------------------------------------------------
+
+# Set while someone reads the lawyers' tokens as they arrive (/debate/stream). Streamed
+# calls bypass the provider's micro-batcher, so every other debate makes plain calls.
+_TOKEN_STREAM: ContextVar[bool] = ContextVar("token_stream", default=False)
+
+
+@contextmanager
+def token_stream(enabled: bool = True) -> Iterator[None]:
+    """Lawyer calls made (or tasks created) inside stream their tokens if LLM_STREAM is on."""
+    token = _TOKEN_STREAM.set(enabled)
+    try:
+        yield
+    finally:
+        _TOKEN_STREAM.reset(token)
+
+
+def _stream() -> bool:
+    return get_settings().STREAM and _TOKEN_STREAM.get()
+
+
+def _generate(prompt: str, stream: bool = False) -> Union[str, Iterator[str]]:
+    provider = get_provider()
+    if stream and provider.supports_streaming:
+        return provider.stream(prompt)
+    return provider.generate(prompt)
+
+
+async def _agenerate(prompt: str, stream: bool = False) -> Union[str, AsyncIterator[str]]:
+    provider = get_provider()
+    if stream and provider.supports_streaming:
+        return provider.astream(prompt)
+    return await provider.agenerate(prompt)
+
+
+def _mock_latency() -> float:
+    settings = get_settings()
+    return max(0.0, settings.MOCK_DELAY + random.uniform(-settings.MOCK_JITTER, settings.MOCK_JITTER))
+
+
+def _mock_wait() -> None:
+    delay = _mock_latency()
+    if delay:
+        time.sleep(delay)
+
+
+async def _amock_wait() -> None:
+    delay = _mock_latency()
+    if delay:
+        await asyncio.sleep(delay)
+
+
+def _summary_inputs(
+    case: Union[Dict[str, Any], str],
+    pros: List[Dict[str, str]],
+    cons: List[Dict[str, str]],
+) -> Tuple[str, List[Dict[str, str]], List[Dict[str, str]]]:
+    """Case text and turns cut to the summary's token budget (see backend.app.context)."""
+    case_text, pros_args, cons_args = build_summary_context(
+        prompts.case_text_of(case),
+        [p.get("argument", "") for p in pros],
+        [c.get("argument", "") for c in cons],
+    )
+    pros = [{**p, "argument": a} for p, a in zip(pros, pros_args)]
+    cons = [{**c, "argument": a} for c, a in zip(cons, cons_args)]
+    return case_text, pros, cons
+
+
 # -------------------------------------------------------------------
 # Unified interface wrappers for main.py and other modules
+# Each wrapper goes through the response cache (backend.app.cache).
 # -------------------------------------------------------------------
 
-def rag_lawyer_wrapper(case_text: str, round_num: int, context: str = "") -> str:
+@cached("prosecution")
+def rag_lawyer_wrapper(case_text: str, round_num: int, context: str = "", history: str = "") -> str:
     """
     Prosecution lawyer (RAG) wrapper.
-    Delegates to backend.app.llm.rag_lawyer.
+    Delegates to backend.app.llm.rag_lawyer. `context` holds retrieved facts,
+    `history` a summary of earlier rounds; both are cut to the token budget.
     """
-    return rag_lawyer(case_text, round_num, context)
+    ctx = build_context("prosecution", case_text, context, history)
+    if get_settings().USE_MOCK:
+        _mock_wait()
+        return rag_lawyer(ctx.case_text, round_num, ctx.context)
+    return _generate(prompts.prosecution_prompt(ctx.case_text, round_num, ctx.context, ctx.history))
 
 
-def chaos_lawyer_wrapper(case_text: str, round_num: int) -> str:
+@cached("defense")
+def chaos_lawyer_wrapper(case_text: str, round_num: int, context: str = "") -> str:
     """
     Defense lawyer (chaotic/random style) wrapper.
     Delegates to backend.app.llm.chaos_lawyer.
     """
-    return chaos_lawyer(case_text, round_num)
+    ctx = build_context("defense", case_text, context)
+    if get_settings().USE_MOCK:
+        _mock_wait()
+        return chaos_lawyer(ctx.case_text, round_num, ctx.context)
+    return _generate(prompts.defense_prompt(ctx.case_text, round_num, ctx.context))
 
 
+@cached("summary")
 def summarize_verdict(
     case: Union[Dict[str, Any], str],
     pros: List[Dict[str, str]],
@@ -38,9 +134,14 @@ def summarize_verdict(
     """
     Summarize the debate outcome and verdict using the LLM.
     """
-    return summarize_verdict_llm(case, pros, cons, verdict)
+    case_text, pros, cons = _summary_inputs(case, pros, cons)
+    if get_settings().USE_MOCK:
+        _mock_wait()
+        return summarize_verdict_llm(case, pros, cons, verdict)
+    return _generate(prompts.summary_prompt(case_text, pros, cons, verdict))
 
 
+@cached("judge")
 def judge(
     case: Union[Dict[str, Any], str],
     rag_turns: List[Dict[str, str]],
@@ -50,4 +151,66 @@ def judge(
     Generate a random but plausible courtroom event.
     Does NOT decide the verdict – user provides the final decision.
     """
-    return judge_random_event(case, rag_turns, chaos_turns)
+    if get_settings().USE_MOCK:
+        _mock_wait()
+        return judge_random_event(case, rag_turns, chaos_turns)
+    return _generate(prompts.judge_event_prompt(budget_case_text("judge", case), len(rag_turns) - 1))
+
+
+@cached("judge_event")
+def judge_event(case: Union[Dict[str, Any], str], round_num: int) -> str:
+    """
+    Courtroom event for a single round, independent of the lawyers' turns.
+    """
+    if get_settings().USE_MOCK:
+        _mock_wait()
+        return judge_event_llm(case, round_num)
+    return _generate(prompts.judge_event_prompt(budget_case_text("judge", case), round_num))
+
+
+# -------------------------------------------------------------------
+# Async variants used by the debate engine. Provider calls run on the
+# event loop (pooled async HTTP, micro-batched where supported) and may
+# return a token stream inside token_stream() when LLM_STREAM is on.
+# -------------------------------------------------------------------
+
+@cached("prosecution")
+async def rag_lawyer_async(case_text: str, round_num: int, context: str = "",
+                           history: str = "") -> Union[str, AsyncIterator[str]]:
+    ctx = build_context("prosecution", case_text, context, history)
+    if get_settings().USE_MOCK:
+        await _amock_wait()
+        return rag_lawyer(ctx.case_text, round_num, ctx.context)
+    return await _agenerate(prompts.prosecution_prompt(ctx.case_text, round_num, ctx.context, ctx.history),
+                            stream=_stream())
+
+
+@cached("defense")
+async def chaos_lawyer_async(case_text: str, round_num: int, context: str = "") -> Union[str, AsyncIterator[str]]:
+    ctx = build_context("defense", case_text, context)
+    if get_settings().USE_MOCK:
+        await _amock_wait()
+        return chaos_lawyer(ctx.case_text, round_num, ctx.context)
+    return await _agenerate(prompts.defense_prompt(ctx.case_text, round_num, ctx.context), stream=_stream())
+
+
+@cached("judge_event")
+async def judge_event_async(case: Union[Dict[str, Any], str], round_num: int) -> str:
+    if get_settings().USE_MOCK:
+        await _amock_wait()
+        return judge_event_llm(case, round_num)
+    return await _agenerate(prompts.judge_event_prompt(budget_case_text("judge", case), round_num))
+
+
+@cached("summary")
+async def summarize_verdict_async(
+    case: Union[Dict[str, Any], str],
+    pros: List[Dict[str, str]],
+    cons: List[Dict[str, str]],
+    verdict: str
+) -> str:
+    case_text, pros, cons = _summary_inputs(case, pros, cons)
+    if get_settings().USE_MOCK:
+        await _amock_wait()
+        return summarize_verdict_llm(case, pros, cons, verdict)
+    return await _agenerate(prompts.summary_prompt(case_text, pros, cons, verdict))
@@ -0,0 +1,62 @@
+# backend/app/prompts.py
+
+from typing import Any, Dict, List, Union
+
+# ----------------------------
+# Prompt builders for real LLM providers
+# (the mock in backend.app.llm works from templates instead)
+# ----------------------------
+
+
+def case_text_of(case: Union[Dict[str, Any], str]) -> str:
+    if isinstance(case, dict):
+        return case.get("text") or case.get("title") or str(case)
+    return str(case)
+
+
+def prosecution_prompt(case_text: str, round_num: int, context: str = "", history: str = "") -> str:
+    # Stable parts first, so providers that cache prompt prefixes can reuse them across rounds
+    parts = [
+        "You are the prosecution lawyer in a mock trial. Argue persuasively, citing facts and precedent.",
+        f"Case: {case_text}",
+    ]
+    if history:
+        parts.append(f"Earlier rounds:\n{history}")
+    if context:
+        parts.append(f"Relevant facts and context: {context}")
+    parts.append(f"Give your round {round_num + 1} argument in 2-4 sentences.")
+    return "\n".join(parts)
+
+
+def defense_prompt(case_text: str, round_num: int, context: str = "") -> str:
+    parts = [
+        "You are the defense lawyer in a mock trial: creative, unpredictable, sometimes absurd, but persuasive.",
+        f"Case: {case_text}",
+    ]
+    if context:
+        parts.append(f"The prosecution just argued: {context}")
+    parts.append(f"Give your round {round_num + 1} rebuttal in 2-4 sentences.")
+    return "\n".join(parts)
+
+
+def judge_event_prompt(case: Union[Dict[str, Any], str], round_num: int) -> str:
+    return "\n".join([
+        "You are the judge in a mock trial. Do not decide the verdict.",
+        f"Case: {case_text_of(case)}",
+        f"Describe one surprising courtroom event or procedural twist for round {round_num + 1} in one sentence.",
+    ])
+
+
+def summary_prompt(
+    case: Union[Dict[str, Any], str],
+    pros: List[Dict[str, str]],
+    cons: List[Dict[str, str]],
+    verdict: str,
+) -> str:
+    return "\n".join([
+        "Summarize this mock trial and the judge's decision in 3-5 sentences.",
+        f"Case: {case_text_of(case)}",
+        "Prosecution arguments: " + "; ".join(p.get("argument", "") for p in pros),
+        "Defense arguments: " + "; ".join(c.get("argument", "") for c in cons),
+        f"Verdict: in favor of the {verdict}.",
+    ])
@@ -0,0 +1,343 @@
+# backend/app/providers.py
+
+import json
+import asyncio
+import threading
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import httpx
+
+from backend.app.config import Settings, get_settings
+
+
+# ----------------------------
+# Micro-batching
+# ----------------------------
+
+class MicroBatcher:
+    """
+    Collects prompts submitted concurrently on one event loop and sends them
+    as a single batched request once `max_batch` prompts are queued or
+    `window` seconds have passed since the first one, whichever comes first.
+    Prompts are only batched together when their generation options match.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[List[str], Dict[str, Any]], Awaitable[List[str]]],
+        max_batch: int = 8,
+        window: float = 0.01,
+    ):
+        self.send_batch = send_batch
+        self.max_batch = max_batch
+        self.window = window
+        self._pending: Dict[str, List[Tuple[str, "asyncio.Future[str]"]]] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._options: Dict[str, Dict[str, Any]] = {}
+        # The loop only keeps weak references to tasks; in-flight batches are held here
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.batches_sent = 0
+
+    async def submit(self, prompt: str, options: Dict[str, Any]) -> str:
+        loop = asyncio.get_running_loop()
+        group = json.dumps(options, sort_keys=True)
+        future: "asyncio.Future[str]" = loop.create_future()
+        self._pending.setdefault(group, []).append((prompt, future))
+        self._options[group] = options
+        if len(self._pending[group]) >= self.max_batch:
+            self._flush(group)
+        elif group not in self._timers:
+            self._timers[group] = loop.call_later(self.window, self._flush, group)
+        return await future
+
+    def _flush(self, group: str) -> None:
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        options = self._options.pop(group, None)
+        batch = [(p, f) for p, f in self._pending.pop(group, []) if not f.cancelled()]
+        if batch:
+            task = asyncio.ensure_future(self._run(batch, options))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[str]"]], options: Dict[str, Any]) -> None:
+        self.batches_sent += 1
+        try:
+            results = await self.send_batch([p for p, _ in batch], options)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), text in zip(batch, results):
+            if not future.done():
+                future.set_result(text)
+
+
+# ----------------------------
+# Provider interface
+# ----------------------------
+
+class LLMProvider:
+    """Prompt-level text generation backend."""
+
+    name = "base"
+    supports_streaming = False
+    supports_batching = False
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    def options(self, **overrides: Any) -> Dict[str, Any]:
+        opts = {"temperature": self.settings.TEMPERATURE, "max_tokens": self.settings.MAX_TOKENS}
+        opts.update({k: v for k, v in overrides.items() if v is not None})
+        return opts
+
+    def generate(self, prompt: str, **options: Any) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, **options: Any) -> Iterator[str]:
+        yield self.generate(prompt, **options)
+
+    async def agenerate(self, prompt: str, **options: Any) -> str:
+        raise NotImplementedError
+
+    async def astream(self, prompt: str, **options: Any) -> AsyncIterator[str]:
+        yield await self.agenerate(prompt, **options)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class HTTPProvider(LLMProvider):
+    """
+    Base for HTTP backends. One keep-alive connection pool per process for
+    sync calls and one per event loop for async calls, with at most
+    LLM_MAX_CONCURRENCY requests in flight per loop.
+    """
+
+    def __init__(self, settings: Settings):
+        super().__init__(settings)
+        self.base_url = settings.BASE_URL.rstrip("/")
+        self.limits = httpx.Limits(
+            max_connections=settings.MAX_CONNECTIONS,
+            max_keepalive_connections=settings.MAX_CONNECTIONS,
+            keepalive_expiry=60,
+        )
+        self.timeout = httpx.Timeout(settings.TIMEOUT, connect=10)
+        self.headers = {"Authorization": f"Bearer {settings.API_KEY}"} if settings.API_KEY else {}
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        # event loop -> (client, semaphore, batcher)
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Semaphore, Optional[MicroBatcher]]]" = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        base_url=self.base_url, limits=self.limits, timeout=self.timeout, headers=self.headers
+                    )
+        return self._client
+
+    def _loop_state(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore, Optional[MicroBatcher]]:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url, limits=self.limits, timeout=self.timeout, headers=self.headers
+            )
+            batcher = None
+            if self.supports_batching and self.settings.BATCH_SIZE > 1:
+                batcher = MicroBatcher(self._send_batch, self.settings.BATCH_SIZE, self.settings.BATCH_WINDOW_MS / 1000)
+            state = (client, asyncio.Semaphore(self.settings.MAX_CONCURRENCY), batcher)
+            self._loops[loop] = state
+        return state
+
+    async def agenerate(self, prompt: str, **options: Any) -> str:
+        _, _, batcher = self._loop_state()
+        opts = self.options(**options)
+        if batcher is not None:
+            return await batcher.submit(prompt, opts)
+        return (await self._send_batch([prompt], opts))[0]
+
+    async def _send_batch(self, prompts: List[str], options: Dict[str, Any]) -> List[str]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        state = self._loops.pop(loop, None)
+        if state is not None:
+            await state[0].aclose()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+# ----------------------------
+# Ollama (/api/generate)
+# ----------------------------
+
+class OllamaProvider(HTTPProvider):
+    """Ollama's native API. Streams NDJSON; one prompt per request."""
+
+    name = "ollama"
+    supports_streaming = True
+
+    def _payload(self, prompt: str, options: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        return {
+            "model": self.settings.MODEL,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {"temperature": options["temperature"], "num_predict": options["max_tokens"]},
+        }
+
+    def generate(self, prompt: str, **options: Any) -> str:
+        r = self.client.post("/api/generate", json=self._payload(prompt, self.options(**options), False))
+        r.raise_for_status()
+        return r.json().get("response", "").strip()
+
+    def stream(self, prompt: str, **options: Any) -> Iterator[str]:
+        with self.client.stream("POST", "/api/generate", json=self._payload(prompt, self.options(**options), True)) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                if line:
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+
+    async def _send_batch(self, prompts: List[str], options: Dict[str, Any]) -> List[str]:
+        client, semaphore, _ = self._loop_state()
+
+        async def one(prompt: str) -> str:
+            async with semaphore:
+                r = await client.post("/api/generate", json=self._payload(prompt, options, False))
+                r.raise_for_status()
+                return r.json().get("response", "").strip()
+
+        return list(await asyncio.gather(*(one(p) for p in prompts)))
+
+    async def astream(self, prompt: str, **options: Any) -> AsyncIterator[str]:
+        client, semaphore, _ = self._loop_state()
+        async with semaphore:
+            async with client.stream("POST", "/api/generate", json=self._payload(prompt, self.options(**options), True)) as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    if line:
+                        chunk = json.loads(line)
+                        if chunk.get("response"):
+                            yield chunk["response"]
+
+
+# ----------------------------
+# OpenAI-compatible (/v1/completions)
+# ----------------------------
+
+class OpenAICompatibleProvider(HTTPProvider):
+    """
+    OpenAI-style completions API (vLLM, llama.cpp server, TGI, OpenAI).
+    Accepts a list of prompts per request, so concurrent calls are micro-batched.
+    """
+
+    name = "openai"
+    supports_streaming = True
+    supports_batching = True
+
+    def _payload(self, prompt: Any, options: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        return {
+            "model": self.settings.MODEL,
+            "prompt": prompt,
+            "temperature": options["temperature"],
+            "max_tokens": options["max_tokens"],
+            "stream": stream,
+        }
+
+    @staticmethod
+    def _texts(body: Dict[str, Any], n: int) -> List[str]:
+        """Completion texts by choices[].index; ValueError if an index doesn't belong to a prompt."""
+        texts = [""] * n
+        for choice in body.get("choices", []):
+            index = choice.get("index", 0)
+            if not isinstance(index, int) or isinstance(index, bool) or not 0 <= index < n:
+                raise ValueError(f"choice index {index!r} outside the {n} prompts sent")
+            texts[index] = choice.get("text", "").strip()
+        return texts
+
+    def generate(self, prompt: str, **options: Any) -> str:
+        r = self.client.post("/v1/completions", json=self._payload(prompt, self.options(**options), False))
+        r.raise_for_status()
+        return self._texts(r.json(), 1)[0]
+
+    def stream(self, prompt: str, **options: Any) -> Iterator[str]:
+        with self.client.stream("POST", "/v1/completions", json=self._payload(prompt, self.options(**options), True)) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                text = self._sse_text(line)
+                if text:
+                    yield text
+
+    async def _send_batch(self, prompts: List[str], options: Dict[str, Any]) -> List[str]:
+        client, semaphore, _ = self._loop_state()
+        async with semaphore:
+            r = await client.post("/v1/completions", json=self._payload(prompts, options, False))
+            r.raise_for_status()
+            try:
+                return self._texts(r.json(), len(prompts))
+            except ValueError as e:
+                if len(prompts) == 1:
+                    raise
+                print(f"⚠️ Unusable batched completion ({e}); sending the {len(prompts)} prompts one by one")
+        return [texts[0] for texts in await asyncio.gather(*(self._send_batch([p], options) for p in prompts))]
+
+    async def astream(self, prompt: str, **options: Any) -> AsyncIterator[str]:
+        client, semaphore, _ = self._loop_state()
+        async with semaphore:
+            async with client.stream("POST", "/v1/completions", json=self._payload(prompt, self.options(**options), True)) as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    text = self._sse_text(line)
+                    if text:
+                        yield text
+
+    @staticmethod
+    def _sse_text(line: str) -> str:
+        if not line.startswith("data:"):
+            return ""
+        data = line[5:].strip()
+        if not data or data == "[DONE]":
+            return ""
+        choices = json.loads(data).get("choices") or [{}]
+        return choices[0].get("text", "")
+
+
+# ----------------------------
+# Registry
+# ----------------------------
+
+PROVIDERS = {
+    "ollama": OllamaProvider,
+    "llama2": OllamaProvider,  # historical default name for a local Ollama model
+    "openai": OpenAICompatibleProvider,
+    "vllm": OpenAICompatibleProvider,
+}
+
+_PROVIDER: Optional[LLMProvider] = None
+_PROVIDER_LOCK = threading.Lock()
+
+
+def get_provider() -> LLMProvider:
+    """Process-wide provider selected by LLM_PROVIDER, so the connection pool is shared."""
+    global _PROVIDER
+    if _PROVIDER is None:
+        with _PROVIDER_LOCK:
+            if _PROVIDER is None:
+                settings = get_settings()
+                try:
+                    cls = PROVIDERS[settings.PROVIDER.lower()]
+                except KeyError:
+                    raise ValueError(f"Unknown LLM_PROVIDER {settings.PROVIDER!r}, expected one of {sorted(PROVIDERS)}")
+                _PROVIDER = cls(settings)
+    return _PROVIDER
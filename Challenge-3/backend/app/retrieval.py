@@ -1,55 +1,594 @@
 import os
+import re
 import json
-from typing import List, Dict, Any
+import math
+import time
+import zlib
+import copy
+import heapq
+import threading
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple
 
-def load_corpus(path: str = "Metadata/cases.jsonl", verbose: bool = False) -> List[Dict[str, Any]]:
+import numpy as np
+
+from backend.app.cases import CaseTable
+from backend.app.config import get_settings
+from backend.app.metrics import CORPUS_LOAD_SECONDS
+
+def iter_corpus(path: str = "Metadata/cases.jsonl", verbose: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Stream cases from a JSONL corpus one at a time.
+    Lines holding a list are flattened; invalid JSON lines are skipped.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_corpus_lines(f, verbose=verbose)
+
+
+def cases_from_json(obj: Any, line_no: int) -> List[Any]:
+    """Cases held by one parsed JSONL line: the object, each element of a list, or a bare value as text."""
+    if isinstance(obj, dict):
+        return [obj]
+    if isinstance(obj, list):
+        return obj
+    return [{"id": line_no, "text": str(obj)}]
+
+
+def iter_corpus_lines(lines: Iterable[str], start: int = 1, verbose: bool = False) -> Iterator[Dict[str, Any]]:
+    """Parse JSONL lines into cases; `start` is the line number of the first line."""
+    for i, line in enumerate(lines, start=start):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            if verbose:
+                print(f"⚠️ Skipping invalid JSON at line {i}: {e}")
+            continue
+        yield from cases_from_json(obj, i)
+
+
+def load_corpus(path: str = "Metadata/cases.jsonl", verbose: bool = False) -> CaseTable:
+    """
+    Load a JSONL corpus into a columnar CaseTable. Cases come back as
+    immutable, dict-compatible Case views; copy one with to_dict() to change it.
+    """
     abs_path = os.path.abspath(path)
     if not os.path.exists(abs_path):
         if verbose:
             print(f"⚠️ Corpus file not found: {abs_path}")
-        return [{
+        return CaseTable([{
             "id": 0,
             "title": "No Corpus Found",
             "year": "N/A",
             "jurisdiction": "Unknown",
             "tags": ["missing"],
             "text": "⚠️ The corpus file could not be located."
-        }]
+        }])
 
-    docs: List[Dict[str, Any]] = []
     if verbose:
         print(f"📄 Loading corpus from: {abs_path}")
 
-    with open(abs_path, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f, start=1):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-                if isinstance(obj, dict):
-                    docs.append(obj)
-                elif isinstance(obj, list):
-                    docs.extend(obj)
-                else:
-                    docs.append({"id": i, "text": str(obj)})
-            except json.JSONDecodeError as e:
-                if verbose:
-                    print(f"⚠️ Skipping invalid JSON at line {i}: {e}")
+    docs = CaseTable(iter_corpus(abs_path, verbose=verbose))
 
     if not docs:
         if verbose:
             print("⚠️ No valid cases loaded, adding placeholder.")
-        docs.append({
+        docs = docs.extend([{
             "id": 0,
             "title": "No Valid Cases",
             "year": "N/A",
             "jurisdiction": "Unknown",
             "tags": ["empty"],
             "text": "⚠️ No valid cases could be loaded from the corpus."
-        })
+        }])
 
     if verbose:
         print(f"✅ Loaded {len(docs)} cases successfully.")
 
     return docs
+
+
+# ----------------------------
+# Hybrid (BM25 + vector) search index
+# ----------------------------
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has he her his in is it its of on or "
+    "she that the their to was were which who with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with a small English stopword list removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def case_search_text(case: Dict[str, Any]) -> str:
+    """Text that gets indexed for a case: title, tags and body."""
+    tags = case.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return " ".join([str(case.get("title", "")), " ".join(map(str, tags)), str(case.get("text", ""))])
+
+
+def _case_year(case: Dict[str, Any]) -> int:
+    try:
+        return int(case.get("year"))
+    except (TypeError, ValueError):
+        return -1
+
+
+class SentenceTransformerEncoder:
+    """Thin wrapper so CorpusIndex only depends on an `encode(texts)` method."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(self, texts: List[str], batch_size: int = 256) -> np.ndarray:
+        vecs = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return np.ascontiguousarray(vecs, dtype=np.float32)
+
+
+class HashingEncoder:
+    """
+    Feature-hashed bag of words projected to `dim` dims, L2-normalised.
+    No model download and stable across processes (crc32, not hash()), so
+    it is the fallback when sentence-transformers isn't installed.
+    """
+
+    def __init__(self, dim: int = 64, buckets: int = 4096, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.name = f"hashing-{dim}x{buckets}-{seed}"
+        self.buckets = buckets
+        self.projection = rng.standard_normal((buckets, dim)).astype(np.float32)
+
+    def encode(self, texts: List[str], batch_size: int = 4096) -> np.ndarray:
+        out = np.empty((len(texts), self.projection.shape[1]), dtype=np.float32)
+        for row, text in enumerate(texts):
+            idx = [zlib.crc32(t.encode("utf-8")) % self.buckets for t in tokenize(text)] or [0]
+            out[row] = self.projection[idx].sum(axis=0)
+        out /= np.linalg.norm(out, axis=1, keepdims=True) + 1e-9
+        return out
+
+
+def get_encoder(model_name: Optional[str] = None):
+    """Sentence-transformer encoder for `model_name` (default EMBEDDING_MODEL), else the hashing fallback."""
+    model_name = model_name or get_settings().EMBEDDING_MODEL
+    try:
+        encoder = SentenceTransformerEncoder(model_name)
+    except ImportError:
+        print("⚠️ sentence-transformers not installed, using hashed bag-of-words embeddings.")
+        return HashingEncoder()
+    encoder.name = model_name
+    return encoder
+
+
+def _case_tags(case: Dict[str, Any]) -> List[str]:
+    tags = case.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return sorted({str(tag).lower() for tag in tags})
+
+
+class CaseMetadata:
+    """
+    Inverted indexes over case metadata: sorted id postings per jurisdiction
+    and per tag, each case's year, and the ids ordered by year so a year
+    range is one binary search. Used to filter search candidates and to
+    list the cases matching a filter without scanning the corpus.
+
+    Never changed once built; extend() returns a successor that shares the
+    untouched postings.
+    """
+
+    def __init__(self, docs: Iterable[Dict[str, Any]] = ()):
+        self.count = 0
+        self.years = np.empty(0, dtype=np.int32)
+        self.jurisdiction_codes = np.empty(0, dtype=np.int32)
+        self.jurisdiction_ids: Dict[str, int] = {}
+        self.by_jurisdiction: Dict[int, np.ndarray] = {}
+        self.by_tag: Dict[str, np.ndarray] = {}
+        # ids ordered by (year, id), and their years
+        self.year_order = np.empty(0, dtype=np.int32)
+        self.year_sorted = np.empty(0, dtype=np.int32)
+        self._add(docs)
+
+    def extend(self, docs: Iterable[Dict[str, Any]]) -> "CaseMetadata":
+        new = copy.copy(self)
+        new.jurisdiction_ids = dict(self.jurisdiction_ids)
+        new.by_jurisdiction = dict(self.by_jurisdiction)
+        new.by_tag = dict(self.by_tag)
+        new._add(docs)
+        return new
+
+    def _add(self, docs: Iterable[Dict[str, Any]]) -> None:
+        first = self.count
+        years: List[int] = []
+        codes: List[int] = []
+        by_jurisdiction: Dict[int, List[int]] = defaultdict(list)
+        by_tag: Dict[str, List[int]] = defaultdict(list)
+        for i, doc in enumerate(docs, start=first):
+            years.append(_case_year(doc))
+            name = str(doc.get("jurisdiction", "")).lower()
+            code = self.jurisdiction_ids.setdefault(name, len(self.jurisdiction_ids))
+            codes.append(code)
+            by_jurisdiction[code].append(i)
+            for tag in _case_tags(doc):
+                by_tag[tag].append(i)
+        if not years:
+            return
+
+        new_years = np.asarray(years, dtype=np.int32)
+        self.years = np.concatenate([self.years, new_years])
+        self.jurisdiction_codes = np.concatenate([self.jurisdiction_codes, np.asarray(codes, dtype=np.int32)])
+        # New ids are all larger than the stored ones, so appending keeps postings sorted.
+        for postings, added in ((self.by_jurisdiction, by_jurisdiction), (self.by_tag, by_tag)):
+            for key, ids in added.items():
+                ids_arr = np.asarray(ids, dtype=np.int32)
+                postings[key] = np.concatenate([postings[key], ids_arr]) if key in postings else ids_arr
+        order = np.argsort(new_years, kind="stable")
+        pos = np.searchsorted(self.year_sorted, new_years[order], side="right")
+        self.year_order = np.insert(self.year_order, pos, np.arange(first, first + len(years), dtype=np.int32)[order])
+        self.year_sorted = np.insert(self.year_sorted, pos, new_years[order])
+        self.count += len(years)
+
+    # ----------------------------
+    # Filters
+    # ----------------------------
+
+    def mask(self, ids: np.ndarray, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Which of `ids` match `filters` (see CorpusIndex.search)."""
+        mask = np.ones(len(ids), dtype=bool)
+        if not filters or not len(ids):
+            return mask
+        jurisdiction = filters.get("jurisdiction")
+        if jurisdiction:
+            code = self.jurisdiction_ids.get(str(jurisdiction).lower(), -1)
+            mask &= self.jurisdiction_codes[ids] == code
+        tags = filters.get("tags")
+        if tags:
+            for tag in [tags] if isinstance(tags, str) else tags:
+                allowed = self.by_tag.get(str(tag).lower())
+                if allowed is None:
+                    return np.zeros(len(ids), dtype=bool)
+                pos = np.minimum(np.searchsorted(allowed, ids), len(allowed) - 1)
+                mask &= allowed[pos] == ids
+        if filters.get("year_from") is not None:
+            mask &= self.years[ids] >= int(filters["year_from"])
+        if filters.get("year_to") is not None:
+            years = self.years[ids]
+            mask &= (years >= 0) & (years <= int(filters["year_to"]))
+        return mask
+
+    def matching(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Sorted ids of every case matching `filters`. Starts from the smallest
+        posting list (jurisdiction, a tag, or the year range) and checks the
+        other conditions on it only, so the cost follows the rarest condition.
+        """
+        candidates: List[np.ndarray] = []
+        jurisdiction = filters.get("jurisdiction")
+        if jurisdiction:
+            code = self.jurisdiction_ids.get(str(jurisdiction).lower())
+            candidates.append(self.by_jurisdiction.get(code, np.empty(0, dtype=np.int32)))
+        tags = filters.get("tags") or []
+        for tag in [tags] if isinstance(tags, str) else tags:
+            candidates.append(self.by_tag.get(str(tag).lower(), np.empty(0, dtype=np.int32)))
+
+        year_from, year_to = filters.get("year_from"), filters.get("year_to")
+        if year_from is not None or year_to is not None:
+            low = int(year_from) if year_from is not None else 0  # unknown years (-1) never match a range
+            lo = np.searchsorted(self.year_sorted, low, side="left")
+            hi = (np.searchsorted(self.year_sorted, int(year_to), side="right")
+                  if year_to is not None else len(self.year_sorted))
+            in_range = self.year_order[lo:max(lo, hi)]
+            if not candidates or len(in_range) < min(len(c) for c in candidates):
+                candidates.append(np.sort(in_range))
+
+        if not candidates:
+            return np.arange(self.count, dtype=np.int32)
+        smallest = min(candidates, key=len)
+        return smallest[self.mask(smallest, filters)]
+
+
+class CorpusIndex:
+    """
+    BM25 inverted index + FAISS embedding index over the case corpus.
+
+    Built once, then `search()` fuses both rankings with weighted
+    reciprocal-rank fusion. Postings are stored impact-ordered (highest
+    BM25 weight first) and truncated to `posting_limit` per query term, so
+    query cost depends on the number of query terms rather than on corpus
+    size. Above `hnsw_threshold` documents the dense side switches from an
+    exact flat index to HNSW. `extend()` adds documents without a rebuild.
+    Documents are held in a columnar CaseTable and returned as Case views.
+    """
+
+    def __init__(
+        self,
+        docs: Iterable[Dict[str, Any]],
+        encoder: Optional[Any] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        posting_limit: int = 10_000,
+        hnsw_threshold: int = 50_000,
+        verbose: bool = False,
+        corpus_sha: Optional[str] = None,
+    ):
+        self.docs = docs if isinstance(docs, CaseTable) else CaseTable(docs)
+        self.count = len(self.docs)
+        self.encoder = encoder
+        self.k1 = k1
+        self.b = b
+        self.posting_limit = posting_limit
+        self.hnsw_threshold = hnsw_threshold
+        self.verbose = verbose
+        self.corpus_sha = corpus_sha
+
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.df: Dict[str, int] = {}
+        self.dense_index = None
+        self._dense_lock = threading.Lock()
+
+        start = time.perf_counter()
+        self.meta = CaseMetadata(self.docs)
+        self._build_bm25()
+        if encoder is not None:
+            self._build_dense()
+        elapsed = time.perf_counter() - start
+        CORPUS_LOAD_SECONDS.set(elapsed, stage="index")
+        if verbose:
+            print(f"✅ Indexed {self.count} cases in {elapsed:.2f}s")
+
+    # ----------------------------
+    # Build
+    # ----------------------------
+
+    def _build_bm25(self) -> None:
+        raw, doc_len = self._count_terms(self.docs, 0)
+        self.avgdl = float(doc_len.mean()) if len(doc_len) else 0.0
+        for term, ids, weights in self._impact_postings(raw, doc_len, 0):
+            self.postings[term] = (ids, weights)
+            self.df[term] = len(ids)
+
+    @staticmethod
+    def _count_terms(docs: Sequence[Dict[str, Any]], first: int) -> Tuple[Dict[str, Tuple[List[int], List[int]]], np.ndarray]:
+        raw: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        doc_len = np.zeros(len(docs), dtype=np.float32)
+        for i, doc in enumerate(docs):
+            tokens = tokenize(case_search_text(doc))
+            doc_len[i] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                ids, tfs = raw[term]
+                ids.append(first + i)
+                tfs.append(tf)
+        return raw, doc_len
+
+    def _impact_postings(self, raw: Dict[str, Tuple[List[int], List[int]]], doc_len: np.ndarray,
+                         first: int) -> Iterator[Tuple[str, np.ndarray, np.ndarray]]:
+        """(term, ids, BM25 weights) per term, ordered by decreasing weight."""
+        norm = self.k1 * (1 - self.b + self.b * doc_len / (self.avgdl or 1.0))
+        for term, (ids, tfs) in raw.items():
+            ids_arr = np.asarray(ids, dtype=np.int32)
+            tf_arr = np.asarray(tfs, dtype=np.float32)
+            weights = tf_arr * (self.k1 + 1) / (tf_arr + norm[ids_arr - first])
+            order = np.argsort(-weights, kind="stable")
+            yield term, ids_arr[order], weights[order].astype(np.float32)
+
+    def _idf(self, term: str) -> float:
+        df = self.df[term]
+        return math.log(1 + (self.count - df + 0.5) / (df + 0.5))
+
+    def _build_dense(self) -> None:
+        import faiss
+
+        texts = [case_search_text(d) for d in self.docs]
+        vecs = self.encoder.encode(texts)
+        dim = vecs.shape[1]
+        if len(texts) >= self.hnsw_threshold:
+            index = faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = 80
+            index.hnsw.efSearch = 64
+        else:
+            index = faiss.IndexFlatIP(dim)
+        index.add(vecs)
+        self.dense_index = index
+
+    # ----------------------------
+    # Incremental updates
+    # ----------------------------
+
+    def extend(self, docs: List[Dict[str, Any]], corpus_sha: Optional[str] = None) -> "CorpusIndex":
+        """
+        A new index over these documents plus `docs`, in O(postings of the
+        terms they contain) instead of a rebuild. Untouched structures are
+        shared and this index stays valid: the FAISS index is appended to in
+        place, but every index only returns ids below its own `count`. BM25
+        length normalisation keeps the average length of the original build.
+        """
+        start = time.perf_counter()
+        first = self.count
+        new = copy.copy(self)
+        new.docs = self.docs.extend(docs)
+        new.count = len(new.docs)
+        new.corpus_sha = corpus_sha
+
+        new.meta = self.meta.extend(docs)
+
+        new.postings = dict(self.postings)
+        new.df = dict(self.df)
+        raw, doc_len = self._count_terms(docs, first)
+        for term, ids, weights in self._impact_postings(raw, doc_len, first):
+            new.df[term] = self.df.get(term, 0) + len(ids)
+            old = self.postings.get(term)
+            if old is not None:
+                # Merge into the impact order: both sides are sorted by decreasing weight.
+                pos = np.searchsorted(-old[1], -weights, side="right")
+                ids, weights = np.insert(old[0], pos, ids), np.insert(old[1], pos, weights)
+            new.postings[term] = (ids, weights)
+
+        if self.dense_index is not None:
+            with self._dense_lock:
+                if self.dense_index.ntotal == first:
+                    self.dense_index.add(self.encoder.encode([case_search_text(d) for d in docs]))
+                else:
+                    new.dense_index, new._dense_lock = None, threading.Lock()
+            if new.dense_index is None:
+                new._build_dense()
+        if self.verbose:
+            print(f"✅ Indexed {len(docs)} new cases in {time.perf_counter() - start:.3f}s")
+        return new
+
+    # ----------------------------
+    # Query
+    # ----------------------------
+
+    def _bm25_candidates(self, query: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        ids_parts, score_parts = [], []
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ids, weights = posting
+            ids_parts.append(ids[: self.posting_limit])
+            score_parts.append(weights[: self.posting_limit] * self._idf(term))
+        if not ids_parts:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        ids = np.concatenate(ids_parts)
+        scores = np.concatenate(score_parts)
+        uniq, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores).astype(np.float32)
+        if len(uniq) > n:
+            top = np.argpartition(-totals, n)[:n]
+            uniq, totals = uniq[top], totals[top]
+        order = np.argsort(-totals, kind="stable")
+        return uniq[order], totals[order]
+
+    def _dense_candidates(self, query: str, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self.dense_index is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        qvec = self.encoder.encode([query])
+        with self._dense_lock:  # FAISS can't search while extend() adds to it
+            scores, ids = self.dense_index.search(qvec, min(n, self.count))
+        keep = (ids[0] >= 0) & (ids[0] < self.count)
+        return ids[0][keep].astype(np.int32), scores[0][keep]
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        alpha: float = 0.5,
+        rrf_k: int = 60,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the top-k cases for `query` as `{"case": Case, "score": float}`.
+
+        `filters` may contain `jurisdiction`, `tags` (all must match),
+        `year_from` and `year_to`. `alpha` weights the dense ranking against
+        BM25 in the fusion (0 = BM25 only, 1 = dense only).
+        """
+        if k <= 0 or not self.count:
+            return []
+        # Over-fetch so that filtering still leaves k results in most cases.
+        n_candidates = max(k * 10, 100) if filters else max(k * 4, 50)
+
+        fused: Dict[int, float] = defaultdict(float)
+        rankings = [(self._bm25_candidates(query, n_candidates), 1.0 - alpha)]
+        if self.dense_index is not None and alpha > 0:
+            rankings.append((self._dense_candidates(query, n_candidates), alpha))
+        for (ids, _scores), weight in rankings:
+            ids = ids[self.meta.mask(ids, filters)]
+            for rank, doc_id in enumerate(ids.tolist()):
+                fused[doc_id] += weight / (rrf_k + rank + 1)
+
+        best = heapq.nlargest(k, fused.items(), key=lambda item: item[1])
+        return [{"case": self.docs[doc_id], "score": round(score, 6)} for doc_id, score in best]
+
+
+_CORPUS_INDEXES: Dict[Tuple[str, bool], CorpusIndex] = {}
+_CORPUS_INDEX_BUILDS: Dict[Tuple[str, bool], threading.Lock] = {}
+_CORPUS_INDEX_LOCK = threading.Lock()
+
+
+def get_corpus_index(path: str = "Metadata/cases.jsonl", dense: bool = True, wait: bool = False) -> CorpusIndex:
+    """
+    Hybrid index for the current view of a corpus file: built once per
+    process, then extended with the cases appended since. One thread per
+    corpus builds; the result is published by swapping it into place. While
+    an existing index is being brought up to date, other callers get the
+    previous one unless `wait` is set; on a cold start they all wait.
+    """
+    from backend.app.snapshot import get_snapshot  # snapshot.py imports this module
+
+    view = get_snapshot(path)
+    sha = view.header["sha256"] if view is not None else None
+    key = (os.path.abspath(path), dense)
+    index = _CORPUS_INDEXES.get(key)
+    if index is not None and index.corpus_sha == sha:
+        return index
+    with _CORPUS_INDEX_LOCK:
+        build = _CORPUS_INDEX_BUILDS.setdefault(key, threading.Lock())
+    if not build.acquire(blocking=index is None or wait):
+        return index
+    try:
+        index = _CORPUS_INDEXES.get(key)
+        if index is not None and index.corpus_sha == sha:
+            return index
+        start = view.checkpoints.get(index.corpus_sha) if index is not None and view is not None else None
+        if start is not None:
+            index = index.extend([view[i] for i in range(start, len(view))], corpus_sha=sha)
+        else:
+            docs = CaseTable(view) if view is not None else load_corpus(path)
+            encoder = None
+            if dense:
+                try:
+                    import faiss  # noqa: F401
+                except ImportError:
+                    print("⚠️ faiss not installed, using BM25 only.")
+                else:
+                    # Same encoder (and fallback) as the fact index
+                    encoder = get_encoder()
+            index = CorpusIndex(docs, encoder=encoder, verbose=True, corpus_sha=sha)
+        _CORPUS_INDEXES[key] = index
+        return index
+    finally:
+        build.release()
+
+
+def find_precedents(case: Dict[str, Any], k: int, corpus_path: Optional[str] = None) -> List[str]:
+    """
+    The `k` corpus cases closest to `case` (the case itself excluded), one
+    line each, for the prosecution's context.
+    """
+    if k <= 0:
+        return []
+    index = get_corpus_index(corpus_path or get_settings().CORPUS_PATH)
+    case_id, text = case.get("id"), case.get("text")
+    lines = []
+    for hit in index.search(case_search_text(case), k + 1):
+        other = hit["case"]
+        if (case_id is not None and other.get("id") == case_id) or other.get("text") == text:
+            continue
+        lines.append(f"Precedent: {other.get('title', 'Untitled Case')} ({other.get('year', 'N/A')}): "
+                     f"{other.get('text', '')}")
+    return lines[:k]
+
+
+def refresh_corpus_indexes(path: str) -> None:
+    """Bring every index already built for `path` up to date (nothing is built otherwise)."""
+    for indexed_path, dense in list(_CORPUS_INDEXES):
+        if indexed_path == os.path.abspath(path):
+            get_corpus_index(path, dense, wait=True)
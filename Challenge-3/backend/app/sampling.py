@@ -0,0 +1,305 @@
+# backend/app/sampling.py
+
+import os
+import time
+import random
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from backend.app.config import get_settings
+from backend.app.retrieval import CaseMetadata
+from backend.app.snapshot import CorpusView, get_snapshot
+
+
+class NoMatchingCase(LookupError):
+    """No case in the corpus matches the requested filters."""
+
+
+# ----------------------------
+# Weighted draws
+# ----------------------------
+
+class FenwickTree:
+    """
+    Binary indexed tree over per-case weights: O(log n) weight updates and
+    O(log n) draws proportional to weight. Weights change on every debate,
+    which rules out a static alias table.
+    """
+
+    def __init__(self, weights: np.ndarray):
+        self.weights = np.asarray(weights, dtype=np.float64).copy()
+        self.n = len(self.weights)
+        prefix = np.concatenate([[0.0], np.cumsum(self.weights)])
+        idx = np.arange(1, self.n + 1)
+        # tree[i] holds the sum of the lowbit(i) weights ending at i (1-based)
+        self.tree = np.zeros(self.n + 1, dtype=np.float64)
+        self.tree[1:] = prefix[idx] - prefix[idx - (idx & -idx)]
+        self.total = float(prefix[-1])
+        self._top = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    def update(self, i: int, weight: float) -> None:
+        delta = weight - self.weights[i]
+        if not delta:
+            return
+        self.weights[i] = weight
+        self.total += delta
+        j = i + 1
+        while j <= self.n:
+            self.tree[j] += delta
+            j += j & -j
+
+    def find(self, x: float) -> int:
+        """Smallest index whose cumulative weight exceeds `x`."""
+        pos, step = 0, self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= x:
+                pos = nxt
+                x -= self.tree[nxt]
+            step >>= 1
+        return min(pos, self.n - 1)
+
+    def sample(self, rng: random.Random) -> int:
+        return self.find(rng.random() * self.total)
+
+    def extend(self, weights: np.ndarray) -> "FenwickTree":
+        return FenwickTree(np.concatenate([self.weights, weights]))
+
+
+# ----------------------------
+# Sampler
+# ----------------------------
+
+FilterKey = Tuple[str, Tuple[str, ...], Optional[int], Optional[int]]
+
+# Rejection attempts before falling back to an exact draw over the candidates
+MAX_TRIES = 32
+MAX_CACHED_FILTERS = 256
+
+
+def filter_key(filters: Dict[str, Any]) -> FilterKey:
+    tags = filters.get("tags") or []
+    tags = [tags] if isinstance(tags, str) else tags
+    year_from, year_to = filters.get("year_from"), filters.get("year_to")
+    return (
+        str(filters.get("jurisdiction") or "").lower(),
+        tuple(sorted({str(t).lower() for t in tags})),
+        int(year_from) if year_from is not None else None,
+        int(year_to) if year_to is not None else None,
+    )
+
+
+class CaseSampler:
+    """
+    Random case draws from a corpus view with:
+
+      - filters on jurisdiction, tags (all must match) and year range,
+        answered from CaseMetadata postings and cached per filter, so a
+        repeated filtered draw is O(1);
+      - `weighted` draws that favour cases not debated in the last
+        SAMPLE_RECENT_SECONDS (their weight drops to SAMPLE_RECENT_WEIGHT);
+      - no repeats per `user` until every matching case has been drawn for
+        them, then their history for those cases starts over.
+
+    Draws are rejection-sampled (uniform or Fenwick proposal, then accept
+    by weight and unseen-ness) with an exact O(matches) fallback. State is
+    per process and guarded by one lock; sync() catches up with cases
+    appended to the corpus.
+    """
+
+    def __init__(self, view: CorpusView):
+        settings = get_settings()
+        self.recent_seconds = settings.SAMPLE_RECENT_SECONDS
+        self.recent_weight = settings.SAMPLE_RECENT_WEIGHT
+        self.max_users = settings.SAMPLE_MAX_USERS
+        self._lock = threading.Lock()
+        self._build(view)
+
+    def _build(self, view: CorpusView) -> None:
+        ids: List[str] = []
+
+        def docs() -> Iterator[Dict[str, Any]]:
+            for case in view:
+                ids.append(str(case.get("id", "")))
+                yield case
+
+        self.view = view
+        self.meta = CaseMetadata(docs())
+        self._set_ids(np.array(ids, dtype=str), np.arange(len(ids), dtype=np.int64))
+        self.weights = FenwickTree(np.ones(len(view)))
+        self._recent_until: Dict[int, float] = {}
+        self._recent: "deque[Tuple[float, int]]" = deque()  # (until, row) in marking order
+        self._history: "OrderedDict[str, Set[int]]" = OrderedDict()
+        self._matches: "OrderedDict[FilterKey, np.ndarray]" = OrderedDict()
+
+    def _set_ids(self, ids: np.ndarray, rows: np.ndarray) -> None:
+        order = np.argsort(ids, kind="stable")
+        self.ids, self.rows = ids[order], rows[order]
+
+    def sync(self, view: CorpusView) -> None:
+        """Catch up with `view`: index appended cases, or rebuild if the corpus was rewritten."""
+        with self._lock:
+            if view.header["sha256"] == self.view.header["sha256"]:
+                return
+            start = view.checkpoints.get(self.view.header["sha256"])
+            if start is None or start != self.meta.count:
+                self._build(view)
+                return
+            added = [view[i] for i in range(start, len(view))]
+            self.meta = self.meta.extend(added)
+            new_ids = np.array([str(case.get("id", "")) for case in added], dtype=str)
+            dtype = np.promote_types(self.ids.dtype, new_ids.dtype)
+            order = np.argsort(new_ids, kind="stable")
+            pos = np.searchsorted(self.ids.astype(dtype), new_ids[order])
+            self.ids = np.insert(self.ids.astype(dtype), pos, new_ids[order])
+            self.rows = np.insert(self.rows, pos, np.arange(start, len(view), dtype=np.int64)[order])
+            self.weights = self.weights.extend(np.ones(len(added)))
+            self._matches.clear()
+            self.view = view
+
+    # ----------------------------
+    # Recency
+    # ----------------------------
+
+    def row_of(self, case_id: Any) -> Optional[int]:
+        key = str(case_id)
+        pos = int(np.searchsorted(self.ids, key))
+        if pos < len(self.ids) and self.ids[pos] == key:
+            return int(self.rows[pos])
+        return None
+
+    def case(self, case_id: Any) -> Optional[Dict[str, Any]]:
+        """The case with this id, or None if it isn't in the corpus."""
+        with self._lock:
+            row = self.row_of(case_id)
+            return self.view[row] if row is not None else None
+
+    def mark_debated(self, case_id: Any, now: Optional[float] = None) -> None:
+        """Lower the weight of a case for SAMPLE_RECENT_SECONDS (cases not in the corpus are ignored)."""
+        if case_id is None:
+            return
+        with self._lock:
+            row = self.row_of(case_id)
+            if row is None:
+                return
+            until = (now or time.time()) + self.recent_seconds
+            self._recent_until[row] = until
+            self._recent.append((until, row))
+            self.weights.update(row, self.recent_weight)
+
+    def _expire(self, now: float) -> None:
+        while self._recent and self._recent[0][0] <= now:
+            until, row = self._recent.popleft()
+            if self._recent_until.get(row) == until:  # not marked again since
+                del self._recent_until[row]
+                self.weights.update(row, 1.0)
+
+    # ----------------------------
+    # Draws
+    # ----------------------------
+
+    def _matching(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Rows matching `filters` (cached), or None for the whole corpus."""
+        if not filters or filter_key(filters) == ("", (), None, None):
+            return None
+        key = filter_key(filters)
+        rows = self._matches.get(key)
+        if rows is None:
+            rows = self.meta.matching({
+                "jurisdiction": key[0] or None, "tags": list(key[1]), "year_from": key[2], "year_to": key[3],
+            })
+            self._matches[key] = rows
+            if len(self._matches) > MAX_CACHED_FILTERS:
+                self._matches.popitem(last=False)
+        else:
+            self._matches.move_to_end(key)
+        return rows
+
+    def sample(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        user: Optional[str] = None,
+        weighted: bool = False,
+        rng: Optional[random.Random] = None,
+    ) -> Dict[str, Any]:
+        """Draw one case; raises NoMatchingCase if nothing matches `filters`."""
+        rng = rng or random
+        with self._lock:
+            if weighted:
+                self._expire(time.time())
+            matches = self._matching(filters)
+            n = self.meta.count if matches is None else len(matches)
+            if n == 0:
+                raise NoMatchingCase(f"No case matches {filters}")
+            seen = self._history.setdefault(user, set()) if user is not None else None
+
+            row = None
+            for _ in range(MAX_TRIES):
+                if matches is None:
+                    candidate = self.weights.sample(rng) if weighted else rng.randrange(n)
+                else:
+                    candidate = int(matches[rng.randrange(n)])
+                    if weighted and rng.random() >= self.weights.weights[candidate]:
+                        continue
+                if seen and candidate in seen:
+                    continue
+                row = candidate
+                break
+            if row is None:
+                row = self._exact(matches, seen, weighted, rng)
+
+            if seen is not None:
+                seen.add(row)
+                self._history.move_to_end(user)
+                if len(self._history) > self.max_users:
+                    self._history.popitem(last=False)
+            return self.view[row]
+
+    def _exact(self, matches: Optional[np.ndarray], seen: Optional[Set[int]], weighted: bool,
+               rng: random.Random) -> int:
+        """O(matches) draw among the unseen candidates; resets `seen` for them once all were drawn."""
+        rows = matches if matches is not None else np.arange(self.meta.count)
+        if seen:
+            unseen = rows[~np.isin(rows, np.fromiter(seen, dtype=np.int64, count=len(seen)))]
+            if not len(unseen):
+                seen.difference_update(rows.tolist())
+                unseen = rows
+            rows = unseen
+        if not weighted:
+            return int(rows[rng.randrange(len(rows))])
+        cumulative = np.cumsum(self.weights.weights[rows])
+        return int(rows[min(int(np.searchsorted(cumulative, rng.random() * cumulative[-1], side="right")),
+                            len(rows) - 1)])
+
+
+# ----------------------------
+# Process-wide sampler
+# ----------------------------
+
+_SAMPLERS: Dict[str, CaseSampler] = {}
+_SAMPLER_LOCK = threading.Lock()
+
+
+def get_sampler(corpus_path: Optional[str] = None, build: bool = True) -> Optional[CaseSampler]:
+    """
+    Sampler for the current view of a corpus (CORPUS_PATH by default),
+    built on first use and kept in sync with ingested cases. With
+    build=False an existing sampler is synced but none is created.
+    """
+    corpus_path = os.path.abspath(corpus_path or get_settings().CORPUS_PATH)
+    if not build and corpus_path not in _SAMPLERS:
+        return None
+    view = get_snapshot(corpus_path)
+    if view is None:
+        return None
+    with _SAMPLER_LOCK:
+        sampler = _SAMPLERS.get(corpus_path)
+        if sampler is None:
+            if not build:
+                return None
+            sampler = _SAMPLERS[corpus_path] = CaseSampler(view)
+    sampler.sync(view)
+    return sampler
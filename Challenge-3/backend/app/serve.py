@@ -0,0 +1,106 @@
+# backend/app/serve.py
+"""
+Run the API on several worker processes that share one preloaded copy of
+the corpus snapshot, fact index and case sampler.
+
+    python -m backend.app.serve --workers 4 --port 8000
+
+The parent binds the socket, warms everything up once (startup.prewarm),
+freezes the heap and then forks the workers, so they start ready and share
+those pages copy-on-write. `uvicorn --workers N` instead starts N fresh
+interpreters that each build their own. Workers that die are replaced.
+Only the read-only indexes are preloaded: each worker imports the app,
+opens its own SQLite connections and starts its own job workers after
+the fork.
+"""
+
+import os
+import sys
+import time
+import signal
+import argparse
+import importlib
+from typing import Dict
+
+import uvicorn
+
+from backend.app.startup import prewarm
+
+APP = "backend.app.main:app"
+
+
+def _run_worker(config: uvicorn.Config, sock) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+    finally:
+        os._exit(0)
+
+
+def serve(host: str, port: int, workers: int, log_level: str = "info") -> None:
+    config = uvicorn.Config(APP, host=host, port=port, log_level=log_level)
+    if not hasattr(os, "fork"):
+        print("⚠️ fork() not available, falling back to uvicorn --workers (nothing shared)")
+        uvicorn.run(APP, host=host, port=port, workers=workers, log_level=log_level)
+        return
+
+    sock = config.bind_socket()
+    # Tokenizer thread pools don't survive fork; the workers tokenize single-threaded.
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    prewarm()
+    # Modules every worker imports anyway; loaded once here, shared after fork
+    importlib.import_module("fastapi")
+
+    children: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(config, sock)
+        children[pid] = slot
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for slot in range(workers):
+        spawn(slot)
+    print(f"🚀 Serving {APP} on http://{host}:{port} with {workers} preloaded workers (pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            print(f"⚠️ Worker {pid} exited ({os.waitstatus_to_exitcode(status)}), starting a new one")
+            time.sleep(1)  # don't spin if workers die on startup
+            spawn(slot)
+    sock.close()
+    print("👋 All workers stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    if args.workers < 1:
+        sys.exit("⚠️ --workers must be at least 1")
+    serve(args.host, args.port, args.workers, args.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# backend/app/sessions.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from backend.app.config import get_settings
+
+
+# ----------------------------
+# Store interface
+# ----------------------------
+
+class SessionStore:
+    """
+    Debate sessions keyed by session id.
+    Entries expire `ttl` seconds after their last access, and the least
+    recently used ones are evicted once `max_items` or `max_bytes` (size of
+    the JSON-encoded session) is exceeded.
+    """
+
+    def __init__(self, ttl: float, max_items: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.evictions = 0
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, session: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def size_bytes(self) -> int:
+        raise NotImplementedError
+
+    def update(self, session_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Merge `fields` into an existing session and return it (None if missing)."""
+        session = self.get(session_id)
+        if session is None:
+            return None
+        session.update(fields)
+        self.put(session_id, session)
+        return session
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "sessions": len(self),
+            "bytes": self.size_bytes(),
+            "evictions": self.evictions,
+        }
+
+
+def _encode(session: Dict[str, Any]) -> str:
+    return json.dumps(session, ensure_ascii=False, separators=(",", ":"))
+
+
+# ----------------------------
+# In-memory store
+# ----------------------------
+
+class MemorySessionStore(SessionStore):
+    """Per-process LRU dict. Fast, but lost on restart and not shared by workers."""
+
+    def __init__(self, ttl: float, max_items: int, max_bytes: int):
+        super().__init__(ttl, max_items, max_bytes)
+        # id -> (last access, encoded size, encoded session)
+        self._data: "OrderedDict[str, Tuple[float, int, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, session_id: str) -> None:
+        _, size, _ = self._data.pop(session_id)
+        self._bytes -= size
+
+    def _evict(self, now: float) -> None:
+        while self._data:
+            oldest_id, (accessed, _, _) = next(iter(self._data.items()))
+            over = len(self._data) > self.max_items or self._bytes > self.max_bytes
+            if not over and now - accessed <= self.ttl:
+                break
+            self._drop(oldest_id)
+            self.evictions += 1
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            accessed, size, blob = entry
+            if now - accessed > self.ttl:
+                self._drop(session_id)
+                self.evictions += 1
+                return None
+            self._data[session_id] = (now, size, blob)
+            self._data.move_to_end(session_id)
+        # Decode a fresh copy so callers can't mutate the stored session.
+        return json.loads(blob)
+
+    def put(self, session_id: str, session: Dict[str, Any]) -> None:
+        blob = _encode(session)
+        size = len(blob.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            if session_id in self._data:
+                self._drop(session_id)
+            self._data[session_id] = (now, size, blob)
+            self._bytes += size
+            self._evict(now)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            if session_id in self._data:
+                self._drop(session_id)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+# ----------------------------
+# SQLite (WAL) store
+# ----------------------------
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """Open a SQLite database in WAL mode, safe to share between threads behind a lock."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Persistent store in a WAL-mode SQLite file. Survives restarts and is
+    visible to every uvicorn worker that points at the same file. Session
+    count and bytes are kept in `session_totals` by triggers, so the size
+    caps are checked without scanning the table on every put.
+    """
+
+    def __init__(self, path: str, ttl: float, max_items: int, max_bytes: int):
+        super().__init__(ttl, max_items, max_bytes)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed)")
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_totals ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0), count INTEGER NOT NULL, bytes INTEGER NOT NULL)"
+            )
+            # Seeded once from the table (files written before the totals existed), then kept by triggers.
+            self._conn.execute(
+                "INSERT OR IGNORE INTO session_totals (id, count, bytes)"
+                " SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM sessions"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS sessions_insert AFTER INSERT ON sessions BEGIN"
+                " UPDATE session_totals SET count = count + 1, bytes = bytes + new.size WHERE id = 0; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS sessions_delete AFTER DELETE ON sessions BEGIN"
+                " UPDATE session_totals SET count = count - 1, bytes = bytes - old.size WHERE id = 0; END"
+            )
+            self._conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS sessions_resize AFTER UPDATE OF size ON sessions BEGIN"
+                " UPDATE session_totals SET bytes = bytes - old.size + new.size WHERE id = 0; END"
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _totals(self) -> Tuple[int, int]:
+        return self._conn.execute("SELECT count, bytes FROM session_totals WHERE id = 0").fetchone()
+
+    def _evict(self, now: float) -> None:
+        cur = self._conn.execute("DELETE FROM sessions WHERE accessed < ?", (now - self.ttl,))
+        self.evictions += cur.rowcount
+        count, total = self._totals()
+        if count <= self.max_items and total <= self.max_bytes:
+            return
+        # Walk from least recently used until both caps are satisfied.
+        doomed = []
+        for session_id, size in self._conn.execute("SELECT id, size FROM sessions ORDER BY accessed"):
+            if count <= self.max_items and total <= self.max_bytes:
+                break
+            doomed.append((session_id,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM sessions WHERE id = ?", doomed)
+        self.evictions += len(doomed)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, accessed FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self.evictions += 1
+                return None
+            self._conn.execute("UPDATE sessions SET accessed = ? WHERE id = ?", (now, session_id))
+        return json.loads(row[0])
+
+    def put(self, session_id: str, session: Dict[str, Any]) -> None:
+        blob = _encode(session)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # An upsert rather than INSERT OR REPLACE: REPLACE deletes without firing the delete trigger.
+                self._conn.execute(
+                    "INSERT INTO sessions (id, data, size, accessed) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (id) DO UPDATE SET data = excluded.data, size = excluded.size,"
+                    " accessed = excluded.accessed",
+                    (session_id, blob, len(blob.encode("utf-8")), now),
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._totals()[0]
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._totals()[1]
+
+
+@lru_cache
+def get_session_store() -> SessionStore:
+    """Session store selected by SESSION_BACKEND ("sqlite" or "memory")."""
+    settings = get_settings()
+    limits = dict(
+        ttl=settings.SESSION_TTL,
+        max_items=settings.SESSION_MAX_ITEMS,
+        max_bytes=settings.SESSION_MAX_BYTES,
+    )
+    if settings.SESSION_BACKEND == "memory":
+        return MemorySessionStore(**limits)
+    return SQLiteSessionStore(settings.SESSION_DB, **limits)
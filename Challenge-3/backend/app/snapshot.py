@@ -0,0 +1,464 @@
+# backend/app/snapshot.py
+
+import os
+import json
+import mmap
+import random
+import time
+import struct
+import hashlib
+import threading
+from array import array
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.app.config import get_settings
+from backend.app.metrics import CORPUS_CASES, CORPUS_LOAD_SECONDS
+from backend.app.retrieval import iter_corpus_lines
+
+# ----------------------------
+# On-disk layout
+# ----------------------------
+#
+#   magic     8 bytes   b"CASESNP1"
+#   hlen      uint32    length of the JSON header
+#   header    hlen      {"count", "source", "mtime_ns", "size", "sha256", ...}
+#                       corpus snapshots also carry "lines", "max_id" and
+#                       "checkpoints" ({sha256 of an earlier corpus: its count})
+#   padding             up to the next 8-byte boundary
+#   offsets   (count + 1) x uint64, native byte order, relative to records
+#   records   packed UTF-8 JSON, one record per offsets[i]:offsets[i + 1]
+#
+# The file is mmap-ed read-only, so every uvicorn worker that opens the same
+# snapshot shares one copy of it in the page cache.
+
+MAGIC = b"CASESNP1"
+SNAPSHOT_SUFFIX = ".snapshot"
+# Earlier versions of the corpus remembered per view, so indexes built
+# against one of them can catch up by indexing only the cases added since.
+MAX_CHECKPOINTS = 64
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def file_digest(path: str, limit: Optional[int] = None, chunk_size: int = 1 << 20) -> "hashlib._Hash":
+    """sha256 object over the first `limit` bytes of a file (all of it by default)."""
+    digest = hashlib.sha256()
+    remaining = limit if limit is not None else float("inf")
+    with open(path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(int(min(chunk_size, remaining)))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    return file_digest(path, chunk_size=chunk_size).hexdigest()
+
+
+def encode_case(case: Dict[str, Any]) -> bytes:
+    return json.dumps(case, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _max_id(cases: Iterable[Dict[str, Any]], start: int = 0) -> int:
+    """Largest integer id among `cases` (and `start`); other ids are ignored."""
+    for case in cases:
+        case_id = case.get("id")
+        if isinstance(case_id, int) and not isinstance(case_id, bool) and case_id > start:
+            start = case_id
+    return start
+
+
+def write_snapshot(
+    records: Iterable[bytes],
+    path: str,
+    header: Optional[Dict[str, Any]] = None,
+    extra: Optional[Callable[[], Dict[str, Any]]] = None,
+) -> int:
+    """
+    Pack `records` (already-encoded bytes) into a snapshot file at `path`.
+    The file is written next to its destination and renamed into place, so
+    readers never observe a half-written snapshot. `extra()` is called once
+    all records are consumed and merged into the header. Returns the record
+    count.
+    """
+    offsets = array("Q", [0])
+    tmp_records = f"{path}.{os.getpid()}.{threading.get_ident()}.records"
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_records, "wb") as rec:
+            for record in records:
+                rec.write(record)
+                offsets.append(offsets[-1] + len(record))
+
+        meta = dict(header or {})
+        meta.update(extra() if extra is not None else {})
+        meta["count"] = len(offsets) - 1
+        meta_bytes = json.dumps(meta).encode("utf-8")
+        prefix = MAGIC + struct.pack("<I", len(meta_bytes)) + meta_bytes
+        with open(tmp_path, "wb") as out:
+            out.write(prefix)
+            out.write(b"\0" * (_align8(len(prefix)) - len(prefix)))
+            offsets.tofile(out)
+            with open(tmp_records, "rb") as rec:
+                while True:
+                    chunk = rec.read(1 << 20)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        for leftover in (tmp_records, tmp_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return len(offsets) - 1
+
+
+def _read_lines(f: BinaryIO, limit: int) -> Iterator[bytes]:
+    """
+    Raw lines of `f` from its current position, up to `limit` bytes. A last
+    line without a newline is only included if it is valid JSON: it may
+    still be being written, and a later refresh picks it up once complete.
+    """
+    remaining = limit
+    for line in f:
+        if remaining <= 0:
+            return
+        line = line[:remaining]
+        remaining -= len(line)
+        if not line.endswith(b"\n") and line.strip():
+            try:
+                json.loads(line)
+            except ValueError:
+                return
+        yield line
+
+
+def _compile_lines(f: BinaryIO, limit: int, start_line: int = 1, max_id: int = 0,
+                   digest: Optional["hashlib._Hash"] = None,
+                   verbose: bool = False) -> Tuple[Iterator[bytes], Dict[str, Any]]:
+    """
+    Parse and encode the corpus lines of `f` (see _read_lines). Returns the
+    encoded records and a stats dict that is complete once they are
+    consumed: bytes/lines read, the largest id, and `digest` (a fresh
+    sha256 by default) updated with the bytes read.
+    """
+    stats: Dict[str, Any] = {"size": 0, "lines": 0, "max_id": max_id, "digest": digest or hashlib.sha256()}
+
+    def lines() -> Iterator[str]:
+        for raw in _read_lines(f, limit):
+            stats["digest"].update(raw)
+            stats["size"] += len(raw)
+            stats["lines"] += 1
+            yield raw.decode("utf-8")
+
+    def records() -> Iterator[bytes]:
+        for case in iter_corpus_lines(lines(), start=start_line, verbose=verbose):
+            stats["max_id"] = _max_id([case], stats["max_id"])
+            yield encode_case(case)
+
+    return records(), stats
+
+
+def build_corpus_snapshot(source: str, path: Optional[str] = None, verbose: bool = False) -> str:
+    """Compile a JSONL corpus into a snapshot file. Returns the snapshot path."""
+    path = path or source + SNAPSHOT_SUFFIX
+    st = os.stat(source)
+    with open(source, "rb") as f:
+        # size and sha256 describe exactly the bytes that were compiled, even
+        # if the file is appended to meanwhile.
+        records, stats = _compile_lines(f, st.st_size, verbose=verbose)
+        header = {"source": os.path.abspath(source), "mtime_ns": st.st_mtime_ns}
+        count = write_snapshot(records, path, header, extra=lambda: {
+            "size": stats["size"],
+            "sha256": stats["digest"].hexdigest(),
+            "lines": stats["lines"],
+            "max_id": stats["max_id"],
+        })
+    if verbose:
+        print(f"✅ Compiled {count} cases into snapshot {path}")
+    return path
+
+
+class Snapshot:
+    """Read-only, mmap-backed view over a snapshot file with O(1) random access."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Snapshot file is empty: {path}")
+        if self._mm[:8] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a snapshot file: {path}")
+        (hlen,) = struct.unpack_from("<I", self._mm, 8)
+        self.header: Dict[str, Any] = json.loads(self._mm[12:12 + hlen])
+        self.count: int = self.header["count"]
+        table_start = _align8(12 + hlen)
+        self._records_start = table_start + 8 * (self.count + 1)
+        self._offsets = memoryview(self._mm)[table_start:self._records_start].cast("Q")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def raw(self, i: int) -> bytes:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        base = self._records_start
+        return self._mm[base + self._offsets[i]:base + self._offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return json.loads(self.raw(i))
+
+    def sample(self, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        if not self.count:
+            raise IndexError("sample from an empty snapshot")
+        return self[(rng or random).randrange(self.count)]
+
+    def close(self) -> None:
+        if getattr(self, "_offsets", None) is not None:
+            self._offsets.release()
+            self._offsets = None
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+
+class CorpusSnapshot(Snapshot):
+    """Snapshot of a JSONL corpus that knows whether its source has changed."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._verified_stat = (self.header.get("mtime_ns"), self.header.get("size"))
+
+    def is_stale(self, source: str) -> bool:
+        st = os.stat(source)
+        current = (st.st_mtime_ns, st.st_size)
+        if current == self._verified_stat:
+            return False
+        if st.st_size == self.header.get("size") and file_sha256(source) == self.header.get("sha256"):
+            # Touched but unchanged: remember it so we don't re-hash next time.
+            self._verified_stat = current
+            return False
+        return True
+
+
+# ----------------------------
+# Read views and incremental appends
+# ----------------------------
+
+class CorpusView:
+    """
+    Consistent read view of a corpus: its compiled snapshot plus the cases
+    appended to the JSONL since. Views are never mutated; appending
+    publishes a new one. The appended records live in a list shared by
+    successive views, and each view only reads up to its own `count`, so
+    publishing costs O(appended cases) and a request holding a view keeps
+    seeing exactly the cases it started with.
+
+    `header` describes the covered prefix of the source file (size, sha256,
+    lines, max_id) and `checkpoints` maps the sha256 of earlier versions of
+    that prefix to their case count.
+    """
+
+    def __init__(self, base: CorpusSnapshot, header: Optional[Dict[str, Any]] = None,
+                 appended: Optional[List[bytes]] = None, digest: Optional["hashlib._Hash"] = None):
+        self.base = base
+        self.path = base.path
+        self.header = dict(header if header is not None else base.header)
+        self.count: int = self.header["count"]
+        checkpoints = dict(self.header.get("checkpoints") or {})
+        checkpoints[self.header["sha256"]] = self.count
+        self.header["checkpoints"] = dict(list(checkpoints.items())[-MAX_CHECKPOINTS:])
+        self.checkpoints: Dict[str, int] = self.header["checkpoints"]
+        self._appended = appended if appended is not None else []
+        self._digest = digest
+        self._verified_stat = (self.header.get("mtime_ns"), self.header.get("size"))
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def appended(self) -> int:
+        """Cases held in memory rather than in the snapshot file."""
+        return self.count - len(self.base)
+
+    def raw(self, i: int) -> bytes:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        if i < len(self.base):
+            return self.base.raw(i)
+        return self._appended[i - len(self.base)]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return json.loads(self.raw(i))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self.count):
+            yield self[i]
+
+    def sample(self, rng: Optional[random.Random] = None) -> Dict[str, Any]:
+        if not self.count:
+            raise IndexError("sample from an empty snapshot")
+        return self[(rng or random).randrange(self.count)]
+
+    def is_stale(self, source: str) -> bool:
+        st = os.stat(source)
+        current = (st.st_mtime_ns, st.st_size)
+        if current == self._verified_stat:
+            return False
+        if st.st_size == self.header.get("size") and file_sha256(source) == self.header.get("sha256"):
+            self._verified_stat = current
+            return False
+        return True
+
+    def refreshed(self, source: str, verbose: bool = False, trusted: bool = False) -> Optional["CorpusView"]:
+        """
+        Catch up with lines appended to `source`: returns a new view with the
+        added cases, this view if nothing complete was added, or None if the
+        covered part of the file changed (it needs a full rebuild). The prefix
+        is re-hashed unless `trusted` (the caller did the appending itself).
+        """
+        st = os.stat(source)
+        size = self.header["size"]
+        if st.st_size < size:
+            return None
+        digest = self._digest if trusted and self._digest is not None else file_digest(source, limit=size)
+        if digest.hexdigest() != self.header["sha256"]:
+            return None
+        self._digest = digest
+
+        with open(source, "rb") as f:
+            f.seek(size)
+            records, stats = _compile_lines(f, st.st_size - size, self.header.get("lines", 0) + 1,
+                                            self.header.get("max_id", 0), digest.copy(), verbose)
+            records = list(records)
+        if not stats["size"]:
+            self._verified_stat = (st.st_mtime_ns, st.st_size)
+            return self
+
+        appended = self._appended
+        if len(appended) != self.appended:
+            appended = appended[:self.appended]  # branching off an older view
+        appended.extend(records)
+        digest = stats["digest"]
+        header = dict(
+            self.header,
+            mtime_ns=st.st_mtime_ns,
+            size=size + stats["size"],
+            sha256=digest.hexdigest(),
+            lines=self.header.get("lines", 0) + stats["lines"],
+            max_id=stats["max_id"],
+            count=self.count + len(records),
+        )
+        return CorpusView(self.base, header, appended, digest)
+
+    def compact(self, path: str) -> "CorpusView":
+        """Rewrite the snapshot file with the appended cases (raw copy, no re-parsing)."""
+        header = {k: v for k, v in self.header.items() if k != "count"}
+        write_snapshot((self.raw(i) for i in range(self.count)), path, header)
+        return CorpusView(CorpusSnapshot(path), digest=self._digest)
+
+
+_SNAPSHOTS: Dict[str, CorpusView] = {}
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def get_snapshot(source: str = "Metadata/cases.jsonl", verbose: bool = False) -> Optional[CorpusView]:
+    """
+    Return the current read view of a corpus file, compiling its snapshot on
+    first use. Lines appended to the JSONL are picked up incrementally; any
+    other change (mtime/size, then sha256) recompiles the snapshot.
+    Returns None if the source file does not exist.
+    """
+    source = os.path.abspath(source)
+    if not os.path.exists(source):
+        return None
+    with _SNAPSHOT_LOCK:
+        view = _SNAPSHOTS.get(source)
+        if view is not None and not view.is_stale(source):
+            return view
+        return _refresh(source, view, verbose=verbose)
+
+
+def current_view(source: str) -> Optional[CorpusView]:
+    """The last published view of `source`, without checking the file."""
+    return _SNAPSHOTS.get(os.path.abspath(source))
+
+
+def _refresh(source: str, view: Optional[CorpusView], verbose: bool = False, trusted: bool = False) -> CorpusView:
+    """Bring the view of `source` up to date and publish it. Caller holds _SNAPSHOT_LOCK."""
+    path = source + SNAPSHOT_SUFFIX
+    start = time.perf_counter()
+    stage = "snapshot_extend"
+    if view is None and os.path.exists(path):
+        try:
+            view = CorpusView(CorpusSnapshot(path))
+            stage = "snapshot_open"
+            if "max_id" not in view.header:  # compiled before incremental appends existed
+                view = None
+        except (ValueError, KeyError, OSError):
+            view = None
+
+    fresh = None
+    if view is not None:
+        fresh = view if not view.is_stale(source) else view.refreshed(source, verbose=verbose, trusted=trusted)
+    if fresh is None:
+        build_corpus_snapshot(source, path, verbose=verbose)
+        fresh, stage = CorpusView(CorpusSnapshot(path)), "snapshot_build"
+    elif fresh.appended >= get_settings().INGEST_COMPACT_AT:
+        fresh, stage = fresh.compact(path), "snapshot_compact"
+        if verbose:
+            print(f"✅ Compacted {len(fresh)} cases into snapshot {path}")
+    CORPUS_LOAD_SECONDS.set(time.perf_counter() - start, stage=stage)
+    CORPUS_CASES.set(len(fresh))
+
+    # Old mappings stay valid for callers still holding them; the
+    # replaced file is only unlinked, not truncated.
+    _SNAPSHOTS[source] = fresh
+    return fresh
+
+
+def append_cases(source: str, cases: List[Dict[str, Any]], verbose: bool = False) -> Tuple[CorpusView, List[Dict[str, Any]]]:
+    """
+    Append `cases` to the JSONL corpus and publish a view that includes
+    them, without recompiling the snapshot. Cases without an integer id get
+    the next free one. Returns (new view, the cases as stored).
+    """
+    source = os.path.abspath(source)
+    with _SNAPSHOT_LOCK:
+        view = _SNAPSHOTS.get(source)
+        if os.path.exists(source) and (view is None or view.is_stale(source)):
+            view = _refresh(source, view, verbose=verbose)  # pick up external edits first
+
+        next_id = (view.header.get("max_id", 0) if view is not None else 0) + 1
+        stored = []
+        for case in cases:
+            case = dict(case)
+            if not isinstance(case.get("id"), int) or isinstance(case.get("id"), bool):
+                case.setdefault("id", next_id)
+            next_id = _max_id([case], next_id - 1) + 1
+            stored.append(case)
+
+        data = b"".join(encode_case(case) + b"\n" for case in stored)
+        os.makedirs(os.path.dirname(source), exist_ok=True)
+        with open(source, "a+b") as f:
+            if f.tell():
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return _refresh(source, view, verbose=verbose, trusted=True), stored
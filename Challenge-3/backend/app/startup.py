@@ -0,0 +1,146 @@
+# backend/app/startup.py
+"""
+Deferred initialization of the corpus and the indexes built on it: the
+fact index, the case sampler, the duplicate index and the precedent
+search index.
+
+Importing the app builds nothing. With PREWARM=true (the default) the
+lifespan warms these up in a background thread while the server already
+answers: /healthz is 200 as soon as the process runs, /readyz turns 200
+once warm-up has finished. With PREWARM=false they are built on first use
+and /readyz is ready right away.
+
+`prewarm()` can also run before the server forks its workers (see
+serve.py) so the workers share the loaded indexes instead of each
+building its own.
+"""
+
+import gc
+import time
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from backend.app.config import get_settings
+from backend.app.dedup import get_dedup_index
+from backend.app.fact_index import get_fact_index
+from backend.app.retrieval import get_corpus_index
+from backend.app.sampling import get_sampler
+from backend.app.snapshot import get_snapshot
+
+
+class Readiness:
+    """Warm-up state per component: pending, ready, lazy or failed (with the error)."""
+
+    def __init__(self, components: Tuple[str, ...]):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.components: Dict[str, str] = {name: "pending" for name in components}
+        self.seconds: Dict[str, float] = {}
+
+    def set(self, name: str, state: str, seconds: Optional[float] = None) -> None:
+        with self._lock:
+            self.components[name] = state
+            if seconds is not None:
+                self.seconds[name] = round(seconds, 3)
+
+    def defer(self) -> None:
+        """Nothing is prewarmed; every component is built on first use."""
+        with self._lock:
+            for name, state in self.components.items():
+                if state == "pending":
+                    self.components[name] = "lazy"
+
+    @property
+    def ready(self) -> bool:
+        # A failed component degrades the service (e.g. debates without facts) but doesn't block it.
+        with self._lock:
+            return all(state != "pending" for state in self.components.values())
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "ready": all(state != "pending" for state in self.components.values()),
+                "components": dict(self.components),
+                "seconds": dict(self.seconds),
+                "uptime": round(time.time() - self.started, 3),
+            }
+
+
+# ----------------------------
+# Warm-up steps
+# ----------------------------
+
+def _load_corpus() -> None:
+    # Compile (or reuse) the mmap-ed corpus snapshot.
+    view = get_snapshot(get_settings().CORPUS_PATH, verbose=True)
+    print(f"✅ Corpus snapshot ready with {len(view) if view else 0} cases.")
+
+
+def _load_facts() -> None:
+    # Facts and their embeddings are (re)built only when the corpus changes.
+    get_fact_index(verbose=True)
+
+
+def _load_sampler() -> None:
+    # Metadata indexes for filtered / weighted / per-user /generate_case draws
+    get_sampler()
+
+
+def _load_dedup() -> None:
+    # Near-duplicate index that ingestion checks new cases against
+    get_dedup_index()
+
+
+def _load_precedents() -> None:
+    # Hybrid case index the prosecution's precedents come from
+    if get_settings().PRECEDENTS_PER_DEBATE > 0:
+        get_corpus_index(get_settings().CORPUS_PATH)
+
+
+STEPS: Tuple[Tuple[str, Callable[[], None]], ...] = (
+    ("corpus", _load_corpus),
+    ("facts", _load_facts),
+    ("sampler", _load_sampler),
+    ("dedup", _load_dedup),
+    ("precedents", _load_precedents),
+)
+
+READINESS = Readiness(tuple(name for name, _ in STEPS))
+
+
+def freeze_heap() -> None:
+    """
+    Move everything allocated so far out of the garbage collector's reach.
+    The collector no longer walks (and writes to) the warmed-up objects, so
+    pages shared with a parent process after fork stay shared.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def prewarm(readiness: Readiness = READINESS, freeze: bool = True) -> Readiness:
+    """Build every component once, recording how long each took; failures are logged, not raised."""
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"⚠️ Could not warm up {name}: {e}")
+            readiness.set(name, f"failed: {e}", time.perf_counter() - start)
+        else:
+            readiness.set(name, "ready", time.perf_counter() - start)
+    if freeze:
+        freeze_heap()
+    total = sum(readiness.seconds.values())
+    print(f"🔥 Warm-up finished in {total:.2f}s")
+    return readiness
+
+
+def start_prewarm(readiness: Readiness = READINESS) -> Optional[threading.Thread]:
+    """Warm up in a background thread if PREWARM is on, else mark everything lazy."""
+    if not get_settings().PREWARM:
+        readiness.defer()
+        return None
+    thread = threading.Thread(target=prewarm, args=(readiness,), name="prewarm", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,137 @@
+# backend/app/stub_llm.py
+"""
+Local stand-in for an LLM server, for tests and benchmarks.
+
+Speaks both the Ollama (/api/generate) and the OpenAI-compatible
+(/v1/completions, batched prompts allowed) APIs, with configurable latency:
+
+    python -m backend.app.stub_llm --port 11434 --delay 0.5 --jitter 0.2
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+
+def stub_completion(prompt: str) -> str:
+    lines = prompt.strip().splitlines() or [""]
+    subject = next((line for line in lines if line.startswith("Case:")), lines[-1])
+    return f"Stub completion for: {subject[:80]}"
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], delay: float = 0.0, jitter: float = 0.0):
+        super().__init__(address, StubLLMHandler)
+        self.delay = delay
+        self.jitter = jitter
+        self.requests = 0
+        self.prompts = 0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        time.sleep(max(0.0, self.delay + random.uniform(-self.jitter, self.jitter)))
+
+    def count(self, prompts: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.prompts += prompts
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real server
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_chunks(self, content_type: str, chunks: List[bytes]) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks + [b""]:
+            self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+
+    def do_POST(self) -> None:
+        body = self._body()
+        server: StubLLMServer = self.server  # type: ignore[assignment]
+
+        if self.path == "/api/generate":
+            server.count(1)
+            server.wait()
+            text = stub_completion(body.get("prompt", ""))
+            if body.get("stream", True):
+                words = text.split(" ")
+                lines = [json.dumps({"response": w + " ", "done": False}).encode() + b"\n" for w in words]
+                lines.append(json.dumps({"response": "", "done": True}).encode() + b"\n")
+                self._send_chunks("application/x-ndjson", lines)
+            else:
+                self._send_json({"model": body.get("model"), "response": text, "done": True})
+
+        elif self.path == "/v1/completions":
+            prompts = body.get("prompt", "")
+            prompts = prompts if isinstance(prompts, list) else [prompts]
+            server.count(len(prompts))
+            server.wait()
+            texts = [stub_completion(p) for p in prompts]
+            if body.get("stream"):
+                events = [
+                    b"data: " + json.dumps({"choices": [{"index": 0, "text": w + " "}]}).encode() + b"\n\n"
+                    for w in texts[0].split(" ")
+                ]
+                events.append(b"data: [DONE]\n\n")
+                self._send_chunks("text/event-stream", events)
+            else:
+                self._send_json({
+                    "model": body.get("model"),
+                    "choices": [{"index": i, "text": t, "finish_reason": "stop"} for i, t in enumerate(texts)],
+                })
+
+        else:
+            self.send_error(404)
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, delay: float = 0.0, jitter: float = 0.0) -> StubLLMServer:
+    """Start the stub on a background thread (port 0 picks a free port). Call .shutdown() to stop."""
+    server = StubLLMServer((host, port), delay=delay, jitter=jitter)
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random extra latency")
+    args = parser.parse_args()
+    server = StubLLMServer((args.host, args.port), delay=args.delay, jitter=args.jitter)
+    print(f"🤖 Stub LLM listening on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
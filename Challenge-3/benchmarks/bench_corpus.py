@@ -0,0 +1,122 @@
+# benchmarks/bench_corpus.py
+"""
+Micro-benchmarks for the corpus pipeline on synthetic corpora:
+load_corpus, snapshot compilation and generate_facts.
+
+`load_corpus` builds the columnar CaseTable; `dicts` holds the same corpus
+as a list of plain dicts for comparison. Both report memory per 1M cases.
+
+    python -m benchmarks.bench_corpus                         # 10k, 100k, 1M cases
+    python -m benchmarks.bench_corpus --sizes 10000 --only load_corpus,dicts
+"""
+
+import os
+import gc
+import sys
+import time
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.app.generate_facts import generate_facts
+from backend.app.retrieval import iter_corpus, load_corpus
+from backend.app.snapshot import build_corpus_snapshot
+from benchmarks.report import Results, add_arguments, emit, peak_rss_mb, reset_peak_rss, rss_mb
+from benchmarks.synthetic import write_synthetic_corpus
+
+BENCHMARKS = ("load_corpus", "dicts", "snapshot", "generate_facts")
+
+
+def measure(fn: Callable[[], Any], inspect: Optional[Callable[[Any], Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Time `fn` and measure memory: the RSS its result keeps alive and, on
+    Linux, the peak RSS reached while it ran. `inspect(result)` can add
+    metrics before the result is released.
+    """
+    gc.collect()
+    before = rss_mb()
+    peak_tracked = reset_peak_rss()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    after, peak = rss_mb(), peak_rss_mb()
+    out: Dict[str, Any] = {"seconds": round(seconds, 3), **(inspect(result) if inspect else {})}
+    del result
+    gc.collect()
+    if before is not None and after is not None:
+        out["rss_growth_mb"] = round(after - before, 1)
+    if peak_tracked and before is not None and peak is not None:
+        out["peak_growth_mb"] = round(peak - before, 1)
+    return out
+
+
+def per_million(stats: Dict[str, Any], n: int) -> Dict[str, Any]:
+    """Retained memory scaled to 1M cases."""
+    if "rss_growth_mb" not in stats:
+        return {}
+    return {"mb_per_1m_cases": round(stats["rss_growth_mb"] * 1_000_000 / n, 1)}
+
+
+def run(sizes: List[int], only: List[str], seed: int, workdir: str) -> Results:
+    results: Results = {}
+    for n in sizes:
+        corpus = os.path.join(workdir, f"cases_{n}.jsonl")
+        write_synthetic_corpus(corpus, n, seed)
+        size_mb = round(os.path.getsize(corpus) / 1e6, 1)
+        print(f"📄 {n} cases ({size_mb} MB)", file=sys.stderr)
+
+        if "load_corpus" in only:
+            stats = measure(lambda: load_corpus(corpus), lambda table: {"table_mb": round(table.nbytes / 1e6, 1)})
+            results[f"load_corpus[{n}]"] = {
+                "cases": n, "corpus_mb": size_mb, **stats, **per_million(stats, n),
+                "cases_per_s": round(n / stats["seconds"]) if stats["seconds"] else 0,
+            }
+        if "dicts" in only:
+            stats = measure(lambda: list(iter_corpus(corpus)))
+            results[f"dicts[{n}]"] = {
+                "cases": n, "corpus_mb": size_mb, **stats, **per_million(stats, n),
+                "cases_per_s": round(n / stats["seconds"]) if stats["seconds"] else 0,
+            }
+        if "snapshot" in only:
+            path = os.path.join(workdir, f"cases_{n}.snapshot")
+            stats = measure(lambda: build_corpus_snapshot(corpus, path))
+            results[f"snapshot[{n}]"] = {
+                "cases": n, **stats,
+                "cases_per_s": round(n / stats["seconds"]) if stats["seconds"] else 0,
+            }
+            os.remove(path)
+        if "generate_facts" in only:
+            out = os.path.join(workdir, f"facts_{n}.snapshot")
+            stats = measure(lambda: generate_facts(corpus, out, per_case=10))
+            results[f"generate_facts[{n}]"] = {
+                "cases": n, **stats,
+                "output_mb": round(os.path.getsize(out) / 1e6, 1),
+                "cases_per_s": round(n / stats["seconds"]) if stats["seconds"] else 0,
+            }
+            os.remove(out)
+        os.remove(corpus)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated corpus sizes")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="directory for the synthetic corpora (default: a temp dir)")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    only = [b for b in args.only.split(",") if b]
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        results = run(sizes, only, args.seed, args.workdir)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            results = run(sizes, only, args.seed, workdir)
+    sys.exit(emit(results, args.out, args.baseline, args.tolerance, args.update_baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_facts.py
+"""
+Throughput of the streaming generate_facts pipeline at millions of cases,
+per worker count and output format, plus lazy-load cost of the result.
+
+    python -m benchmarks.bench_facts                                   # 1M and 2M cases, 1 and all CPUs
+    python -m benchmarks.bench_facts --sizes 1000000 --workers 1,2,4,8 --formats snapshot,jsonl,py
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from typing import List
+
+from backend.app.generate_facts import generate_facts, load_facts
+from benchmarks.bench_corpus import measure
+from benchmarks.report import Results, add_arguments, emit, percentiles
+from benchmarks.synthetic import write_synthetic_corpus
+
+EXTENSIONS = {"snapshot": ".snapshot", "jsonl": ".jsonl", "py": ".py"}
+
+
+def run(sizes: List[int], workers: List[int], formats: List[str], chunk_size: int, seed: int, workdir: str) -> Results:
+    results: Results = {}
+    for n in sizes:
+        corpus = os.path.join(workdir, f"cases_{n}.jsonl")
+        write_synthetic_corpus(corpus, n, seed)
+        for fmt in formats:
+            for w in workers:
+                out = os.path.join(workdir, f"facts_{n}_{w}{EXTENSIONS[fmt]}")
+                facts = {}
+                stats = measure(lambda: facts.setdefault("n", generate_facts(corpus, out, workers=w, chunk_size=chunk_size)))
+                entry = {
+                    "cases": n,
+                    "facts": facts["n"],
+                    **stats,
+                    "output_mb": round(os.path.getsize(out) / 1e6, 1),
+                    "cases_per_s": round(n / stats["seconds"]) if stats["seconds"] else 0,
+                    "facts_per_s": round(facts["n"] / stats["seconds"]) if stats["seconds"] else 0,
+                }
+                if fmt == "snapshot":
+                    start = time.perf_counter()
+                    store = load_facts(out)
+                    entry["open_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                    rng = random.Random(seed)
+                    latencies = []
+                    for _ in range(10_000):
+                        i = rng.randrange(len(store))
+                        t0 = time.perf_counter()
+                        store.facts(i)
+                        latencies.append((time.perf_counter() - t0) * 1000)
+                    entry.update(percentiles(latencies, prefix="lookup_"))
+                    store.close()
+                results[f"generate_facts.{fmt}[{n},w={w}]"] = entry
+                os.remove(out)
+        os.remove(corpus)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000000,2000000")
+    parser.add_argument("--workers", default=",".join(sorted({"1", str(os.cpu_count() or 1)})))
+    parser.add_argument("--formats", default="snapshot", help="comma-separated: snapshot,jsonl,py")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    workers = [int(w) for w in args.workers.split(",") if w]
+    formats = [f for f in args.formats.split(",") if f]
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(sizes, workers, formats, args.chunk_size, args.seed, workdir)
+    sys.exit(emit(results, args.out, args.baseline, args.tolerance, args.update_baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_ingest.py
+"""
+Cost of adding cases to a running corpus versus rebuilding everything:
+the snapshot, fact index and BM25 search index are built once for a
+synthetic corpus, then batches are ingested with ingest_cases().
+
+    python -m benchmarks.bench_ingest                          # 100k cases, batches of 1 and 100
+    python -m benchmarks.bench_ingest --cases 1000000 --batches 1,1000 --rounds 20
+
+Set INGEST_COMPACT_AT to include (or keep out) the periodic file rewrites.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+from typing import List
+
+from backend.app.fact_index import get_fact_index
+from backend.app.ingest import ingest_cases
+from backend.app.retrieval import get_corpus_index
+from backend.app.snapshot import get_snapshot
+from benchmarks.report import Results, add_arguments, emit, percentiles
+from benchmarks.synthetic import iter_synthetic_cases, write_synthetic_corpus
+
+
+def run(n_cases: int, batches: List[int], rounds: int, seed: int, workdir: str) -> Results:
+    corpus = os.path.join(workdir, "cases.jsonl")
+    facts = os.path.join(workdir, "facts.snapshot")
+    write_synthetic_corpus(corpus, n_cases, seed)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        start = time.perf_counter()
+        get_snapshot(corpus)
+        get_fact_index(corpus, facts)
+        get_corpus_index(corpus, dense=False)
+        rebuild_s = time.perf_counter() - start
+
+    results: Results = {}
+    fresh = iter_synthetic_cases(rounds * sum(batches) + 1, seed + 1)
+    for batch in batches:
+        latencies = []
+        for _ in range(rounds):
+            cases = [{k: v for k, v in next(fresh).items() if k != "id"} for _ in range(batch)]
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(sys.stderr):
+                ingest_cases(cases, corpus, facts, source="bench")
+            latencies.append((time.perf_counter() - t0) * 1000)
+        total_s = sum(latencies) / 1000
+        results[f"ingest[{n_cases},batch={batch}]"] = {
+            "cases": n_cases,
+            "batch": batch,
+            "rounds": rounds,
+            "rebuild_seconds": round(rebuild_s, 2),
+            "cases_per_s": round(batch * rounds / total_s) if total_s else 0,
+            **percentiles(latencies),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--batches", default="1,100", help="comma-separated batch sizes")
+    parser.add_argument("--rounds", type=int, default=50, help="batches ingested per batch size")
+    parser.add_argument("--seed", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    batches = [int(b) for b in args.batches.split(",") if b]
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(args.cases, batches, args.rounds, args.seed, workdir)
+    sys.exit(emit(results, args.out, args.baseline, args.tolerance, args.update_baseline))
+
+
+if __name__ == "__main__":
+    main()
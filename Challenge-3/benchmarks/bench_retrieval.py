@@ -0,0 +1,80 @@
+# benchmarks/bench_retrieval.py
+"""
+Query-latency benchmark for backend.app.retrieval.CorpusIndex.
+
+    python -m benchmarks.bench_retrieval --cases 1000000
+    python -m benchmarks.bench_retrieval --cases 100000 --encoder minilm
+
+The default `hash` encoder is a random-projection bag-of-words encoder so the
+dense side can be built at 1M cases in minutes; `minilm` uses the real
+sentence-transformers model (query encoding time is then included).
+"""
+
+import sys
+import argparse
+import random
+import time
+
+from backend.app.retrieval import CorpusIndex, HashingEncoder, SentenceTransformerEncoder
+from backend.app.config import get_settings
+from benchmarks.report import add_arguments, emit, percentiles
+from benchmarks.synthetic import JURISDICTIONS, TAGS, WORDS, synthetic_cases
+
+
+def run(n_cases: int, n_queries: int, k: int, encoder_name: str, seed: int) -> dict:
+    rng = random.Random(seed)
+    docs = synthetic_cases(n_cases, seed)
+    if encoder_name == "none":
+        encoder = None
+    elif encoder_name == "minilm":
+        encoder = SentenceTransformerEncoder(get_settings().EMBEDDING_MODEL)
+    else:
+        encoder = HashingEncoder()
+
+    start = time.perf_counter()
+    index = CorpusIndex(docs, encoder=encoder)
+    build_s = time.perf_counter() - start
+
+    queries = [" ".join(rng.choices(WORDS, k=rng.randint(3, 8))) for _ in range(n_queries)]
+    filters = [
+        None if rng.random() < 0.5 else {
+            "jurisdiction": rng.choice(JURISDICTIONS),
+            "tags": [rng.choice(TAGS)],
+            "year_from": 2000,
+        }
+        for _ in range(n_queries)
+    ]
+    for q in queries[:10]:  # warm-up
+        index.search(q, k=k)
+
+    latencies = []
+    for q, f in zip(queries, filters):
+        t0 = time.perf_counter()
+        index.search(q, k=k, filters=f)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+    stats = percentiles(latencies)
+    return {f"retrieval.search[{n_cases},{encoder_name}]": {
+        "cases": n_cases,
+        "queries": n_queries,
+        "build_seconds": round(build_s, 2),
+        **stats,
+        "under_10ms": stats["p95_ms"] < 10.0,
+    }}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--encoder", choices=["hash", "minilm", "none"], default="hash")
+    parser.add_argument("--seed", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+    results = run(args.cases, args.queries, args.k, args.encoder, args.seed)
+    sys.exit(emit(results, args.out, args.baseline, args.tolerance, args.update_baseline))
+
+
+if __name__ == "__main__":
+    main()
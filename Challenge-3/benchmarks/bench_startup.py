@@ -0,0 +1,188 @@
+# benchmarks/bench_startup.py
+"""
+Startup benchmarks: how long until the API is alive (/healthz) and ready
+(/readyz), and what importing the package costs.
+
+    import[module]     median import time of a module in a fresh interpreter
+    server[cold]       uvicorn on a corpus without snapshot/fact files (PREWARM=true)
+    server[warm]       the same again, reusing the files written by the cold start
+    server[lazy]       PREWARM=false: ready at once, the first /generate_case pays instead
+    workers[uvicorn]   uvicorn --workers N: every worker builds its own indexes
+    workers[preload]   python -m backend.app.serve --workers N: built once, shared after fork
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --cases 100000 --workers 4 --only server,workers
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from benchmarks.loadtest import CHALLENGE_DIR, _free_port
+from benchmarks.report import Results, add_arguments, emit, rss_mb
+from benchmarks.synthetic import write_synthetic_corpus
+
+BENCHMARKS = ("import", "server", "workers")
+MODULES = ("backend.app", "backend.app.config", "backend.app.main")
+TIMEOUT = 300
+
+
+def import_ms(module: str, env: Dict[str, str], repeat: int) -> float:
+    """Median wall time of `import module` in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=CHALLENGE_DIR, env=env,
+                             capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]) * 1000)
+    return round(statistics.median(times), 1)
+
+
+def _descendants(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+    return children + [d for child in children for d in _descendants(child)]
+
+
+def pss_mb(pid: int) -> Optional[float]:
+    """Proportional set size: shared pages are split between the processes sharing them (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def wait_for(url: str, process: subprocess.Popen, start: float, workers: int = 1) -> float:
+    """Milliseconds from `start` until `url` answered 200 from `workers` different pids."""
+    seen: Set[int] = set()
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            r = httpx.get(url, timeout=5)
+            if r.status_code == 200:
+                seen.add(r.json().get("pid"))
+                if len(seen) >= workers:
+                    return round((time.perf_counter() - start) * 1000, 1)
+                continue
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    raise RuntimeError(f"{url} not ready within {TIMEOUT}s")
+
+
+def start(command: List[str], env: Dict[str, str]) -> "tuple[subprocess.Popen, str, float]":
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(command + ["--port", str(port)], cwd=CHALLENGE_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return process, f"http://127.0.0.1:{port}", started
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def server_run(env: Dict[str, str]) -> Dict[str, Any]:
+    process, url, started = start(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--log-level", "warning"], env)
+    try:
+        out: Dict[str, Any] = {"healthz_ms": wait_for(url + "/healthz", process, started)}
+        out["readyz_ms"] = wait_for(url + "/readyz", process, started)
+        t = time.perf_counter()
+        httpx.post(url + "/generate_case", timeout=TIMEOUT).raise_for_status()
+        out["first_case_ms"] = round((time.perf_counter() - t) * 1000, 1)
+        rss = rss_mb(process.pid)
+        if rss is not None:
+            out["rss_mb"] = rss
+        return out
+    finally:
+        stop(process)
+
+
+def workers_run(command: List[str], env: Dict[str, str], workers: int) -> Dict[str, Any]:
+    process, url, started = start(command + ["--log-level", "warning", "--workers", str(workers)], env)
+    try:
+        out: Dict[str, Any] = {"workers": workers, "all_ready_ms": wait_for(url + "/readyz", process, started, workers)}
+        pss = [pss_mb(pid) for pid in [process.pid] + _descendants(process.pid)]
+        if pss and None not in pss:
+            out["total_pss_mb"] = round(sum(pss), 1)
+        return out
+    finally:
+        stop(process)
+
+
+def run(cases: int, workers: int, only: List[str], repeat: int, seed: int, workdir: str) -> Results:
+    corpus = os.path.join(workdir, "cases.jsonl")
+    write_synthetic_corpus(corpus, cases, seed)
+    env = dict(
+        os.environ,
+        USE_MOCK="true",
+        CORPUS_PATH=corpus,
+        FACTS_PATH=os.path.join(workdir, "facts.snapshot"),
+        SESSION_DB=os.path.join(workdir, "sessions.db"),
+        CACHE_DB=os.path.join(workdir, "llm_cache.db"),
+        BATCH_DB=os.path.join(workdir, "batches.db"),
+        JOBS_DB=os.path.join(workdir, "jobs.db"),
+    )
+    results: Results = {}
+
+    if "import" in only:
+        for module in MODULES:
+            results[f"import[{module}]"] = {"import_ms": import_ms(module, env, repeat)}
+            print(f"📦 import {module}: {results[f'import[{module}]']['import_ms']} ms", file=sys.stderr)
+
+    if "server" in only:
+        # The cold start writes the snapshot and fact files; every later run reuses them.
+        results[f"server[cold,{cases}]"] = server_run(dict(env, PREWARM="true"))
+        results[f"server[warm,{cases}]"] = server_run(dict(env, PREWARM="true"))
+        results[f"server[lazy,{cases}]"] = server_run(dict(env, PREWARM="false"))
+        print(f"🚀 server startup measured on {cases} cases", file=sys.stderr)
+
+    if "workers" in only:
+        results[f"workers[uvicorn,{cases}]"] = workers_run(
+            [sys.executable, "-m", "uvicorn", "backend.app.main:app"], env, workers)
+        results[f"workers[preload,{cases}]"] = workers_run(
+            [sys.executable, "-m", "backend.app.serve"], env, workers)
+        print(f"👥 {workers} workers measured on {cases} cases", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=20000, help="synthetic corpus size")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes for the workers[...] runs")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"subset of {','.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per import measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    only = [b for b in args.only.split(",") if b]
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(args.cases, args.workers, only, args.repeat, args.seed, workdir)
+    sys.exit(emit(results, args.out, args.baseline, args.tolerance, args.update_baseline))
+
+
+if __name__ == "__main__":
+    main()
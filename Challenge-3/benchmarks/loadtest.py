@@ -0,0 +1,226 @@
+# benchmarks/loadtest.py
+"""
+Load test for the FastAPI service: concurrent clients each loop through
+/generate_case -> /debate -> /summarize_verdict.
+
+By default the API is started as a uvicorn subprocess on the mock backend
+(USE_MOCK) with simulated LLM latency, the response cache off and a
+throwaway session database, so the numbers measure the service itself:
+
+    python -m benchmarks.loadtest --clients 20 --duration 30 --delay 0.2 --jitter 0.1
+    python -m benchmarks.loadtest --backend stub --delay 0.5     # real provider path against stub_llm
+    python -m benchmarks.loadtest --url http://localhost:8000     # an already running server
+    python -m benchmarks.loadtest --background                    # /debate?background=true, then follow the job
+
+With --background, "/debate" is the time to queue the debate and "/jobs"
+the time from submitting it until its job is done.
+
+Reports p50/p95/p99 latency and requests/second per endpoint, plus the
+server's RSS growth over the run.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.report import Results, add_arguments, emit, percentiles, rss_mb
+
+ENDPOINTS = ("/generate_case", "/debate", "/summarize_verdict")
+CHALLENGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args: argparse.Namespace, workdir: str) -> "tuple[subprocess.Popen, str, Any]":
+    """Start the API (and the stub LLM for --backend stub) as subprocesses; returns (server, url, stub)."""
+    env = dict(
+        os.environ,
+        USE_MOCK="true" if args.backend == "mock" else "false",
+        MOCK_DELAY=str(args.delay),
+        MOCK_JITTER=str(args.jitter),
+        CACHE_POLICY="off" if not args.cache else os.environ.get("CACHE_POLICY", "variants"),
+        SESSION_DB=os.path.join(workdir, "sessions.db"),
+        JOBS_DB=os.path.join(workdir, "jobs.db"),
+        BATCH_DB=os.path.join(workdir, "batches.db"),
+        CACHE_DB=os.path.join(workdir, "llm_cache.db"),
+    )
+    stub = None
+    if args.backend == "stub":
+        stub_port = _free_port()
+        stub = subprocess.Popen(
+            [sys.executable, "-m", "backend.app.stub_llm", "--port", str(stub_port),
+             "--delay", str(args.delay), "--jitter", str(args.jitter)],
+            cwd=CHALLENGE_DIR, stdout=subprocess.DEVNULL,
+        )
+        env.update(LLM_BASE_URL=f"http://127.0.0.1:{stub_port}", LLM_PROVIDER=args.provider)
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port),
+         "--log-level", "warning", "--workers", "1"],
+        cwd=CHALLENGE_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            if httpx.get(url + "/", timeout=1).status_code == 200:
+                return server, url, stub
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("API server did not become ready within 60s")
+
+
+async def client_loop(
+    client: httpx.AsyncClient,
+    stop_at: float,
+    iterations: Optional[int],
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+    background: bool = False,
+) -> None:
+    async def call(path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        label = path.split("?")[0]
+        try:
+            r = await client.post(path, json=payload)
+            r.raise_for_status()
+            return r.json()
+        except (httpx.HTTPError, ValueError):
+            errors[label] += 1
+            return None
+        finally:
+            latencies[label].append((time.perf_counter() - start) * 1000)
+
+    async def follow(job_id: str, submitted: float) -> Optional[Dict[str, Any]]:
+        """Wait for a background debate by following its job events."""
+        try:
+            async with client.stream("GET", f"/jobs/{job_id}/events") as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    event = json.loads(line) if line else {}
+                    if event.get("type") in ("done", "failed"):
+                        return event["job"].get("debate") if event["type"] == "done" else None
+            return None
+        except (httpx.HTTPError, ValueError):
+            return None
+        finally:
+            latencies["/jobs"].append((time.perf_counter() - submitted) * 1000)
+
+    done = 0
+    while time.monotonic() < stop_at and (iterations is None or done < iterations):
+        done += 1
+        generated = await call("/generate_case", {})
+        if generated is None:
+            continue
+        submitted = time.perf_counter()
+        path = "/debate?background=true" if background else "/debate"
+        debate = await call(path, {"case": generated["case"]})
+        if debate is not None and background:
+            debate = await follow(debate["job_id"], submitted)
+            if debate is None:
+                errors["/jobs"] += 1
+        if debate is None:
+            continue
+        await call("/summarize_verdict", {"session_id": debate["session_id"], "verdict": "Defense"})
+
+
+async def drive(url: str, clients: int, duration: float, iterations: Optional[int], warmup: int,
+                background: bool = False) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=600) as client:
+        if warmup:
+            await client_loop(client, float("inf"), warmup, defaultdict(list), defaultdict(int), background)
+        start = time.perf_counter()
+        stop_at = time.monotonic() + duration
+        await asyncio.gather(*(client_loop(client, stop_at, iterations, latencies, errors, background)
+                               for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed}
+
+
+def run(args: argparse.Namespace) -> Results:
+    server = stub = None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            if args.url:
+                url = args.url.rstrip("/")
+            else:
+                server, url, stub = start_server(args, workdir)
+            pid = server.pid if server is not None else None
+            rss_start = rss_mb(pid) if pid else None
+
+            iterations = args.iterations or None
+            duration = args.duration if iterations is None else float("inf")
+            outcome = asyncio.run(drive(url, args.clients, duration, iterations, args.warmup, args.background))
+            rss_end = rss_mb(pid) if pid else None
+        finally:
+            for proc in (server, stub):
+                if proc is not None:
+                    proc.terminate()
+                    proc.wait(timeout=10)
+
+    elapsed = outcome["elapsed"]
+    label = f"loadtest[{args.backend},c={args.clients},delay={args.delay}{',background' if args.background else ''}]"
+    total = sum(len(v) for v in outcome["latencies"].values())
+    summary: Dict[str, Any] = {
+        "clients": args.clients,
+        "requests": total,
+        "errors": sum(outcome["errors"].values()),
+        "elapsed_s": round(elapsed, 2),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+    }
+    if rss_start is not None and rss_end is not None:
+        summary.update(rss_start_mb=rss_start, rss_end_mb=rss_end, rss_growth_mb=round(rss_end - rss_start, 1))
+
+    results: Results = {label: summary}
+    for path in ENDPOINTS + (("/jobs",) if args.background else ()):
+        samples = outcome["latencies"].get(path, [])
+        results[f"{label}{path}"] = {
+            "requests": len(samples),
+            "errors": outcome["errors"].get(path, 0),
+            "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            **percentiles(samples),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--iterations", type=int, default=0, help="fixed flows per client instead of --duration")
+    parser.add_argument("--warmup", type=int, default=2, help="flows run before measuring")
+    parser.add_argument("--backend", choices=["mock", "stub"], default="mock")
+    parser.add_argument("--provider", default="ollama", help="LLM_PROVIDER for --backend stub (ollama or openai)")
+    parser.add_argument("--delay", type=float, default=0.1, help="simulated LLM latency per call, seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="+/- seconds of random extra latency")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on")
+    parser.add_argument("--url", help="target a running server instead of starting one (no RSS figures)")
+    parser.add_argument("--background", action="store_true", help="queue debates as jobs and follow them")
+    add_arguments(parser)
+    args = parser.parse_args()
+    sys.exit(emit(run(args), args.out, args.baseline, args.tolerance, args.update_baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# benchmarks/report.py
+"""
+Shared result handling for the benchmarks: percentiles, memory readings,
+JSON output and comparison against a stored baseline.
+
+Every benchmark produces {name: {metric: value}}. Metrics are judged by
+their suffix: *_ms, *_seconds and *growth_mb are lower-is-better, *rps
+and *_per_s are higher-is-better, anything else is informational.
+
+    python -m benchmarks.report results.json --baseline benchmarks/baseline.json
+"""
+
+import os
+import sys
+import json
+import argparse
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+Results = Dict[str, Dict[str, Any]]
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+LOWER_IS_BETTER = ("_ms", "_seconds", "growth_mb")
+HIGHER_IS_BETTER = ("rps", "_per_s")
+# Absolute slack per unit so tiny numbers don't flag on noise
+MIN_DELTA = {"_ms": 5.0, "_seconds": 0.05, "_mb": 8.0, "rps": 1.0, "_per_s": 1.0}
+
+
+def percentiles(latencies_ms: Sequence[float], prefix: str = "") -> Dict[str, float]:
+    if not latencies_ms:
+        return {f"{prefix}p50_ms": 0.0, f"{prefix}p95_ms": 0.0, f"{prefix}p99_ms": 0.0}
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {f"{prefix}p50_ms": round(float(p50), 2), f"{prefix}p95_ms": round(float(p95), 2), f"{prefix}p99_ms": round(float(p99), 2)}
+
+
+def _proc_status_mb(field: str, pid: Optional[int] = None) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss() -> bool:
+    """Reset this process's peak RSS (Linux only); True if peak_rss_mb() now measures from here."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> Optional[float]:
+    return _proc_status_mb("VmHWM")
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Current resident set size of `pid` (default: this process) in MB, or None if unavailable."""
+    current = _proc_status_mb("VmRSS", pid)
+    if current is not None:
+        return current
+    if pid is None and resource is not None:
+        # Peak rather than current RSS, but better than nothing off Linux (kB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    return None
+
+
+def _direction(metric: str) -> Optional[str]:
+    if metric.endswith(LOWER_IS_BETTER):
+        return "lower"
+    if metric.endswith(HIGHER_IS_BETTER):
+        return "higher"
+    return None
+
+
+def _slack(metric: str) -> float:
+    return next((v for suffix, v in MIN_DELTA.items() if metric.endswith(suffix)), 0.0)
+
+
+def compare(results: Results, baseline: Results, tolerance: float = 0.25) -> List[Dict[str, Any]]:
+    """Metrics that got worse than the baseline by more than `tolerance` (relative) plus unit slack."""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            direction = _direction(metric)
+            if direction is None or not isinstance(value, (int, float)) or not isinstance(base, (int, float)):
+                continue
+            if direction == "lower":
+                worse = value > base * (1 + tolerance) + _slack(metric)
+            else:
+                worse = value < base * (1 - tolerance) - _slack(metric)
+            if worse:
+                change = (value - base) / base if base else float("inf")
+                regressions.append({
+                    "benchmark": name, "metric": metric, "baseline": base, "value": value,
+                    "change": round(change, 3),
+                })
+    return regressions
+
+
+def load_results(path: str) -> Results:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def emit(results: Results, out: Optional[str] = None, baseline: Optional[str] = None,
+         tolerance: float = 0.25, update_baseline: bool = False) -> int:
+    """
+    Print results as JSON, optionally write them to `out`, and compare them
+    with `baseline`. With `update_baseline` the results are merged into the
+    baseline file instead. Returns a process exit code (1 on regression).
+    """
+    print(json.dumps(results, indent=2))
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline and update_baseline:
+        stored = load_results(baseline) if os.path.exists(baseline) else {}
+        stored.update(results)
+        with open(baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"📌 Baseline updated: {baseline}")
+        return 0
+
+    if baseline and os.path.exists(baseline):
+        regressions = compare(results, load_results(baseline), tolerance)
+        for r in regressions:
+            print(f"❌ {r['benchmark']} {r['metric']}: {r['baseline']} -> {r['value']} ({r['change']:+.0%})")
+        if regressions:
+            return 1
+        print(f"✅ No regressions against {baseline} (tolerance {tolerance:.0%})")
+    return 0
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Output/baseline flags shared by every benchmark CLI."""
+    parser.add_argument("--out", help="also write the JSON results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON to compare against ('' to skip)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("results", help="results JSON written with --out")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    regressions = compare(load_results(args.results), load_results(args.baseline), args.tolerance)
+    print(json.dumps(regressions, indent=2))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/synthetic.py
+
+import json
+import random
+from typing import Any, Dict, Iterator, List
+
+JURISDICTIONS = [
+    "Florida", "California", "New York", "Texas", "Oregon", "New Mexico",
+    "Ohio", "Nevada", "Washington", "Illinois", "Georgia", "Michigan",
+]
+TAGS = [
+    "defamation", "animal law", "humor", "traffic", "safety", "civil rights",
+    "inheritance", "estate", "technology", "education", "consumer rights",
+    "absurd law", "self litigation", "property", "contract", "tort",
+]
+WORDS = (
+    "plaintiff defendant neighbor parrot court claimed statements damaging reputation "
+    "light ticket fortune relatives campus classes tuition reimbursement lawsuit damages "
+    "coffee burns restaurant contract breach warranty landlord tenant lease injury "
+    "negligence evidence witness appeal ruling jury verdict settlement insurance policy "
+    "property boundary fence tree dispute employer employee wages overtime privacy drone "
+    "photograph trespass noise ordinance permit license vehicle accident liability"
+).split()
+
+
+def synthetic_case(i: int, rng: random.Random) -> Dict[str, Any]:
+    words = rng.choices(WORDS, k=rng.randint(15, 40))
+    return {
+        "id": i,
+        "title": " ".join(rng.choices(WORDS, k=4)).capitalize(),
+        "year": rng.randint(1980, 2024),
+        "jurisdiction": rng.choice(JURISDICTIONS),
+        "tags": rng.sample(TAGS, k=rng.randint(1, 3)),
+        "text": " ".join(words).capitalize() + ".",
+    }
+
+
+def iter_synthetic_cases(n: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for i in range(1, n + 1):
+        yield synthetic_case(i, rng)
+
+
+def synthetic_cases(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    return list(iter_synthetic_cases(n, seed))
+
+
+def write_synthetic_corpus(path: str, n: int, seed: int = 0) -> str:
+    """Write `n` synthetic cases to a JSONL file shaped like Metadata/cases.jsonl."""
+    with open(path, "w", encoding="utf-8") as f:
+        for case in iter_synthetic_cases(n, seed):
+            f.write(json.dumps(case) + "\n")
+    return path
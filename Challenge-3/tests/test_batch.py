@@ -0,0 +1,192 @@
+# tests/test_batch.py
+"""
+BatchStore claims and resuming a batch with run_batch, on a throwaway
+SQLite file and a fake run_debate.
+
+    python -m pytest tests/test_batch.py
+"""
+
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from backend.app import batch
+from backend.app.batch import BatchStore, JobBusy, run_batch
+
+CASES = [{"title": f"Case {i}", "text": f"Facts of case {i}."} for i in range(3)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BatchStore(str(tmp_path / "batches.db"), lease=60)
+
+
+def expire(store: BatchStore, job_id: str) -> None:
+    """Make the current owner's lease lapse."""
+    with store._lock:
+        store._conn.execute("UPDATE batch_jobs SET heartbeat = ? WHERE id = ?", (time.time() - store.lease - 1, job_id))
+
+
+class FakeDebates:
+    """Stands in for run_debate; records the cases it debated."""
+
+    def __init__(self, fail: str = ""):
+        self.fail = fail
+        self.debated: List[str] = []
+        self.gate: Optional[asyncio.Event] = None  # when set up, only "Case 0" finishes until it opens
+
+    async def __call__(self, case: Dict[str, Any], endpoint: Optional[str] = None) -> Dict[str, Any]:
+        if self.gate is not None and case["title"] != "Case 0":
+            await self.gate.wait()
+        if case["title"] == self.fail:
+            raise RuntimeError("provider down")
+        self.debated.append(case["title"])
+        return {"case": case, "verdict": "guilty"}
+
+
+class FakeStore:
+    def put(self, session_id, debate):
+        pass
+
+
+@pytest.fixture
+def debates(monkeypatch):
+    fake = FakeDebates()
+    monkeypatch.setattr(batch, "run_debate", fake)
+    monkeypatch.setattr(batch, "get_session_store", FakeStore)
+    return fake
+
+
+async def collect(job_id: str, store: BatchStore, **kwargs: Any) -> List[Dict[str, Any]]:
+    return [event async for event in run_batch(job_id, store, **kwargs)]
+
+
+# ----------------------------
+# Store
+# ----------------------------
+
+def test_claim_is_exclusive(store):
+    job_id = store.create(CASES)
+
+    assert store.claim(job_id, "a")
+    assert store.claim(job_id, "a")  # re-claiming your own job renews it
+    assert not store.claim(job_id, "b")
+    store.release(job_id, "a")
+    assert store.claim(job_id, "b")
+
+
+def test_expired_lease_is_taken_over(store):
+    job_id = store.create(CASES)
+    store.claim(job_id, "a")
+
+    expire(store, job_id)
+    assert store.claim(job_id, "b")
+    assert not store.claim(job_id, "a")
+
+
+def test_stale_owner_finish_is_ignored(store):
+    job_id = store.create(CASES)
+    store.claim(job_id, "a")
+    expire(store, job_id)
+    store.claim(job_id, "b")
+
+    assert not store.finish(job_id, 0, {"type": "result", "index": 0}, "a")
+    assert [idx for idx, _ in store.pending(job_id)] == [0, 1, 2]
+    assert store.finish(job_id, 0, {"type": "result", "index": 0}, "b")
+    assert [idx for idx, _ in store.pending(job_id)] == [1, 2]
+
+
+# ----------------------------
+# Runner
+# ----------------------------
+
+def test_runs_every_case(store, debates):
+    job_id = store.create(CASES)
+
+    events = asyncio.run(collect(job_id, store))
+    assert events[0]["type"] == "job"
+    assert sorted(e["index"] for e in events if e["type"] == "result") == [0, 1, 2]
+    assert events[-1]["type"] == "done"
+    assert events[-1]["completed"] == 3
+    assert sorted(debates.debated) == ["Case 0", "Case 1", "Case 2"]
+    assert store.job(job_id)["running"] is False
+
+
+def test_resume_only_debates_pending_cases(store, debates):
+    job_id = store.create(CASES)
+
+    async def interrupt() -> None:
+        debates.gate = asyncio.Event()
+        events = run_batch(job_id, store)
+        assert (await events.__anext__())["type"] == "job"
+        assert (await events.__anext__())["index"] == 0
+        await events.aclose()  # client gone: the other debates are cancelled
+
+    asyncio.run(interrupt())
+    assert debates.debated == ["Case 0"]
+    assert [idx for idx, _ in store.pending(job_id)] == [1, 2]
+
+    debates.gate = None
+    debates.debated.clear()
+    events = asyncio.run(collect(job_id, store, replay=True))
+    assert sorted(debates.debated) == ["Case 1", "Case 2"]
+    assert [e["index"] for e in events if e["type"] == "result"][0] == 0  # replayed first
+    assert events[-1]["completed"] == 3
+    assert store.pending(job_id) == []
+
+
+def test_failed_cases_are_retried_on_request(store, debates):
+    job_id = store.create(CASES)
+    debates.fail = "Case 1"
+
+    events = asyncio.run(collect(job_id, store))
+    assert [e["index"] for e in events if e["type"] == "error"] == [1]
+    assert events[-1]["failed"] == 1
+
+    debates.fail = ""
+    debates.debated.clear()
+    asyncio.run(collect(job_id, store))
+    assert debates.debated == []
+    events = asyncio.run(collect(job_id, store, retry_failed=True))
+    assert debates.debated == ["Case 1"]
+    assert events[-1]["completed"] == 3
+    assert events[-1]["failed"] == 0
+
+
+def test_busy_job_is_refused(store, debates):
+    job_id = store.create(CASES)
+    store.claim(job_id, "other")
+
+    with pytest.raises(JobBusy):
+        asyncio.run(collect(job_id, store))
+    assert debates.debated == []
+
+    expire(store, job_id)
+    assert asyncio.run(collect(job_id, store))[-1]["completed"] == 3
+
+
+def test_lease_is_renewed_while_debates_wait(tmp_path, debates):
+    store = BatchStore(str(tmp_path / "batches.db"), lease=0.3)
+    job_id = store.create(CASES)
+
+    async def held_up() -> bool:
+        debates.gate = asyncio.Event()
+        events = run_batch(job_id, store)
+        await events.__anext__()
+        await events.__anext__()  # Case 0; the others wait longer than the lease
+        await asyncio.sleep(1.0)
+        taken = await asyncio.to_thread(store.claim, job_id, "other")
+        debates.gate.set()
+        async for _ in events:
+            pass
+        return taken
+
+    assert not asyncio.run(held_up())
+    assert sorted(debates.debated) == ["Case 0", "Case 1", "Case 2"]
+
+
+def test_unknown_job(store, debates):
+    with pytest.raises(KeyError):
+        asyncio.run(collect("missing", store))
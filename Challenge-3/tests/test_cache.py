@@ -0,0 +1,44 @@
+# tests/test_cache.py
+"""
+ResponseCache tiers through the async path used by the lawyer and judge calls.
+
+    python -m pytest tests/test_cache.py
+"""
+
+import asyncio
+
+from backend.app.cache import ResponseCache
+
+
+def test_async_get_and_put_share_both_tiers(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResponseCache(policy="deterministic", temperature=0, disk_path=path)
+
+    async def roundtrip():
+        assert await cache.aget("k", "judge") is None
+        await cache.aput("k", "Prosecution")
+        return await cache.aget("k", "judge")
+
+    assert asyncio.run(roundtrip()) == "Prosecution"
+    assert cache.stats()["by_role"]["judge"] == {"hits": 1, "misses": 1}
+    assert cache.disk_hits == 0
+
+    # A fresh process only has the disk tier; the hit is promoted into memory.
+    restarted = ResponseCache(policy="deterministic", temperature=0, disk_path=path)
+    assert asyncio.run(restarted.aget("k", "judge")) == "Prosecution"
+    assert asyncio.run(restarted.aget("k", "judge")) == "Prosecution"
+    assert restarted.disk_hits == 1
+
+
+def test_variants_miss_until_full():
+    cache = ResponseCache(policy="variants", variants=2)
+
+    async def fill():
+        await cache.aput("k", "a")
+        first = await cache.aget("k")
+        await cache.aput("k", "b")
+        return first, await cache.aget("k")
+
+    first, second = asyncio.run(fill())
+    assert first is None
+    assert second in ("a", "b")
@@ -0,0 +1,103 @@
+# tests/test_cases.py
+"""
+CaseTable columns and Case views: round trips, immutability, extend() and forks.
+
+    python -m pytest tests/test_cases.py
+"""
+
+import pickle
+
+import pytest
+
+from backend.app.cases import Case, CaseTable
+
+CASES = [
+    {"id": 1, "title": "State v. Doe", "year": 2001, "jurisdiction": "UK", "tags": ["theft", "minor"],
+     "text": "A bicycle was taken."},
+    # Values that don't fit their column, extra keys, and key order that isn't FIELDS order
+    {"text": "Ein Fahrrad wurde gestohlen — ärgerlich.", "id": "abc-7", "year": "N/A", "court": "Amtsgericht",
+     "tags": ["theft", 3], "parties": {"plaintiff": "Roe"}},
+    {"id": 2 ** 40, "title": "", "year": True},
+    {},
+]
+
+
+def titles(table):
+    return [case.get("title") for case in table]
+
+
+# ----------------------------
+# Case views
+# ----------------------------
+
+def test_views_round_trip_every_case():
+    table = CaseTable(CASES)
+
+    assert len(table) == len(CASES)
+    for case, original in zip(table, CASES):
+        assert case == original
+        assert case.to_dict() == original
+        assert set(case) == set(original) and len(case) == len(original)
+    assert [case["id"] for case in table[1:3]] == ["abc-7", 2 ** 40]
+    assert table[-1] == {}
+    with pytest.raises(IndexError):
+        table[len(CASES)]
+
+
+def test_views_expose_attributes_and_defaults():
+    doe, other, _, empty = CaseTable(CASES)
+
+    assert (doe.id, doe.title, doe.year, doe.jurisdiction, doe.tags) == (1, "State v. Doe", 2001, "UK",
+                                                                         ["theft", "minor"])
+    assert other.year == "N/A" and other.title is None and other.tags == ["theft", 3]
+    assert empty.tags == [] and empty.get("court", "none") == "none"
+    with pytest.raises(KeyError):
+        empty["id"]
+
+
+def test_views_are_immutable():
+    case = CaseTable(CASES)[0]
+
+    with pytest.raises(AttributeError):
+        case.title = "changed"
+    with pytest.raises(TypeError):
+        case["title"] = "changed"
+
+    copy = case.to_dict()
+    copy["tags"].append("changed")
+    assert case.tags == ["theft", "minor"]
+
+
+def test_views_pickle_by_value():
+    case = CaseTable(CASES)[1]
+
+    restored = pickle.loads(pickle.dumps(case))
+    assert isinstance(restored, Case)
+    assert restored == CASES[1]
+
+
+# ----------------------------
+# extend()
+# ----------------------------
+
+def test_extend_leaves_the_old_table_unchanged():
+    first = CaseTable(CASES[:1])
+    second = first.extend([{"id": 2, "title": "Roe v. Roe", "jurisdiction": "UK"}])
+    view = first[0]
+
+    assert len(first) == 1 and titles(first) == ["State v. Doe"]
+    assert titles(second) == ["State v. Doe", "Roe v. Roe"]
+    assert second[1].jurisdiction == "UK"
+    assert view == CASES[0]
+
+
+def test_extending_an_older_table_forks_it():
+    first = CaseTable(CASES[:1])
+    second = first.extend([{"id": 2, "title": "Roe v. Roe", "tags": ["family"], "court": "High"}])
+    fork = first.extend([{"id": 3, "title": "In re Smith", "tags": ["wills"]}] * 2000)
+
+    assert titles(second) == ["State v. Doe", "Roe v. Roe"]
+    assert second[1].tags == ["family"] and second[1]["court"] == "High"
+    assert len(fork) == 2001 and titles(fork)[:2] == ["State v. Doe", "In re Smith"]
+    assert fork[1].tags == ["wills"] and "court" not in fork[1]
+    assert titles(second.extend([{"title": "Later"}])) == ["State v. Doe", "Roe v. Roe", "Later"]
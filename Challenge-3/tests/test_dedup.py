@@ -0,0 +1,113 @@
+# tests/test_dedup.py
+"""
+MinHash signatures and the LSH duplicate index, on a throwaway corpus.
+
+    python -m pytest tests/test_dedup.py
+"""
+
+import json
+import random
+
+import numpy as np
+
+from backend.app.dedup import DuplicateIndex, band_keys, jaccard, shingles, signatures
+from backend.app.snapshot import get_snapshot
+
+RNG = random.Random(0)
+WORDS = ["".join(RNG.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(RNG.randint(3, 9))) for _ in range(2000)]
+
+
+def random_text(rng: random.Random, words: int = 60) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def edit_words(text: str, rng: random.Random, edits: int) -> str:
+    """`text` with `edits` words replaced."""
+    words = text.split()
+    for i in rng.sample(range(len(words)), edits):
+        words[i] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def write_cases(path, cases, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for case in cases:
+            f.write(json.dumps(case) + "\n")
+
+
+def make_index(tmp_path, cases, threshold=0.7) -> DuplicateIndex:
+    corpus = tmp_path / "cases.jsonl"
+    write_cases(corpus, cases)
+    return DuplicateIndex(get_snapshot(str(corpus)), threshold=threshold)
+
+
+def corpus_cases(n: int = 50):
+    rng = random.Random(1)
+    return [{"id": i, "title": f"Case {i}", "text": random_text(rng)} for i in range(n)]
+
+
+# ----------------------------
+# Signatures
+# ----------------------------
+
+def test_signature_agreement_estimates_jaccard():
+    rng = random.Random(2)
+    for edits in [2, 8, 20]:
+        a = random_text(rng, 200)
+        b = edit_words(a, rng, edits)
+        sigs = signatures([a, b])
+        estimate = float(np.mean(sigs[0] == sigs[1]))
+        assert abs(estimate - jaccard(shingles(a), shingles(b))) < 0.15, edits
+
+
+def test_near_duplicates_share_a_band():
+    rng = random.Random(3)
+    pairs = []
+    for _ in range(50):
+        text = random_text(rng)
+        pairs.append((text, edit_words(text, rng, 2)))
+
+    keys = band_keys(signatures([text for pair in pairs for text in pair]))
+    assert all(jaccard(shingles(a), shingles(b)) >= 0.7 for a, b in pairs)
+    assert all((keys[2 * i] == keys[2 * i + 1]).any() for i in range(len(pairs)))
+
+
+# ----------------------------
+# DuplicateIndex
+# ----------------------------
+
+def test_check_finds_a_near_duplicate(tmp_path):
+    cases = corpus_cases()
+    index = make_index(tmp_path, cases)
+    near = {"id": 100, "title": "Case 17", "text": edit_words(cases[17]["text"], random.Random(4), 1)}
+    unrelated = {"id": 101, "title": "Unrelated", "text": random_text(random.Random(5))}
+
+    found, missing, same_id = index.check([near, unrelated, {"id": 3, "text": "anything"}])
+    assert found["duplicate_of"] == 17 and found["in"] == "corpus" and found["reason"] == "text"
+    assert found["similarity"] >= 0.7
+    assert missing is None
+    assert same_id == {"duplicate_of": 3, "in": "corpus", "reason": "id", "similarity": None}
+
+
+def test_check_finds_duplicates_within_a_batch(tmp_path):
+    index = make_index(tmp_path, corpus_cases())
+    text = random_text(random.Random(6))
+
+    results = index.check([{"title": "New", "text": text}, {"title": "New", "text": text + " again"}])
+    assert results[0] is None
+    assert results[1]["duplicate_of"] == 0 and results[1]["in"] == "batch"
+
+
+def test_clusters_and_sync(tmp_path):
+    cases = corpus_cases()
+    cases.append({"id": 50, "title": "Case 9", "text": edit_words(cases[9]["text"], random.Random(7), 1)})
+    index = make_index(tmp_path, cases)
+
+    assert [cluster["ids"] for cluster in index.clusters()] == [[9, 50]]
+
+    corpus = tmp_path / "cases.jsonl"
+    write_cases(corpus, [{"id": 51, "title": "Case 30", "text": cases[30]["text"]}], mode="a")
+    index.sync(get_snapshot(str(corpus)))
+    assert index.count == 52
+    assert sorted(cluster["ids"] for cluster in index.clusters()) == [[9, 50], [30, 51]]
+    assert index.check([{"id": 51}])[0]["reason"] == "id"
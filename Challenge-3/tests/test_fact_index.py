@@ -0,0 +1,58 @@
+# tests/test_fact_index.py
+"""
+FactIndex lookups by case id, on a throwaway corpus.
+
+    python -m pytest tests/test_fact_index.py
+"""
+
+import json
+
+from backend.app.fact_index import FactIndex
+from backend.app.generate_facts import generate_facts, load_facts
+from backend.app.retrieval import HashingEncoder
+from backend.app.snapshot import get_snapshot
+
+CASES = [
+    {"id": 1, "title": "Integer One", "text": "A bicycle was taken."},
+    {"id": "1", "title": "String One", "text": "A fence was moved."},
+]
+ADDED = [
+    {"id": 2, "title": "Integer Two", "text": "A will was contested."},
+    {"id": "2", "title": "String Two", "text": "A contract was broken."},
+]
+
+
+def write_cases(path, cases, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for case in cases:
+            f.write(json.dumps(case) + "\n")
+
+
+def titles(index: FactIndex, case):
+    """Title used in the facts the index returns for `case`."""
+    return {fact.split(" was decided")[0] for fact in index.top_facts(case, case["text"], k=10)
+            if " was decided" in fact}
+
+
+def test_integer_and_string_ids_keep_their_own_facts(tmp_path):
+    corpus, facts = tmp_path / "cases.jsonl", str(tmp_path / "facts.snapshot")
+    write_cases(corpus, CASES)
+    generate_facts(str(corpus), facts)
+    index = FactIndex.build(load_facts(facts), HashingEncoder(dim=64))
+
+    assert index.case_row(1) != index.case_row("1")
+    assert titles(index, CASES[0]) == {"Integer One"}
+    assert titles(index, CASES[1]) == {"String One"}
+
+    # Ingested cases: held in memory, then compacted into the files.
+    write_cases(corpus, ADDED, mode="a")
+    view = get_snapshot(str(corpus))
+    index = index.extend(ADDED, view.header["sha256"])
+    assert titles(index, ADDED[0]) == {"Integer Two"}
+    assert titles(index, ADDED[1]) == {"String Two"}
+
+    index = index.compact(view)
+    assert index.added == {}
+    assert [load_facts(facts)[i]["id"] for i in range(4)] == [1, "1", 2, "2"]
+    for case in CASES + ADDED:
+        assert titles(index, case) == {case["title"]}
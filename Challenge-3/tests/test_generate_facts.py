@@ -0,0 +1,38 @@
+# tests/test_generate_facts.py
+"""
+Facts records line up with the corpus snapshot rows, however lines are shaped.
+
+    python -m pytest tests/test_generate_facts.py
+"""
+
+import json
+
+import pytest
+
+from backend.app.generate_facts import generate_facts, load_facts
+from backend.app.snapshot import CorpusSnapshot, build_corpus_snapshot
+
+LINES = [
+    {"id": 1, "title": "State v. Doe", "text": "A bicycle was taken."},
+    [{"id": 2, "title": "Roe v. Roe", "text": "A fence was moved."},
+     {"id": 3, "title": "In re Smith", "text": "A will was contested."}],
+    "A bare sentence with no metadata.",
+    {"id": 4, "title": "People v. Poe", "text": "A contract was broken."},
+]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_facts_follow_snapshot_rows(tmp_path, workers):
+    corpus = tmp_path / "cases.jsonl"
+    with open(corpus, "w", encoding="utf-8") as f:
+        for line in LINES:
+            f.write(json.dumps(line) + "\n")
+        f.write("{not json\n")
+
+    snapshot = CorpusSnapshot(build_corpus_snapshot(str(corpus), str(tmp_path / "cases.snapshot")))
+    generate_facts(str(corpus), str(tmp_path / "facts.snapshot"), workers=workers, chunk_size=2)
+    facts = load_facts(str(tmp_path / "facts.snapshot"))
+
+    assert len(facts) == len(snapshot) == 5
+    assert [facts[i]["id"] for i in range(len(facts))] == [snapshot[i]["id"] for i in range(len(snapshot))]
+    assert "In re Smith" in facts.facts(2)[0]
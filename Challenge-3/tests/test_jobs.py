@@ -0,0 +1,218 @@
+# tests/test_jobs.py
+"""
+JobQueue leases, retries and ownership, on a throwaway SQLite file.
+
+    python -m pytest tests/test_jobs.py
+"""
+
+import time
+import asyncio
+
+import pytest
+
+from backend.app import jobs
+from backend.app.jobs import MAX_ATTEMPTS, JobQueue, JobWorker, QueueFull
+
+CASE = {"title": "State v. Doe", "text": "The accused took a bicycle left unlocked outside a shop."}
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"), lease=60, ttl=3600, max_queued=10)
+
+
+def expire(queue: JobQueue, job_id: str) -> None:
+    """Make the current owner's lease lapse."""
+    with queue._lock:
+        queue._conn.execute("UPDATE jobs SET heartbeat = ? WHERE id = ?", (time.time() - queue.lease - 1, job_id))
+
+
+class FakeStore:
+    def __init__(self):
+        self.sessions = {}
+
+    def put(self, session_id, debate):
+        self.sessions[session_id] = debate
+
+
+# ----------------------------
+# Queue
+# ----------------------------
+
+def test_claim_is_exclusive(queue):
+    job_id = queue.submit({"case": CASE})
+
+    assert queue.claim("a") == (job_id, {"case": CASE})
+    assert queue.claim("b") is None
+    job = queue.get(job_id)
+    assert job["status"] == "running"
+    assert job["attempts"] == 1
+
+
+def test_claim_takes_oldest_first(queue):
+    first = queue.submit({"case": CASE})
+    second = queue.submit({"case": CASE})
+
+    assert queue.claim("a")[0] == first
+    assert queue.claim("b")[0] == second
+
+
+def test_submit_rejects_when_full(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"), lease=60, ttl=3600, max_queued=1)
+    queue.submit({"case": CASE})
+
+    with pytest.raises(QueueFull):
+        queue.submit({"case": CASE})
+
+
+def test_expired_lease_is_taken_over(queue):
+    job_id = queue.submit({"case": CASE})
+    queue.claim("a")
+    queue.add_event(job_id, "a", {"type": "turn", "round": 1})
+
+    expire(queue, job_id)
+    assert queue.claim("b") == (job_id, {"case": CASE})
+    job = queue.get(job_id)
+    assert job["attempts"] == 2
+    assert job["events"] == 0  # the retry starts over
+
+
+def test_heartbeat_keeps_the_lease(queue):
+    job_id = queue.submit({"case": CASE})
+    queue.claim("a")
+    expire(queue, job_id)
+
+    queue.add_event(job_id, "a", {"type": "turn", "round": 1})
+    assert queue.claim("b") is None
+
+
+def test_gives_up_after_max_attempts(queue):
+    job_id = queue.submit({"case": CASE})
+    for attempt in range(MAX_ATTEMPTS):
+        assert queue.claim(f"worker-{attempt}")[0] == job_id
+        expire(queue, job_id)
+
+    assert queue.claim("last") is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == f"gave up after {MAX_ATTEMPTS} attempts"
+
+
+def test_stale_owner_is_ignored(queue):
+    job_id = queue.submit({"case": CASE})
+    queue.claim("a")
+    expire(queue, job_id)
+    queue.claim("b")
+
+    queue.add_event(job_id, "a", {"type": "turn", "round": 1})
+    queue.finish(job_id, "a", {"verdict": "stale"})
+    queue.fail(job_id, "a", "stale")
+    queue.requeue(job_id, "a")
+    job = queue.get(job_id)
+    assert job["status"] == "running"
+    assert job["events"] == 0
+
+    queue.finish(job_id, "b", {"verdict": "guilty"})
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["debate"] == {"verdict": "guilty"}
+
+
+def test_requeue_gives_the_attempt_back(queue):
+    job_id = queue.submit({"case": CASE})
+    queue.claim("a")
+
+    queue.requeue(job_id, "a")
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert job["attempts"] == 0
+    assert queue.claim("b")[0] == job_id
+
+
+# ----------------------------
+# Worker
+# ----------------------------
+
+def test_worker_finishes_job(queue, monkeypatch):
+    async def fake_stream_debate(case, endpoint=None):
+        yield {"type": "turn", "round": 1, "role": "prosecution", "argument": "..."}
+        yield {"type": "done", "debate": {"case": case, "verdict": "guilty", "elapsed": 0.0}}
+
+    store = FakeStore()
+    monkeypatch.setattr(jobs, "stream_debate", fake_stream_debate)
+    monkeypatch.setattr(jobs, "get_session_store", lambda: store)
+    worker = JobWorker(queue, concurrency=1, poll_interval=0.01)
+    job_id = queue.submit({"case": CASE})
+
+    asyncio.run(worker._run(*queue.claim(worker.owner)))
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["events"] == 1
+    assert job["debate"]["verdict"] == "guilty"
+    assert job["debate"]["session_id"] in store.sessions
+
+
+def test_worker_requeues_on_cancel(queue, monkeypatch):
+    async def fake_stream_debate(case, endpoint=None):
+        yield {"type": "turn", "round": 1, "role": "prosecution", "argument": "..."}
+        await asyncio.Event().wait()  # never finishes
+        yield {}
+
+    monkeypatch.setattr(jobs, "stream_debate", fake_stream_debate)
+    worker = JobWorker(queue, concurrency=1, poll_interval=0.01)
+    job_id = queue.submit({"case": CASE})
+
+    async def run_and_cancel() -> None:
+        task = asyncio.create_task(worker._run(*queue.claim(worker.owner)))
+        while queue.get(job_id)["events"] == 0:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run_and_cancel())
+    job = queue.get(job_id)
+    assert job["status"] == "queued"
+    assert job["attempts"] == 0
+    assert queue.claim("other")[0] == job_id
+
+
+def test_idle_worker_backs_off(queue, monkeypatch):
+    async def fake_stream_debate(case, endpoint=None):
+        yield {"type": "done", "debate": {"case": case, "verdict": "guilty", "elapsed": 0.0}}
+
+    monkeypatch.setattr(jobs, "stream_debate", fake_stream_debate)
+    monkeypatch.setattr(jobs, "get_session_store", FakeStore)
+    claims = []
+    claim = queue.claim
+    monkeypatch.setattr(queue, "claim", lambda owner: claims.append(owner) or claim(owner))
+    worker = JobWorker(queue, concurrency=1, poll_interval=0.01, max_poll_interval=0.16)
+
+    async def idle_then_submit() -> str:
+        worker.start()
+        await asyncio.sleep(1.0)
+        idle_claims = len(claims)
+        job_id = queue.submit({"case": CASE})
+        worker.wake()  # a local submit doesn't wait out the backed-off interval
+        await asyncio.sleep(0.05)
+        await worker.stop()
+        assert idle_claims < 15  # 100 at a fixed 0.01s
+        return job_id
+
+    job_id = asyncio.run(idle_then_submit())
+    assert queue.get(job_id)["status"] == "done"
+
+
+def test_worker_marks_failure(queue, monkeypatch):
+    async def fake_stream_debate(case, endpoint=None):
+        raise RuntimeError("provider down")
+        yield {}
+
+    monkeypatch.setattr(jobs, "stream_debate", fake_stream_debate)
+    worker = JobWorker(queue, concurrency=1, poll_interval=0.01)
+    job_id = queue.submit({"case": CASE})
+
+    asyncio.run(worker._run(*queue.claim(worker.owner)))
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "provider down"
@@ -0,0 +1,74 @@
+# tests/test_providers.py
+"""
+Micro-batched completions against a fake OpenAI-compatible server.
+
+    python -m pytest tests/test_providers.py
+"""
+
+import json
+import asyncio
+
+import httpx
+import pytest
+
+from backend.app import models
+from backend.app.config import get_settings
+from backend.app.providers import OpenAICompatibleProvider
+
+
+def run_batched(handler, prompts):
+    """agenerate() every prompt concurrently (so they share a batch); returns the texts and request bodies."""
+    bodies = []
+
+    def record(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body["prompt"])
+        return handler(body["prompt"])
+
+    async def main():
+        provider = OpenAICompatibleProvider(get_settings())
+        _, semaphore, batcher = provider._loop_state()
+        client = httpx.AsyncClient(base_url="http://llm", transport=httpx.MockTransport(record))
+        provider._loops[asyncio.get_running_loop()] = (client, semaphore, batcher)
+        try:
+            return await asyncio.gather(*(provider.agenerate(p) for p in prompts))
+        finally:
+            await client.aclose()
+
+    return asyncio.run(main()), bodies
+
+
+def echo(prompts):
+    return httpx.Response(200, json={"choices": [
+        {"index": i, "text": f"re: {p}"} for i, p in reversed(list(enumerate(prompts)))
+    ]})
+
+
+def test_batch_answers_follow_choice_index():
+    texts, bodies = run_batched(echo, ["a", "b", "c"])
+
+    assert texts == ["re: a", "re: b", "re: c"]
+    assert bodies == [["a", "b", "c"]]
+
+
+def test_bad_choice_index_falls_back_to_single_prompts():
+    def handler(prompts):
+        if len(prompts) > 1:
+            return httpx.Response(200, json={"choices": [{"index": 7, "text": "?"}]})
+        return echo(prompts)
+
+    texts, bodies = run_batched(handler, ["a", "b"])
+    assert texts == ["re: a", "re: b"]
+    assert bodies == [["a", "b"], ["a"], ["b"]]
+
+
+def test_bad_choice_index_on_a_single_prompt_fails_it():
+    with pytest.raises(ValueError):
+        run_batched(lambda prompts: httpx.Response(200, json={"choices": [{"index": 1, "text": "?"}]}), ["a"])
+
+
+def test_only_token_stream_debates_stream():
+    assert not models._stream()
+    with models.token_stream():
+        assert models._stream() == get_settings().STREAM
+    assert not models._stream()
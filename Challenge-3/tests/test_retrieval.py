@@ -0,0 +1,159 @@
+# tests/test_retrieval.py
+"""
+CorpusIndex: BM25 postings, reciprocal-rank fusion with filters, metadata filters.
+
+    python -m pytest tests/test_retrieval.py
+"""
+
+import os
+import json
+import time
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from backend.app import retrieval
+from backend.app.retrieval import CaseMetadata, CorpusIndex, HashingEncoder
+
+DOCS = [
+    {"id": 0, "title": "Bicycle theft", "text": "The accused stole a bicycle outside a shop.",
+     "jurisdiction": "UK", "tags": ["theft"], "year": 2001},
+    {"id": 1, "title": "Bicycle dispute", "text": "Two neighbours argued over a bicycle.",
+     "jurisdiction": "US", "tags": ["property"], "year": 2010},
+    {"id": 2, "title": "Car theft", "text": "The accused stole a car at night.",
+     "jurisdiction": "US", "tags": ["theft"], "year": 2015},
+    {"id": 3, "title": "Fence dispute", "text": "A fence was moved onto the neighbour's land.",
+     "jurisdiction": "UK", "tags": ["property"], "year": 1999},
+]
+
+
+def ids(results):
+    return [hit["case"]["id"] for hit in results]
+
+
+# ----------------------------
+# BM25
+# ----------------------------
+
+def test_bm25_prefers_cases_matching_more_terms():
+    index = CorpusIndex(DOCS)
+
+    results = index.search("bicycle theft", k=4, alpha=0)
+    assert ids(results)[0] == 0
+    assert set(ids(results)) == {0, 1, 2}  # the fence case shares no term
+
+
+def test_postings_are_impact_ordered():
+    index = CorpusIndex(DOCS)
+
+    for term, (doc_ids, weights) in index.postings.items():
+        assert len(doc_ids) == len(weights) == index.df[term]
+        assert np.all(np.diff(weights) <= 0), term
+
+
+# ----------------------------
+# Fusion
+# ----------------------------
+
+def test_rrf_ranks_count_after_filtering():
+    index = CorpusIndex(DOCS)
+
+    results = index.search("bicycle theft", k=4, filters={"jurisdiction": "us"})
+    assert ids(results) == [1, 2] or ids(results) == [2, 1]
+    # BM25 alone carries weight 1 - alpha; ranks are counted among the filtered candidates
+    assert [hit["score"] for hit in results] == [round(0.5 / 61, 6), round(0.5 / 62, 6)]
+
+    assert ids(index.search("bicycle theft", filters={"tags": ["theft"], "year_from": 2010})) == [2]
+    assert index.search("bicycle theft", filters={"tags": ["no-such-tag"]}) == []
+
+
+def test_rrf_sums_both_rankings():
+    pytest.importorskip("faiss")
+    index = CorpusIndex(DOCS, encoder=HashingEncoder(dim=64))
+    query = "accused stole a bicycle"
+
+    expected = defaultdict(float)
+    for (doc_ids, _), weight in ((index._bm25_candidates(query, 50), 0.5), (index._dense_candidates(query, 50), 0.5)):
+        for rank, doc_id in enumerate(doc_ids.tolist()):
+            expected[doc_id] += weight / (60 + rank + 1)
+
+    results = index.search(query, k=4)
+    assert ids(results) == sorted(expected, key=expected.get, reverse=True)[:4]
+    assert [hit["score"] for hit in results] == [round(expected[i], 6) for i in ids(results)]
+
+
+def test_extend_keeps_the_old_index():
+    index = CorpusIndex(DOCS)
+    extended = index.extend([{"id": 4, "title": "Boat theft", "text": "A boat was taken from the harbour."}])
+
+    assert ids(extended.search("boat", k=1)) == [4]
+    assert index.search("boat") == []
+
+
+# ----------------------------
+# Metadata filters
+# ----------------------------
+
+def test_matching_agrees_with_a_scan():
+    rng = random.Random(0)
+    docs = [{
+        "id": i,
+        "jurisdiction": rng.choice(["UK", "US", "India"]),
+        "tags": rng.sample(["theft", "property", "contract", "family"], rng.randint(0, 2)),
+        "year": rng.randint(1950, 2020),
+    } for i in range(500)]
+    meta = CaseMetadata(docs[:300]).extend(docs[300:])
+
+    for filters in [
+        {"jurisdiction": "uk"},
+        {"tags": ["theft", "property"]},
+        {"year_from": 2000, "year_to": 2005},
+        {"jurisdiction": "India", "tags": "contract", "year_to": 1980},
+    ]:
+        tags = filters.get("tags") or []
+        tags = [tags] if isinstance(tags, str) else tags
+        scanned = [
+            d["id"] for d in docs
+            if (not filters.get("jurisdiction") or d["jurisdiction"].lower() == filters["jurisdiction"].lower())
+            and all(t in d["tags"] for t in tags)
+            and d["year"] >= filters.get("year_from", 0)
+            and d["year"] <= filters.get("year_to", 9999)
+        ]
+        assert meta.matching(filters).tolist() == scanned, filters
+
+
+# ----------------------------
+# Per-corpus singleton
+# ----------------------------
+
+def test_one_thread_builds_the_corpus_index(tmp_path, monkeypatch):
+    corpus = tmp_path / "cases.jsonl"
+    corpus.write_text("".join(json.dumps(doc) + "\n" for doc in DOCS), encoding="utf-8")
+    monkeypatch.setattr(retrieval, "_CORPUS_INDEXES", {})
+    monkeypatch.setattr(retrieval, "_CORPUS_INDEX_BUILDS", {})
+
+    builds = []
+
+    class SlowIndex(CorpusIndex):
+        def __init__(self, *args, **kwargs):
+            builds.append(1)
+            time.sleep(0.2)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(retrieval, "CorpusIndex", SlowIndex)
+    with ThreadPoolExecutor(4) as pool:
+        indexes = list(pool.map(lambda _: retrieval.get_corpus_index(str(corpus), dense=False), range(4)))
+    assert len(builds) == 1
+    assert all(index is indexes[0] for index in indexes)
+
+    # While the index is being brought up to date, callers keep the previous one.
+    with open(corpus, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": 4, "title": "Boat theft", "text": "A boat was taken."}) + "\n")
+    build = retrieval._CORPUS_INDEX_BUILDS[(os.path.abspath(corpus), False)]
+    with build:
+        assert retrieval.get_corpus_index(str(corpus), dense=False) is indexes[0]
+    updated = retrieval.get_corpus_index(str(corpus), dense=False)
+    assert updated.count == 5 and len(builds) == 1
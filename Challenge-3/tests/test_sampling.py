@@ -0,0 +1,121 @@
+# tests/test_sampling.py
+"""
+FenwickTree prefix sums and draws; CaseSampler filters, per-user history and recency.
+
+    python -m pytest tests/test_sampling.py
+"""
+
+import json
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from backend.app.sampling import CaseSampler, FenwickTree, NoMatchingCase
+from backend.app.snapshot import get_snapshot
+
+
+def prefix_sums(tree: FenwickTree) -> np.ndarray:
+    """Prefix sums read back from the tree itself (1-based, like tree.tree)."""
+    sums = np.zeros(tree.n + 1)
+    for i in range(1, tree.n + 1):
+        j = i
+        while j > 0:
+            sums[i] += tree.tree[j]
+            j -= j & -j
+    return sums
+
+
+def make_sampler(tmp_path, cases) -> CaseSampler:
+    corpus = tmp_path / "cases.jsonl"
+    corpus.write_text("".join(json.dumps(case) + "\n" for case in cases), encoding="utf-8")
+    return CaseSampler(get_snapshot(str(corpus)))
+
+
+CASES = [
+    {"id": i, "title": f"Case {i}", "text": f"Facts of case {i}.",
+     "jurisdiction": "UK" if i % 2 else "US", "tags": ["theft"] if i % 5 == 0 else [], "year": 1990 + i}
+    for i in range(20)
+]
+
+
+# ----------------------------
+# FenwickTree
+# ----------------------------
+
+def test_prefix_sums_follow_updates():
+    rng = random.Random(0)
+    weights = np.array([rng.random() for _ in range(37)])
+    tree = FenwickTree(weights)
+    assert np.allclose(prefix_sums(tree)[1:], np.cumsum(weights))
+
+    for _ in range(200):
+        i, w = rng.randrange(37), rng.choice([0.0, 0.1, 1.0, rng.random()])
+        tree.update(i, w)
+        weights[i] = w
+    assert np.allclose(prefix_sums(tree)[1:], np.cumsum(weights))
+    assert tree.total == pytest.approx(weights.sum())
+
+    cumulative = np.cumsum(weights)
+    for x in [0.0, cumulative[-1] / 3, cumulative[-1] / 2, cumulative[-1] - 1e-9]:
+        assert tree.find(x) == int(np.searchsorted(cumulative, x, side="right"))
+
+
+def test_draws_are_proportional_to_weight():
+    tree = FenwickTree(np.array([0.0, 1.0, 0.0, 3.0]))
+    rng = random.Random(1)
+
+    counts = Counter(tree.sample(rng) for _ in range(4000))
+    assert set(counts) == {1, 3}
+    assert counts[3] / 4000 == pytest.approx(0.75, abs=0.03)
+
+    tree.update(3, 0.0)
+    assert {tree.sample(rng) for _ in range(100)} == {1}
+
+
+def test_extend_appends_weights():
+    tree = FenwickTree(np.ones(3)).extend(np.array([2.0, 0.0]))
+    assert tree.n == 5 and tree.total == 5.0
+    assert np.allclose(prefix_sums(tree)[1:], [1, 2, 3, 5, 5])
+
+
+# ----------------------------
+# CaseSampler
+# ----------------------------
+
+def test_filtered_draws_only_return_matches(tmp_path):
+    sampler = make_sampler(tmp_path, CASES)
+    rng = random.Random(2)
+
+    drawn = {sampler.sample({"jurisdiction": "uk", "tags": ["theft"]}, rng=rng)["id"] for _ in range(50)}
+    assert drawn == {5, 15}
+    assert {sampler.sample({"year_from": 2009}, rng=rng)["id"] for _ in range(20)} == {19}
+    with pytest.raises(NoMatchingCase):
+        sampler.sample({"tags": ["no-such-tag"]})
+
+
+def test_no_repeats_per_user_until_exhausted(tmp_path):
+    sampler = make_sampler(tmp_path, CASES)
+    rng = random.Random(3)
+
+    first = [sampler.sample(user="alice", rng=rng)["id"] for _ in range(20)]
+    assert sorted(first) == list(range(20))
+    assert sampler.sample(user="alice", rng=rng)["id"] in range(20)  # history starts over
+
+    us = [sampler.sample({"jurisdiction": "us"}, user="bob", rng=rng)["id"] for _ in range(10)]
+    assert sorted(us) == list(range(0, 20, 2))
+
+
+@pytest.mark.parametrize("filters", [None, {"jurisdiction": "uk"}])
+def test_weighted_draws_skip_recently_debated_cases(tmp_path, filters):
+    sampler = make_sampler(tmp_path, CASES)
+    sampler.recent_weight = 0.0
+    for case in CASES:
+        if case["id"] != 7:
+            sampler.mark_debated(case["id"])
+    sampler.mark_debated("not-in-corpus")
+
+    rng = random.Random(4)
+    assert {sampler.sample(filters, weighted=True, rng=rng)["id"] for _ in range(30)} == {7}
+    assert len({sampler.sample(filters, rng=rng)["id"] for _ in range(100)}) > 1
@@ -0,0 +1,74 @@
+# tests/test_sessions.py
+"""
+SQLite session store: running totals and eviction, on a throwaway file.
+
+    python -m pytest tests/test_sessions.py
+"""
+
+import time
+import sqlite3
+
+import pytest
+
+from backend.app.sessions import SQLiteSessionStore
+
+
+def scanned(store: SQLiteSessionStore):
+    """Count and bytes the slow way, to check the running totals against."""
+    with store._lock:
+        return tuple(store._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions").fetchone())
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+def test_totals_follow_puts_updates_and_deletes(path):
+    store = SQLiteSessionStore(path, ttl=3600, max_items=100, max_bytes=10**6)
+    store.put("a", {"verdict": "guilty"})
+    store.put("b", {"verdict": "not guilty"})
+    store.update("a", summary="A much longer summary than before.")
+    store.delete("b")
+
+    assert (len(store), store.size_bytes()) == scanned(store)
+    assert len(store) == 1
+
+
+def test_evicts_least_recently_used_over_caps(path):
+    store = SQLiteSessionStore(path, ttl=3600, max_items=2, max_bytes=10**6)
+    for session_id in ("a", "b", "c"):
+        store.put(session_id, {"id": session_id})
+        time.sleep(0.01)
+
+    assert store.get("a") is None
+    assert store.get("c") == {"id": "c"}
+    assert store.evictions == 1
+    assert (len(store), store.size_bytes()) == scanned(store)
+
+
+def test_expired_sessions_are_dropped(path):
+    store = SQLiteSessionStore(path, ttl=0.05, max_items=100, max_bytes=10**6)
+    store.put("a", {"id": "a"})
+    time.sleep(0.1)
+    store.put("b", {"id": "b"})
+
+    assert store.get("a") is None
+    assert len(store) == 1
+    assert (len(store), store.size_bytes()) == scanned(store)
+
+
+def test_totals_seeded_from_existing_file(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sessions (id TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)")
+    conn.execute("INSERT INTO sessions VALUES ('old', '{}', 2, ?)", (time.time(),))
+    conn.commit()
+    conn.close()
+
+    store = SQLiteSessionStore(path, ttl=3600, max_items=100, max_bytes=10**6)
+    assert (len(store), store.size_bytes()) == (1, 2)
+    store.put("new", {"id": "new"})
+    assert (len(store), store.size_bytes()) == scanned(store)
+
+    # A second store on the same file (another worker) sees the same totals.
+    assert len(SQLiteSessionStore(path, ttl=3600, max_items=100, max_bytes=10**6)) == 2